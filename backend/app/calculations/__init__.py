@@ -1,5 +1,17 @@
-"""Computation utilities for temporary reports."""
+"""Computation utilities for temporary reports and indicator scoring."""
 
 from .report_generator import compute_flash_metrics
+from .scoring_engine import NORMALISATIONS, ValueMatrix, load_value_matrix, normalise, score_years
+from .scoring_spec import ScoringSpec, load_spec, validate_spec
 
-__all__ = ["compute_flash_metrics"]
+__all__ = [
+    "compute_flash_metrics",
+    "NORMALISATIONS",
+    "ValueMatrix",
+    "load_value_matrix",
+    "normalise",
+    "score_years",
+    "ScoringSpec",
+    "load_spec",
+    "validate_spec",
+]
@@ -0,0 +1,401 @@
+"""Vectorised indicator scoring: ``valeur_indicateur`` → ``score_indicateur``.
+
+The raw values of a year are read in one streamed query into an EPCI ×
+indicator float matrix (NaN where there is no value). A normalisation turns
+every column into 0–100 scores in a few NumPy operations, and the scores go
+back through ``copy_upsert``, so rescoring costs one read and one COPY per
+year and scales with the number of cells:
+
+- ``minmax``: ``(x - min) / (max - min)`` per indicator (0 for a constant column);
+- ``zscore``: standard score clipped to ±``ZSCORE_CLIP`` and mapped linearly to 0–100;
+- ``quantile``: percent rank within the indicator (ties share their mean rank);
+- ``threshold``: share of the ``thresholds`` the value reaches (``x >= t``).
+
+A ``ScoringSpec`` (``scoring_spec``) replaces the single method with
+per-indicator rules (direction, caps, transform, bounds, thresholds) compiled
+into column arrays for the same matrix.
+
+With ``jobs > 1`` (``score_units_parallel``) the (indicator, year) units of
+each year are split into about ``jobs`` chunks of indicators; a worker process
+reads a chunk in one query and normalises it in one call, and the parent
+upserts every result in one COPY.
+
+Only ``score_indicateur`` and ``rapport`` are written; need, objective, type
+and global scores are aggregated afterwards. The caller owns the transaction
+and runs ``publish_scores`` before committing.
+"""
+from __future__ import annotations
+
+import itertools
+import math
+import logging
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Integer, cast, delete, select, tuple_
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlalchemy.orm import Session
+
+from app.core.numeric import round_half_up
+from app.db import SessionLocal, engine
+from app.models import IndicatorScore, IndicatorValue
+from app.services.bulk_upsert import copy_upsert
+
+if TYPE_CHECKING:
+    from app.calculations.scoring_spec import ScoringSpec
+
+logger = logging.getLogger("diag360.scoring_engine")
+
+NORMALISATIONS = ("minmax", "zscore", "quantile", "threshold")
+ZSCORE_CLIP = 3.0
+LOAD_CHUNK_ROWS = 50_000
+SCORE_COLUMNS = ("id_epci", "id_indicateur", "annee", "score_indicateur", "rapport")
+# Undated year of the workbook import: its scores come from the workbook's
+# "Table Scores indicateurs" and are only recomputed when asked for explicitly.
+WORKBOOK_YEAR = 0
+# NUMERIC accepts these; they are no measurement and are scored as missing.
+NON_FINITE_VALUES = (Decimal("NaN"), Decimal("Infinity"), Decimal("-Infinity"))
+
+
+@dataclass
+class ValueMatrix:
+    """Raw values of one year; rows follow ``epci_ids``, columns ``indicator_ids``."""
+
+    year: int
+    epci_ids: List[str]
+    indicator_ids: List[str]
+    values: np.ndarray  # float64, NaN where there is no raw value
+
+    @property
+    def cells(self) -> int:
+        return int(np.count_nonzero(~np.isnan(self.values)))
+
+
+@dataclass
+class UnitResult:
+    """Scores of one (indicator, year) unit computed by a worker, with its timings.
+
+    A worker scores a whole chunk at once: the chunk's read and normalisation
+    times are shared out between its units by value count.
+    """
+
+    indicator_id: str
+    year: int
+    matrix: ValueMatrix
+    scores: np.ndarray
+    method: str
+    read_seconds: float
+    normalise_seconds: float
+
+
+def value_years(session: Session) -> List[int]:
+    """Dated years present in ``valeur_indicateur``, ascending (``WORKBOOK_YEAR`` left out)."""
+
+    year = cast(IndicatorValue.year, Integer)
+    statement = select(year).distinct().where(IndicatorValue.year != WORKBOOK_YEAR).order_by(year)
+    return list(session.execute(statement).scalars())
+
+
+def _has_value():
+    return IndicatorValue.value.is_not(None) & IndicatorValue.value.not_in(NON_FINITE_VALUES)
+
+
+def load_value_matrix(session: Session, year: int, indicator_ids: Optional[Sequence[str]] = None) -> ValueMatrix:
+    """Read the finite raw values of ``year`` (optionally some indicators) as a matrix."""
+
+    statement = (
+        select(IndicatorValue.epci_id, IndicatorValue.indicator_id, cast(IndicatorValue.value, DOUBLE_PRECISION))
+        .where(IndicatorValue.year == year, _has_value())
+        .execution_options(yield_per=LOAD_CHUNK_ROWS)
+    )
+    if indicator_ids is not None:
+        statement = statement.where(IndicatorValue.indicator_id.in_(list(indicator_ids)))
+    epcis, indicators, values = [], [], []
+    for partition in session.execute(statement).partitions():
+        columns = list(zip(*partition))
+        epcis.extend(columns[0])
+        indicators.extend(columns[1])
+        values.extend(columns[2])
+
+    epci_codes, epci_ids = pd.factorize(pd.Index(epcis, dtype=object), sort=True)
+    indicator_codes, found_ids = pd.factorize(pd.Index(indicators, dtype=object), sort=True)
+    matrix = np.full((len(epci_ids), len(found_ids)), np.nan)
+    matrix[epci_codes, indicator_codes] = np.array(values, dtype=np.float64)
+    return ValueMatrix(year=int(year), epci_ids=list(epci_ids), indicator_ids=list(found_ids), values=matrix)
+
+
+def _column_stat(function, values: np.ndarray) -> np.ndarray:
+    # All-NaN columns (indicator without any value) give NaN without a warning.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return function(values, axis=0)
+
+
+def normalise(
+    values: np.ndarray,
+    method: str = "minmax",
+    thresholds: Optional[Iterable] = None,
+    bounds: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> np.ndarray:
+    """0–100 scores of ``values`` (EPCI × indicator), column by column; NaN stays NaN.
+
+    ``thresholds`` (``threshold`` only) is ascending, either one sequence shared
+    by every column or an array of shape (thresholds, indicators) padded with
+    NaN when indicators have fewer thresholds. ``bounds`` (``minmax`` only) is a
+    (low, high) pair of per-indicator arrays replacing the observed min and
+    max; NaN entries keep the observed ones.
+    """
+
+    if method not in NORMALISATIONS:
+        raise ValueError(f"Normalisation inconnue : {method} (attendu : {', '.join(NORMALISATIONS)})")
+    missing = np.isnan(values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if method == "minmax":
+            low = _column_stat(np.nanmin, values)
+            high = _column_stat(np.nanmax, values)
+            if bounds is not None:
+                fixed_low, fixed_high = (np.asarray(bound, dtype=np.float64) for bound in bounds)
+                low = np.where(np.isnan(fixed_low), low, fixed_low)
+                high = np.where(np.isnan(fixed_high), high, fixed_high)
+            span = high - low
+            scores = np.where(span > 0, (values - low) / np.where(span > 0, span, 1.0), 0.0)
+        elif method == "zscore":
+            mean = _column_stat(np.nanmean, values)
+            std = _column_stat(np.nanstd, values)
+            z = np.where(std > 0, (values - mean) / np.where(std > 0, std, 1.0), 0.0)
+            scores = (np.clip(z, -ZSCORE_CLIP, ZSCORE_CLIP) + ZSCORE_CLIP) / (2 * ZSCORE_CLIP)
+        elif method == "quantile":
+            ranks = pd.DataFrame(values).rank(method="average").to_numpy()
+            count = (~missing).sum(axis=0)
+            scores = np.where(count > 1, (ranks - 1) / np.maximum(count - 1, 1), 0.0)
+        else:
+            if thresholds is None:
+                raise ValueError("La normalisation threshold exige des seuils")
+            levels = np.asarray(thresholds, dtype=np.float64)
+            if levels.ndim == 1:
+                levels = levels[:, np.newaxis]
+            if levels.ndim != 2 or levels.shape[0] == 0 or levels.shape[1] not in (1, values.shape[1]):
+                raise ValueError("Seuils attendus : une liste, ou une ligne de seuils par indicateur")
+            reached = (values[np.newaxis, :, :] >= levels[:, np.newaxis, :]).sum(axis=0)
+            scores = reached / np.maximum((~np.isnan(levels)).sum(axis=0), 1)
+    scores = round_half_up(np.clip(scores * 100, 0.0, 100.0), 2)
+    scores[missing] = np.nan
+    return scores
+
+
+def score_records(matrix: ValueMatrix, scores: np.ndarray, method: Union[str, Sequence[str]]) -> Iterator[tuple]:
+    """``SCORE_COLUMNS`` tuples for every cell with a raw value.
+
+    ``method`` labels the reports: one name, or one per indicator column.
+    """
+
+    epci_positions, indicator_positions = np.nonzero(~np.isnan(scores))
+    methods = [method] * len(matrix.indicator_ids) if isinstance(method, str) else list(method)
+    # Built as text: one json.dumps per cell would dominate the run.
+    reports = (
+        f'{{"methode": "{methods[position]}", "valeur_brute": {repr(value) if math.isfinite(value) else "null"}}}'
+        for position, value in zip(
+            indicator_positions.tolist(), matrix.values[epci_positions, indicator_positions].tolist()
+        )
+    )
+    epci_ids = [matrix.epci_ids[position] for position in epci_positions.tolist()]
+    indicator_ids = [matrix.indicator_ids[position] for position in indicator_positions.tolist()]
+    score_values = scores[epci_positions, indicator_positions].tolist()
+    for epci_id, indicator_id, score, report in zip(epci_ids, indicator_ids, score_values, reports):
+        yield epci_id, indicator_id, matrix.year, score, report
+
+
+def compute_scores(
+    matrix: ValueMatrix,
+    *,
+    method: str = "minmax",
+    thresholds: Optional[Iterable] = None,
+    spec: Optional[ScoringSpec] = None,
+) -> Tuple[np.ndarray, List[str]]:
+    """Scores of ``matrix`` and the method of each column (``spec`` rules when given)."""
+
+    if spec is None:
+        return normalise(matrix.values, method, thresholds), [method] * len(matrix.indicator_ids)
+    compiled = spec.compile(matrix.indicator_ids)
+    return compiled.apply(matrix.values), compiled.methods
+
+
+def write_indicator_scores(
+    session: Session, matrix: ValueMatrix, scores: np.ndarray, method: Union[str, Sequence[str]]
+) -> int:
+    """Upsert ``scores`` into ``score_indicateur`` (score and report only)."""
+
+    return copy_upsert(
+        session,
+        IndicatorScore.__table__,
+        SCORE_COLUMNS,
+        score_records(matrix, scores, method),
+        touch_columns=("updated_at",),
+    )
+
+
+def remove_stale_scores(session: Session, units: Iterable[Tuple[str, int]]) -> int:
+    """Delete scores of ``units`` (indicator, year) whose raw value is gone, NULL or non-finite."""
+
+    units = list(units)
+    if not units:
+        return 0
+    has_value = (
+        select(IndicatorValue.epci_id)
+        .where(
+            IndicatorValue.epci_id == IndicatorScore.epci_id,
+            IndicatorValue.indicator_id == IndicatorScore.indicator_id,
+            IndicatorValue.year == IndicatorScore.year,
+            _has_value(),
+        )
+        .exists()
+    )
+    statement = delete(IndicatorScore).where(
+        tuple_(IndicatorScore.indicator_id, IndicatorScore.year).in_(units),
+        ~has_value,
+    )
+    return session.execute(statement).rowcount
+
+
+def score_units(
+    session: Session,
+    indicators_by_year: Dict[int, Optional[Sequence[str]]],
+    *,
+    method: str = "minmax",
+    thresholds: Optional[Iterable] = None,
+    spec: Optional[ScoringSpec] = None,
+) -> Dict[int, int]:
+    """Score the given indicators (None: all) of each year; returns the rows written per year."""
+
+    written: Dict[int, int] = {}
+    for year, indicator_ids in indicators_by_year.items():
+        started = time.perf_counter()
+        matrix = load_value_matrix(session, year, indicator_ids)
+        loaded = time.perf_counter() - started
+        scores, methods = compute_scores(matrix, method=method, thresholds=thresholds, spec=spec)
+        normalised = time.perf_counter() - started - loaded
+        written[int(year)] = write_indicator_scores(session, matrix, scores, methods)
+        logger.info(
+            "Année %s : %s EPCI × %s indicateurs (%s valeurs) lus en %.2fs, normalisés (%s) en %.3fs, écrits en %.2fs",
+            year,
+            len(matrix.epci_ids),
+            len(matrix.indicator_ids),
+            matrix.cells,
+            loaded,
+            "spécification" if spec is not None else method,
+            normalised,
+            time.perf_counter() - started - loaded - normalised,
+        )
+    return written
+
+
+def score_years(
+    session: Session,
+    years: Iterable[int],
+    *,
+    indicator_ids: Optional[Sequence[str]] = None,
+    method: str = "minmax",
+    thresholds: Optional[Iterable] = None,
+    spec: Optional[ScoringSpec] = None,
+) -> Dict[int, int]:
+    """Score every (indicator, EPCI) cell of ``years``; returns the rows written per year."""
+
+    return score_units(
+        session, {year: indicator_ids for year in years}, method=method, thresholds=thresholds, spec=spec
+    )
+
+
+def _dispose_engine() -> None:
+    # Forked workers must not reuse the parent's pooled connections.
+    engine.dispose(close=False)
+
+
+def score_chunk(
+    indicator_ids: Sequence[str],
+    year: int,
+    method: str,
+    thresholds: Optional[Sequence[float]],
+    spec: Optional[ScoringSpec] = None,
+) -> List[UnitResult]:
+    """Read and normalise some indicators of one year in one session and query (worker side).
+
+    Returns one result per indicator, in ``indicator_ids`` order; an indicator
+    without any value gets an empty one.
+    """
+
+    started = time.perf_counter()
+    with SessionLocal() as session:
+        matrix = load_value_matrix(session, year, indicator_ids)
+    read = time.perf_counter() - started
+    scores, methods = compute_scores(matrix, method=method, thresholds=thresholds, spec=spec)
+    normalised = time.perf_counter() - started - read
+    cells = np.count_nonzero(~np.isnan(matrix.values), axis=0)
+    shares = cells / max(int(cells.sum()), 1)
+    columns = {indicator_id: column for column, indicator_id in enumerate(matrix.indicator_ids)}
+
+    results = []
+    for indicator_id in indicator_ids:
+        column = columns.get(indicator_id)
+        if column is None:
+            empty = ValueMatrix(year=int(year), epci_ids=[], indicator_ids=[indicator_id], values=np.empty((0, 1)))
+            results.append(UnitResult(indicator_id, int(year), empty, np.empty((0, 1)), method, 0.0, 0.0))
+            continue
+        # Units share the chunk's EPCI list (pickled once with the chunk).
+        unit = ValueMatrix(matrix.year, matrix.epci_ids, [indicator_id], matrix.values[:, [column]])
+        share = float(shares[column])
+        results.append(
+            UnitResult(
+                indicator_id, unit.year, unit, scores[:, [column]], methods[column], read * share, normalised * share
+            )
+        )
+    return results
+
+
+def _chunks(units: Iterable[Tuple[str, int]], jobs: int) -> List[Tuple[List[str], int]]:
+    """``(indicator_ids, year)`` groups: each year's units in about ``jobs`` chunks."""
+
+    by_year: Dict[int, List[str]] = {}
+    for indicator_id, year in sorted(units, key=lambda unit: (unit[1], unit[0])):
+        by_year.setdefault(year, []).append(indicator_id)
+    chunks = []
+    for year, indicator_ids in by_year.items():
+        size = math.ceil(len(indicator_ids) / jobs)
+        chunks.extend((indicator_ids[start : start + size], year) for start in range(0, len(indicator_ids), size))
+    return chunks
+
+
+def score_units_parallel(
+    units: Iterable[Tuple[str, int]],
+    jobs: int,
+    *,
+    method: str = "minmax",
+    thresholds: Optional[Sequence[float]] = None,
+    spec: Optional[ScoringSpec] = None,
+) -> List[UnitResult]:
+    """Score (indicator, year) ``units`` across ``jobs`` worker processes, nothing written.
+
+    Results come per unit, sorted by year then indicator. ``thresholds`` is
+    one sequence shared by every indicator; ``spec`` overrides both.
+    """
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_dispose_engine) as pool:
+        futures = [
+            pool.submit(score_chunk, indicator_ids, year, method, thresholds, spec)
+            for indicator_ids, year in _chunks(units, jobs)
+        ]
+        return [result for future in futures for result in future.result()]
+
+
+def write_unit_results(session: Session, results: Sequence[UnitResult]) -> int:
+    """Upsert the scores of every worker result into ``score_indicateur`` in one COPY."""
+
+    records = itertools.chain.from_iterable(
+        score_records(result.matrix, result.scores, result.method) for result in results
+    )
+    return copy_upsert(session, IndicatorScore.__table__, SCORE_COLUMNS, records, touch_columns=("updated_at",))
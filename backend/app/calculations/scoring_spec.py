@@ -0,0 +1,298 @@
+"""Declarative per-indicator scoring rules compiled into vectorised transforms.
+
+Rules live in a YAML file (``settings.scoring_spec_path``, e.g.
+``scripts/scores/scoring_spec.yaml``)::
+
+    version: 1
+    defaults:                 # every indicator not listed below
+      method: minmax
+    indicators:
+      i012:
+        direction: lower      # lower raw values are better
+        transform: log1p      # none | log | log1p | sqrt
+        clip: [0, 5000]       # cap raw values (either side may be null)
+        bounds: [0, 1000]     # minmax: fixed min/max instead of the observed ones
+      i027:
+        method: threshold
+        thresholds: [10, 25, 50]
+
+``clip``, ``bounds`` and ``thresholds`` are in raw units: raw values are capped
+first, then transformed, and the bounds and thresholds go through the same
+transform. A value outside the transform's domain (``log`` of 0) is placed at
+the lower bound (minmax ``bounds``), else at the lowest valid value of its
+indicator; when no value of the indicator is valid and there is no bound,
+all score as its lowest value (0, or 100 with ``direction: lower``). For a
+set of indicators, ``ScoringSpec.compile`` turns the rules into per-column
+arrays (caps, bounds, padded thresholds, masks). Applying them to an EPCI ×
+indicator matrix then costs one NumPy pass per transform and per method,
+however many indicators there are.
+"""
+from __future__ import annotations
+
+import math
+import warnings
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import yaml
+
+from app.calculations.scoring_engine import NORMALISATIONS, normalise
+from app.core.numeric import round_half_up
+
+SPEC_VERSION = 1
+DIRECTIONS = ("higher", "lower")
+TRANSFORMS = {"none": None, "log": np.log, "log1p": np.log1p, "sqrt": np.sqrt}
+# Smallest raw value each transform accepts (bounds and thresholds must respect it).
+DOMAINS = {"log": (0.0, False), "log1p": (-1.0, False), "sqrt": (0.0, True)}
+RULE_KEYS = ("method", "direction", "transform", "clip", "bounds", "thresholds")
+
+
+@dataclass(frozen=True)
+class IndicatorRule:
+    method: str = "minmax"
+    direction: str = "higher"
+    transform: str = "none"
+    clip: Tuple[Optional[float], Optional[float]] = (None, None)
+    bounds: Optional[Tuple[float, float]] = None
+    thresholds: Tuple[float, ...] = ()
+
+    def parameters(self) -> dict:
+        """JSON form recorded in ``score_filigrane`` (a change triggers a rescore)."""
+
+        return {
+            "methode": self.method,
+            "sens": self.direction,
+            "transformation": self.transform,
+            "plafonds": list(self.clip),
+            "bornes": list(self.bounds) if self.bounds else None,
+            "seuils": list(self.thresholds) or None,
+        }
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _pair_errors(value: Any, allow_null: bool) -> Optional[str]:
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        return "attendu : [min, max]"
+    if not all(_is_number(item) or (allow_null and item is None) for item in value):
+        return "bornes numériques attendues" + (" (ou null)" if allow_null else "")
+    if None not in value and value[0] >= value[1]:
+        return "min doit être strictement inférieur à max"
+    return None
+
+
+def _origin(key: str, entry: Dict[str, Any]) -> str:
+    return "" if key in entry else f" (hérité de defaults, {key}: null pour l'annuler)"
+
+
+def _rule_errors(path: str, entry: Any, base: Dict[str, Any]) -> List[str]:
+    if not isinstance(entry, dict):
+        return [f"{path} : dictionnaire attendu"]
+    errors = [f"{path}.{key} : clé inconnue (attendu : {', '.join(RULE_KEYS)})" for key in entry if key not in RULE_KEYS]
+    merged = {**base, **entry}
+    method = merged.get("method", "minmax")
+    if method not in NORMALISATIONS:
+        errors.append(f"{path}.method : {method!r} inconnue (attendu : {', '.join(NORMALISATIONS)})")
+    if merged.get("direction", "higher") not in DIRECTIONS:
+        errors.append(f"{path}.direction : attendu {' ou '.join(DIRECTIONS)}")
+    if merged.get("transform", "none") not in TRANSFORMS:
+        errors.append(f"{path}.transform : attendu {', '.join(TRANSFORMS)}")
+    if "clip" in entry and (problem := _pair_errors(entry["clip"], allow_null=True)):
+        errors.append(f"{path}.clip : {problem}")
+    # Checked on the merged rule: bounds or thresholds inherited from the
+    # defaults must suit the indicator's method too (null clears them).
+    if merged.get("bounds") is not None:
+        if method != "minmax":
+            errors.append(f"{path}.bounds{_origin('bounds', entry)} : réservé à la méthode minmax")
+        elif "bounds" in entry and (problem := _pair_errors(entry["bounds"], allow_null=False)):
+            errors.append(f"{path}.bounds : {problem}")
+    thresholds = merged.get("thresholds")
+    if method == "threshold":
+        if not isinstance(thresholds, list) or not thresholds or not all(_is_number(item) for item in thresholds):
+            errors.append(f"{path}.thresholds : liste non vide de nombres attendue pour la méthode threshold")
+        elif any(left >= right for left, right in zip(thresholds, thresholds[1:])):
+            errors.append(f"{path}.thresholds : valeurs strictement croissantes attendues")
+    elif thresholds is not None:
+        errors.append(f"{path}.thresholds{_origin('thresholds', entry)} : réservé à la méthode threshold")
+    transform = merged.get("transform", "none")
+    if transform in DOMAINS and not errors:
+        floor, inclusive = DOMAINS[transform]
+        limits = list((merged.get("bounds") or [])[:1])
+        if method == "threshold":
+            limits += thresholds
+        if any(value < floor or (value == floor and not inclusive) for value in limits):
+            comparison = ">=" if inclusive else ">"
+            errors.append(f"{path} : bornes et seuils doivent être {comparison} {floor:g} avec transform {transform}")
+    return errors
+
+
+def validate_spec(raw: Any, known_indicators: Optional[Iterable[str]] = None) -> List[str]:
+    """Error messages for a parsed spec document (empty when valid)."""
+
+    if not isinstance(raw, dict):
+        return ["spécification : dictionnaire YAML attendu"]
+    errors = [f"{key} : clé inconnue (attendu : version, defaults, indicators)" for key in raw if key not in ("version", "defaults", "indicators")]
+    if raw.get("version", SPEC_VERSION) != SPEC_VERSION:
+        errors.append(f"version : {raw.get('version')!r} non supportée (attendu : {SPEC_VERSION})")
+    defaults = raw.get("defaults") or {}
+    errors += _rule_errors("defaults", defaults, {})
+    indicators = raw.get("indicators") or {}
+    if not isinstance(indicators, dict):
+        return errors + ["indicators : dictionnaire {id_indicateur: règle} attendu"]
+    known = set(known_indicators) if known_indicators is not None else None
+    for indicator_id, entry in indicators.items():
+        if known is not None and str(indicator_id) not in known:
+            errors.append(f"indicators.{indicator_id} : indicateur absent de la table indicateur")
+        errors += _rule_errors(f"indicators.{indicator_id}", entry if entry is not None else {}, defaults if isinstance(defaults, dict) else {})
+    return errors
+
+
+def _rule(entry: Dict[str, Any]) -> IndicatorRule:
+    clip = entry.get("clip") or (None, None)
+    method = entry.get("method", "minmax")
+    bounds = entry.get("bounds") if method == "minmax" else None
+    return IndicatorRule(
+        method=method,
+        direction=entry.get("direction", "higher"),
+        transform=entry.get("transform", "none"),
+        clip=(clip[0], clip[1]),
+        bounds=(float(bounds[0]), float(bounds[1])) if bounds else None,
+        thresholds=tuple(float(value) for value in entry.get("thresholds") or ()) if method == "threshold" else (),
+    )
+
+
+@dataclass
+class CompiledSpec:
+    """Column-aligned arrays of the rules of ``indicator_ids``; see ``apply``."""
+
+    indicator_ids: List[str]
+    methods: List[str]
+    method_columns: Dict[str, np.ndarray]
+    transform_columns: Dict[str, np.ndarray]
+    clip_low: np.ndarray
+    clip_high: np.ndarray
+    bound_low: np.ndarray  # NaN: observed minimum
+    bound_high: np.ndarray
+    thresholds: np.ndarray  # (max thresholds, indicators), NaN-padded
+    reverse: np.ndarray
+
+    def transform(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Capped and transformed ``values``, and the mask of cells outside the transform's domain.
+
+        Out-of-domain cells (``log`` of 0, ``sqrt`` of -1) take the indicator's
+        lower bound when it has one, else its lowest valid value; they stay
+        NaN in a column without either (see ``apply``).
+        """
+
+        transformed = np.clip(values, self.clip_low, self.clip_high)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for name, columns in self.transform_columns.items():
+                transformed[:, columns] = TRANSFORMS[name](transformed[:, columns])
+        invalid = ~np.isfinite(transformed) & ~np.isnan(values)
+        if invalid.any():
+            transformed[invalid] = np.nan
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                floor = np.where(np.isnan(self.bound_low), np.nanmin(transformed, axis=0), self.bound_low)
+            transformed[invalid] = np.broadcast_to(floor, transformed.shape)[invalid]
+        return transformed, invalid
+
+    def apply(self, values: np.ndarray) -> np.ndarray:
+        """0–100 scores of ``values`` (EPCI × ``indicator_ids``); NaN stays NaN."""
+
+        transformed, invalid = self.transform(values)
+        scores = np.full(values.shape, np.nan)
+        for method, columns in self.method_columns.items():
+            options = {}
+            if method == "minmax":
+                options["bounds"] = (self.bound_low[columns], self.bound_high[columns])
+            elif method == "threshold":
+                options["thresholds"] = self.thresholds[:, columns]
+            scores[:, columns] = normalise(transformed[:, columns], method, **options)
+        # No valid value and no bound to place them: all score as the lowest
+        # value (rather than none, which would leave the previous scores).
+        scores[invalid & np.isnan(transformed)] = 0.0
+        scores[:, self.reverse] = round_half_up(100.0 - scores[:, self.reverse], 2)
+        return scores
+
+
+@dataclass(frozen=True)
+class ScoringSpec:
+    defaults: IndicatorRule = IndicatorRule()
+    rules: Dict[str, IndicatorRule] = field(default_factory=dict)
+
+    def rule(self, indicator_id: str) -> IndicatorRule:
+        return self.rules.get(indicator_id, self.defaults)
+
+    def parameters(self, indicator_id: str) -> dict:
+        return self.rule(indicator_id).parameters()
+
+    def compile(self, indicator_ids: Sequence[str]) -> CompiledSpec:
+        rules = [self.rule(indicator_id) for indicator_id in indicator_ids]
+        columns = len(rules)
+
+        def _masks(attribute: str) -> Dict[str, np.ndarray]:
+            groups: Dict[str, List[int]] = {}
+            for position, rule in enumerate(rules):
+                groups.setdefault(getattr(rule, attribute), []).append(position)
+            return {name: np.array(positions, dtype=np.intp) for name, positions in groups.items()}
+
+        def _raw(values: Iterable[Optional[float]], missing: float) -> np.ndarray:
+            return np.array([missing if value is None else value for value in values], dtype=np.float64)
+
+        clip_low = _raw((rule.clip[0] for rule in rules), -np.inf)
+        clip_high = _raw((rule.clip[1] for rule in rules), np.inf)
+        bound_low = _raw((rule.bounds[0] if rule.bounds else None for rule in rules), np.nan)
+        bound_high = _raw((rule.bounds[1] if rule.bounds else None for rule in rules), np.nan)
+        depth = max((len(rule.thresholds) for rule in rules), default=0)
+        thresholds = np.full((max(depth, 1), columns), np.nan)
+        for position, rule in enumerate(rules):
+            thresholds[: len(rule.thresholds), position] = rule.thresholds
+        transform_columns = {name: cols for name, cols in _masks("transform").items() if TRANSFORMS[name] is not None}
+        # Bounds and thresholds are given in raw units: transformed like the values.
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for name, cols in transform_columns.items():
+                function = TRANSFORMS[name]
+                bound_low[cols] = function(bound_low[cols])
+                bound_high[cols] = function(bound_high[cols])
+                thresholds[:, cols] = function(thresholds[:, cols])
+        return CompiledSpec(
+            indicator_ids=list(indicator_ids),
+            methods=[rule.method for rule in rules],
+            method_columns=_masks("method"),
+            transform_columns=transform_columns,
+            clip_low=clip_low,
+            clip_high=clip_high,
+            bound_low=bound_low,
+            bound_high=bound_high,
+            thresholds=thresholds,
+            reverse=np.array([rule.direction == "lower" for rule in rules], dtype=bool),
+        )
+
+
+def parse_spec(raw: Any, known_indicators: Optional[Iterable[str]] = None) -> ScoringSpec:
+    """Build a ``ScoringSpec`` from a parsed document; ValueError lists every problem."""
+
+    errors = validate_spec(raw, known_indicators)
+    if errors:
+        raise ValueError("\n".join(errors))
+    defaults = raw.get("defaults") or {}
+    return ScoringSpec(
+        defaults=_rule(defaults),
+        rules={str(indicator_id): _rule({**defaults, **(entry or {})}) for indicator_id, entry in (raw.get("indicators") or {}).items()},
+    )
+
+
+def load_spec(path: str | Path, known_indicators: Optional[Iterable[str]] = None) -> ScoringSpec:
+    """Read and validate the YAML spec at ``path`` (OSError, or ValueError listing every problem)."""
+
+    with open(path, encoding="utf-8") as handle:
+        try:
+            raw = yaml.safe_load(handle)
+        except yaml.YAMLError as exc:
+            raise ValueError(f"YAML invalide : {exc}") from exc
+    return parse_spec(raw or {}, known_indicators)
@@ -0,0 +1,158 @@
+"""Change watermark for incremental indicator scoring.
+
+A normalisation depends on the whole column of an indicator for a year, so
+the unit of work is the (indicator, year). ``score_filigrane`` keeps, per
+unit scored, the state of ``valeur_indicateur`` at that time and the
+normalisation parameters. The state is the latest ``date_import``, the row
+count and a checksum of the (EPCI, value) pairs: ``date_import`` is the
+writing transaction's start time, so a long import committing after a run
+can carry an older timestamp than the one recorded, and only the checksum
+tells its values apart. A unit is rescored only when its current state or the
+requested parameters differ from the recorded ones. Parameters are compared
+per indicator, so editing the rule of one indicator in a scoring spec
+rescores that indicator only.
+
+States are read before the values are loaded. A write committed in between
+is scored now and rescored once more next time; one committed later changes
+the checksum, whatever its ``date_import``.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import Integer, Text, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.calculations.scoring_engine import WORKBOOK_YEAR
+from app.models import IndicatorValue, ScoreWatermark
+
+Unit = Tuple[str, int]
+State = Tuple[Optional[datetime], int, Optional[Decimal]]
+NO_VALUES: State = (None, 0, None)
+
+REASON_NEW = "jamais calculé"
+REASON_VALUES = "valeurs modifiées"
+REASON_PARAMETERS = "paramètres modifiés"
+REASON_FORCED = "recalcul complet"
+
+
+@dataclass
+class ScoringPlan:
+    """Units to rescore (with the reason) and units skipped as up to date."""
+
+    parameters: Dict[Unit, dict] = field(default_factory=dict)
+    states: Dict[Unit, State] = field(default_factory=dict)
+    pending: Dict[Unit, str] = field(default_factory=dict)
+    skipped: List[Unit] = field(default_factory=list)
+
+    def pending_by_year(self) -> Dict[int, List[str]]:
+        by_year: Dict[int, List[str]] = {}
+        for indicator_id, year in sorted(self.pending):
+            by_year.setdefault(year, []).append(indicator_id)
+        return by_year
+
+    def skipped_by_year(self) -> Dict[int, List[str]]:
+        by_year: Dict[int, List[str]] = {}
+        for indicator_id, year in sorted(self.skipped):
+            by_year.setdefault(year, []).append(indicator_id)
+        return by_year
+
+
+def value_states(
+    session: Session, years: Optional[Sequence[int]] = None, indicator_ids: Optional[Sequence[str]] = None
+) -> Dict[Unit, State]:
+    """``(latest date_import, row count, checksum)`` of each (indicator, year) in ``valeur_indicateur``.
+
+    ``years`` None means every dated year: ``WORKBOOK_YEAR`` only when listed.
+    """
+
+    year = cast(IndicatorValue.year, Integer)
+    pair = IndicatorValue.epci_id + literal(":") + func.coalesce(cast(IndicatorValue.value, Text), "")
+    checksum = func.sum(func.hashtextextended(pair, 0))
+    statement = select(
+        IndicatorValue.indicator_id, year, func.max(IndicatorValue.date_import), func.count(), checksum
+    ).group_by(IndicatorValue.indicator_id, year)
+    if years is not None:
+        statement = statement.where(IndicatorValue.year.in_(list(years)))
+    else:
+        statement = statement.where(IndicatorValue.year != WORKBOOK_YEAR)
+    if indicator_ids is not None:
+        statement = statement.where(IndicatorValue.indicator_id.in_(list(indicator_ids)))
+    return {(indicator_id, unit_year): tuple(state) for indicator_id, unit_year, *state in session.execute(statement)}
+
+
+def plan_rescoring(
+    session: Session,
+    parameters: Union[dict, Callable[[str], dict]],
+    years: Optional[Sequence[int]] = None,
+    indicator_ids: Optional[Sequence[str]] = None,
+    full: bool = False,
+) -> ScoringPlan:
+    """Compare current value states with ``score_filigrane`` for the selected units.
+
+    ``parameters`` is one dict for every indicator or a callable giving the
+    dict of an indicator. Units with a watermark but no value left are pending
+    too, so their scores are removed. ``years`` None selects every dated year:
+    the workbook year keeps its imported scores unless listed.
+    """
+
+    parameters_of = parameters if callable(parameters) else (lambda _indicator_id: parameters)
+    plan = ScoringPlan(states=value_states(session, years, indicator_ids))
+    statement = select(ScoreWatermark)
+    if years is not None:
+        statement = statement.where(ScoreWatermark.year.in_(list(years)))
+    else:
+        statement = statement.where(ScoreWatermark.year != WORKBOOK_YEAR)
+    if indicator_ids is not None:
+        statement = statement.where(ScoreWatermark.indicator_id.in_(list(indicator_ids)))
+    watermarks = {(row.indicator_id, row.year): row for row in session.execute(statement).scalars()}
+    for unit in set(plan.states) | set(watermarks):
+        state = plan.states.setdefault(unit, NO_VALUES)
+        plan.parameters[unit] = parameters_of(unit[0])
+        watermark = watermarks.get(unit)
+        if full:
+            plan.pending[unit] = REASON_FORCED
+        elif watermark is None:
+            plan.pending[unit] = REASON_NEW
+        elif (watermark.last_import, watermark.value_count, watermark.checksum) != state:
+            plan.pending[unit] = REASON_VALUES
+        elif watermark.parameters != plan.parameters[unit]:
+            plan.pending[unit] = REASON_PARAMETERS
+        else:
+            plan.skipped.append(unit)
+    return plan
+
+
+def record_watermarks(session: Session, plan: ScoringPlan) -> int:
+    """Store the state each pending unit of ``plan`` was scored from."""
+
+    rows = [
+        {
+            "id_indicateur": indicator_id,
+            "annee": year,
+            "date_import_max": plan.states[indicator_id, year][0],
+            "nb_valeurs": plan.states[indicator_id, year][1],
+            "somme_controle": plan.states[indicator_id, year][2],
+            "parametres": plan.parameters[indicator_id, year],
+        }
+        for indicator_id, year in plan.pending
+    ]
+    if not rows:
+        return 0
+    upsert = pg_insert(ScoreWatermark.__table__).values(rows)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=["id_indicateur", "annee"],
+        set_={
+            "date_import_max": upsert.excluded.date_import_max,
+            "nb_valeurs": upsert.excluded.nb_valeurs,
+            "somme_controle": upsert.excluded.somme_controle,
+            "parametres": upsert.excluded.parametres,
+            "updated_at": func.now(),
+        },
+    )
+    session.execute(upsert)
+    return len(rows)
@@ -0,0 +1,261 @@
+import argparse
+import logging
+import os
+import statistics
+import time
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from app.calculations.scoring_engine import (
+    NORMALISATIONS,
+    compute_scores,
+    load_value_matrix,
+    remove_stale_scores,
+    score_units,
+    score_units_parallel,
+    write_unit_results,
+)
+from app.calculations.scoring_spec import ScoringSpec, load_spec
+from app.calculations.scoring_watermark import ScoringPlan, plan_rescoring, record_watermarks
+from app.core.config import settings
+from app.db import SessionLocal
+from app.models import Indicator, IndicatorScore
+from app.services.score_cube import publish_score_snapshot_after_commit
+from app.services.score_hierarchy import refresh_hierarchy_scores
+from app.services.score_publication import publish_scores
+
+logger = logging.getLogger("diag360.compute_indicator_scores")
+
+
+def _report_plan(plan) -> None:
+    for year, indicator_ids in plan.skipped_by_year().items():
+        logger.info("Année %s : %s indicateur(s) à jour ignoré(s) : %s", year, len(indicator_ids), ", ".join(indicator_ids))
+    for (indicator_id, year), reason in sorted(plan.pending.items(), key=lambda item: (item[0][1], item[0][0])):
+        logger.info("Année %s : %s à recalculer (%s)", year, indicator_id, reason)
+
+
+def _report_unit_timings(results, jobs: int, elapsed: float) -> None:
+    for result in results:
+        logger.info(
+            "  %-10s %s : %6s valeurs, lecture %7.1f ms, normalisation %6.2f ms",
+            result.indicator_id,
+            result.year,
+            result.matrix.cells,
+            result.read_seconds * 1000,
+            result.normalise_seconds * 1000,
+        )
+    busy = [result.read_seconds + result.normalise_seconds for result in results]
+    logger.info(
+        "%s unités sur %s processus en %.2fs : par unité p50=%.1f ms max=%.1f ms, somme %.2fs",
+        len(results),
+        jobs,
+        elapsed,
+        statistics.median(busy) * 1000,
+        max(busy) * 1000,
+        sum(busy),
+    )
+
+
+def _preview(session, plan: ScoringPlan, method: str, thresholds, spec: Optional[ScoringSpec]) -> None:
+    """Log, per pending unit, the rule applied and the resulting score distribution."""
+
+    for year, indicator_ids in plan.pending_by_year().items():
+        matrix = load_value_matrix(session, year, indicator_ids)
+        scores, methods = compute_scores(matrix, method=method, thresholds=thresholds, spec=spec)
+        invalid = np.zeros(scores.shape, dtype=bool)
+        if spec is not None:
+            invalid = spec.compile(matrix.indicator_ids).transform(matrix.values)[1]
+        current = np.full(scores.shape, np.nan)
+        rows = {epci_id: position for position, epci_id in enumerate(matrix.epci_ids)}
+        columns = {indicator_id: position for position, indicator_id in enumerate(matrix.indicator_ids)}
+        statement = select(IndicatorScore.epci_id, IndicatorScore.indicator_id, IndicatorScore.indicator_score).where(
+            IndicatorScore.year == year, IndicatorScore.indicator_id.in_(matrix.indicator_ids)
+        )
+        for epci_id, indicator_id, score in session.execute(statement):
+            if epci_id in rows and score is not None:
+                current[rows[epci_id], columns[indicator_id]] = float(score)
+        for column, indicator_id in enumerate(matrix.indicator_ids):
+            column_scores = scores[:, column][~np.isnan(scores[:, column])]
+            if not column_scores.size:
+                logger.info("  %-10s %s : aucune valeur", indicator_id, year)
+                continue
+            rule = spec.rule(indicator_id) if spec else None
+            delta = np.abs(scores[:, column] - current[:, column])
+            compared = ~np.isnan(delta)
+            logger.info(
+                "  %-10s %s %-9s %-6s %-5s : %5s valeurs, %s hors domaine, score min %6.2f / médiane %6.2f / max %6.2f, "
+                "écart moyen au score actuel %s",
+                indicator_id,
+                year,
+                methods[column],
+                rule.direction if rule else "higher",
+                rule.transform if rule else "none",
+                column_scores.size,
+                int(invalid[:, column].sum()),
+                column_scores.min(),
+                float(np.median(column_scores)),
+                column_scores.max(),
+                f"{delta[compared].mean():.2f} ({int(compared.sum())} EPCI)" if compared.any() else "n/a",
+            )
+
+
+def compute_indicator_scores(
+    years: Optional[list[int]] = None,
+    indicator_ids: Optional[list[str]] = None,
+    method: str = "minmax",
+    thresholds: Optional[list[float]] = None,
+    full: bool = False,
+    jobs: int = 1,
+    spec: Optional[ScoringSpec] = None,
+    dry_run: bool = False,
+) -> ScoringPlan:
+    started = time.perf_counter()
+    session = SessionLocal()
+    try:
+        parameters = spec.parameters if spec is not None else {"methode": method, "seuils": thresholds}
+        plan = plan_rescoring(session, parameters, years, indicator_ids, full=full)
+        _report_plan(plan)
+        if dry_run:
+            _preview(session, plan, method, thresholds, spec)
+            logger.info("Simulation : %s unité(s) à recalculer, rien n'est écrit.", len(plan.pending))
+            session.rollback()
+            return plan
+        if not plan.pending:
+            logger.info("Aucune valeur modifiée depuis le dernier calcul (%s unités à jour) : rien à recalculer.", len(plan.skipped))
+            session.rollback()
+            return plan
+        pending = plan.pending_by_year()
+        if jobs > 1:
+            pool_started = time.perf_counter()
+            results = score_units_parallel(plan.pending, jobs, method=method, thresholds=thresholds, spec=spec)
+            _report_unit_timings(results, jobs, time.perf_counter() - pool_started)
+            write_unit_results(session, results)
+        else:
+            score_units(session, pending, method=method, thresholds=thresholds, spec=spec)
+        removed = remove_stale_scores(session, plan.pending)
+        if removed:
+            logger.info("%s scores sans valeur brute supprimés", removed)
+        record_watermarks(session, plan)
+        refresh_hierarchy_scores(session, years=pending)
+        publish_started = time.perf_counter()
+        publish_scores(session, years=pending)
+        logger.info("Publication des scores en %.2fs", time.perf_counter() - publish_started)
+        session.commit()
+        publish_score_snapshot_after_commit()
+    except Exception:
+        session.rollback()
+        logger.exception("Échec du calcul des scores indicateurs.")
+        raise
+    finally:
+        session.close()
+    logger.info(
+        "%s unité(s) indicateur × année recalculée(s) (%s), %s ignorée(s), années %s, en %.2fs",
+        len(plan.pending),
+        "spécification" if spec is not None else method,
+        len(plan.skipped),
+        sorted(pending),
+        time.perf_counter() - started,
+    )
+    return plan
+
+
+def main(argv: Optional[list[str]] = None):
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(
+        description=(
+            "Calcule score_indicateur à partir de valeur_indicateur (normalisation vectorisée). "
+            "Seuls les couples indicateur × année dont les valeurs ont changé depuis le dernier calcul sont recalculés."
+        )
+    )
+    parser.add_argument(
+        "--year",
+        type=int,
+        action="append",
+        dest="years",
+        default=None,
+        help=(
+            "Année à calculer (répéter l'argument ; défaut : toutes les années datées de valeur_indicateur, "
+            "l'année 0 du classeur n'est recalculée qu'avec --year 0)."
+        ),
+    )
+    parser.add_argument(
+        "--indicator",
+        action="append",
+        dest="indicators",
+        default=None,
+        help="ID indicateur (répéter l'argument ; défaut : tous).",
+    )
+    parser.add_argument(
+        "--method",
+        choices=NORMALISATIONS,
+        default=None,
+        help="Normalisation appliquée à tous les indicateurs, sans spécification (défaut : minmax).",
+    )
+    parser.add_argument(
+        "--thresholds",
+        default=None,
+        help="Seuils croissants séparés par des virgules (normalisation threshold), ex. 10,20,50.",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Recalculer toutes les unités sélectionnées, même sans changement dans valeur_indicateur.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help=(
+            "Processus de calcul : les couples indicateur × année sont répartis entre N workers, "
+            "puis écrits en un seul upsert (0 : un par cœur ; défaut : 1, lecture par année)."
+        ),
+    )
+    parser.add_argument(
+        "--spec",
+        default=settings.scoring_spec_path,
+        help=(
+            "Spécification YAML des règles par indicateur (sens, plafonds, transformation, bornes, seuils) ; "
+            "défaut : SCORING_SPEC_PATH."
+        ),
+    )
+    parser.add_argument("--no-spec", action="store_true", help="Ignorer la spécification et appliquer --method à tous.")
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Valider la spécification et afficher, par unité à recalculer, la distribution des scores sans rien écrire.",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs doit être positif ou nul")
+    spec_path = None if args.no_spec or args.method else args.spec
+    method = args.method or "minmax"
+
+    thresholds = None
+    if args.thresholds:
+        try:
+            thresholds = [float(value) for value in args.thresholds.split(",")]
+        except ValueError:
+            parser.error("--thresholds attend des nombres séparés par des virgules")
+    if method == "threshold" and not thresholds:
+        parser.error("--method threshold exige --thresholds")
+    spec = None
+    if spec_path:
+        with SessionLocal() as session:
+            known = session.execute(select(Indicator.id)).scalars().all()
+        try:
+            spec = load_spec(spec_path, known)
+        except OSError as exc:
+            parser.error(f"Spécification illisible : {exc}")
+        except ValueError as exc:
+            parser.error(f"Spécification invalide ({spec_path}) :\n{exc}")
+        logger.info("Spécification %s : %s règle(s) spécifique(s)", spec_path, len(spec.rules))
+    jobs = args.jobs or os.cpu_count() or 1
+    compute_indicator_scores(
+        args.years, args.indicators, method, thresholds, full=args.full, jobs=jobs, spec=spec, dry_run=args.dry_run
+    )
+
+
+if __name__ == "__main__":
+    main()
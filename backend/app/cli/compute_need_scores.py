@@ -0,0 +1,65 @@
+import argparse
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import Integer, cast, select
+
+from app.db import SessionLocal
+from app.models import IndicatorScore
+from app.services.score_cube import publish_score_snapshot_after_commit
+from app.services.score_hierarchy import refresh_hierarchy_scores
+from app.services.score_publication import publish_scores
+
+logger = logging.getLogger("diag360.compute_need_scores")
+
+
+def compute_need_scores(data_year: Optional[int] = None) -> tuple[int, int, int]:
+    started = time.perf_counter()
+    session = SessionLocal()
+    try:
+        if data_year is None:
+            year = cast(IndicatorScore.year, Integer)
+            years = list(session.execute(select(year).distinct().order_by(year)).scalars())
+        else:
+            years = [data_year]
+        changed = refresh_hierarchy_scores(session, years=years)
+        if not any(changed):
+            logger.info("Aucun score modifié pour %s : publication ignorée.", years)
+            session.rollback()
+            return changed
+        publish_started = time.perf_counter()
+        publish_scores(session, years=years)
+        logger.info("Publication des scores en %.2fs", time.perf_counter() - publish_started)
+        session.commit()
+        publish_score_snapshot_after_commit()
+    except Exception:
+        session.rollback()
+        logger.exception("Échec du calcul des scores besoins.")
+        raise
+    finally:
+        session.close()
+    logger.info("Scores besoins calculés pour %s en %.2fs", years, time.perf_counter() - started)
+    return changed
+
+
+def main(argv: Optional[list[str]] = None):
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(
+        description=(
+            "Agrège score_indicateur en scores besoins / objectifs / types / global "
+            "(score_indicateur et score_global) via les tables de correspondance."
+        )
+    )
+    parser.add_argument(
+        "--data-year",
+        type=int,
+        default=None,
+        help="Année à recalculer (défaut : toutes les années de score_indicateur).",
+    )
+    args = parser.parse_args(argv)
+    compute_need_scores(args.data_year)
+
+
+if __name__ == "__main__":
+    main()
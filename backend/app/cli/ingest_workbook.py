@@ -1,6 +1,7 @@
 import argparse
 import logging
 import sys
+import time
 import unicodedata
 from collections import defaultdict
 from decimal import Decimal, InvalidOperation
@@ -12,9 +13,14 @@ from sqlalchemy import select
 
 from app.db import Base, SessionLocal, engine
 from app.models import Epci, Indicator, IndicatorScore, IndicatorType, IndicatorValue, Need, Objective
+from app.services.bulk_upsert import copy_upsert
+from app.services.score_cube import publish_score_snapshot_after_commit
+from app.services.score_publication import publish_scores
 
 logger = logging.getLogger("diag360.ingest_workbook")
 
+DEFAULT_BATCH_SIZE = 50_000
+
 
 def normalise_str(value) -> Optional[str]:
     if pd.isna(value):
@@ -356,59 +362,73 @@ def _attach_epci_metadata(df: pd.DataFrame, id_column: str, label_column: str |
     return df, metadata
 
 
-def ingest_indicator_values(session, df: pd.DataFrame):
+def normalise_code_series(series: pd.Series) -> pd.Series:
+    """Vectorised `normalise_code`: numeric codes (1.0, 2e8...) become integer strings."""
+    text = series.astype("string").str.strip()
+    text = text.mask(text.str.lower().isin(["", "nan", "none", "<na>"]))
+    numeric = pd.to_numeric(text, errors="coerce")
+    integral = numeric.notna() & (numeric % 1 == 0)
+    text = text.mask(integral, numeric.where(integral).astype("Int64").astype("string"))
+    return text
+
+
+def _long_indicator_frame(df: pd.DataFrame, value_column_name: str) -> pd.DataFrame | None:
     df = _normalise_columns(df)
     id_column = _detect_epci_column(df)
     label_column = _detect_epci_label_column(df)
-    indicator_cols = _detect_indicator_columns(df)
+    indicator_cols = [col for col in _detect_indicator_columns(df) if col not in (id_column, label_column)]
     if not indicator_cols:
+        return None
+    df, _ = _attach_epci_metadata(df, id_column, label_column)
+    df = df.rename(columns={col: normalise_indicator_id(col) for col in indicator_cols})
+    indicator_ids = list(dict.fromkeys(normalise_indicator_id(col) for col in indicator_cols))
+    if label_column:
+        labels = df["LIBELLE_EPCI"].astype("string").str.strip()
+        df["LIBELLE_EPCI"] = labels.mask(labels.str.lower().isin(["", "nan", "none", "<na>"]))
+    else:
+        df["LIBELLE_EPCI"] = pd.NA
+    df["ID_EPCI"] = normalise_code_series(df["ID_EPCI"])
+    df = df.loc[:, ~df.columns.duplicated(keep="last")]
+    long_df = _melt_indicator_values(df, indicator_ids, "ID_EPCI", value_column_name)
+    long_df = long_df.merge(df[["ID_EPCI", "LIBELLE_EPCI"]].drop_duplicates("ID_EPCI"), on="ID_EPCI", how="left")
+    long_df[value_column_name] = pd.to_numeric(long_df[value_column_name], errors="coerce")
+    return long_df
+
+
+def _frame_records(df: pd.DataFrame, columns: list[str]) -> list[tuple]:
+    frame = df[columns].astype(object)
+    return list(frame.where(frame.notna(), None).itertuples(index=False, name=None))
+
+
+def _upsert_in_batches(session, table, columns: list[str], df: pd.DataFrame, batch_size: int, touch_column: str) -> int:
+    written = 0
+    for start in range(0, len(df), batch_size):
+        chunk = df.iloc[start : start + batch_size]
+        written += copy_upsert(session, table, columns, _frame_records(chunk, columns), touch_columns=(touch_column,))
+    return written
+
+
+def ingest_indicator_values(session, df: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE):
+    long_df = _long_indicator_frame(df, "valeur_brute")
+    if long_df is None:
         logger.warning("Aucune colonne indicateur (prefix i###) détectée dans Table Valeurs.")
         return
-    df, metadata = _attach_epci_metadata(df, id_column, label_column)
-    long_df = _melt_indicator_values(df, indicator_cols, "ID_EPCI", "value")
-    long_df = long_df.merge(metadata, on="ID_EPCI", how="left")
-    for row in iter_rows(long_df):
-        epci = normalise_code(row.get("ID_EPCI"))
-        indicator_id = normalise_indicator_id(row.get("indicator_id"))
-        if not epci or not indicator_id:
-            continue
-        value = to_float(row.get("value"))
-        record = IndicatorValue(
-            epci_id=epci,
-            indicator_id=indicator_id,
-            year=0,
-            value=value,
-            source="Excel/Table Valeurs",
-            libelle_epci=normalise_str(row.get("LIBELLE_EPCI")),
-        )
-        session.merge(record)
+    long_df = long_df.rename(columns={"ID_EPCI": "id_epci", "indicator_id": "id_indicateur", "LIBELLE_EPCI": "libelle_epci"})
+    long_df["annee"] = 0
+    long_df["source"] = "Excel/Table Valeurs"
+    columns = ["id_epci", "id_indicateur", "annee", "libelle_epci", "valeur_brute", "source"]
+    _upsert_in_batches(session, IndicatorValue.__table__, columns, long_df, batch_size, "date_import")
 
 
-def ingest_indicator_scores(session, df: pd.DataFrame):
-    df = _normalise_columns(df)
-    id_column = _detect_epci_column(df)
-    label_column = _detect_epci_label_column(df)
-    indicator_cols = _detect_indicator_columns(df)
-    if not indicator_cols:
+def ingest_indicator_scores(session, df: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE):
+    long_df = _long_indicator_frame(df, "score_indicateur")
+    if long_df is None:
         logger.warning("Aucune colonne indicateur détectée dans Table Scores indicateurs.")
         return
-    df, metadata = _attach_epci_metadata(df, id_column, label_column)
-    long_df = _melt_indicator_values(df, indicator_cols, "ID_EPCI", "score")
-    long_df = long_df.merge(metadata, on="ID_EPCI", how="left")
-    for row in iter_rows(long_df):
-        epci = normalise_code(row.get("ID_EPCI"))
-        indicator_id = normalise_indicator_id(row.get("indicator_id"))
-        if not epci or not indicator_id:
-            continue
-        score = to_float(row.get("score"))
-        record = IndicatorScore(
-            epci_id=epci,
-            indicator_id=indicator_id,
-            year=0,
-            indicator_score=score,
-            libelle_epci=normalise_str(row.get("LIBELLE_EPCI")),
-        )
-        session.merge(record)
+    long_df = long_df.rename(columns={"ID_EPCI": "id_epci", "indicator_id": "id_indicateur", "LIBELLE_EPCI": "libelle_epci"})
+    long_df["annee"] = 0
+    columns = ["id_epci", "id_indicateur", "annee", "libelle_epci", "score_indicateur"]
+    _upsert_in_batches(session, IndicatorScore.__table__, columns, long_df, batch_size, "updated_at")
 
 
 SHEETS_MAPPING = {
@@ -425,9 +445,14 @@ SHEETS_MAPPING = {
 }
 
 
-def ingest_workbook(path: Path):
+BATCHED_SHEETS = {"Table Valeurs", "Table Scores indicateurs"}
+
+
+def ingest_workbook(path: Path, batch_size: int = DEFAULT_BATCH_SIZE):
     logging.info("Lecture du classeur %s", path)
+    started = time.perf_counter()
     xl = pd.read_excel(path, sheet_name=list(SHEETS_MAPPING.keys()), dtype=object)
+    timings: list[tuple[str, int, float]] = [("(lecture XLSX)", 0, time.perf_counter() - started)]
     session = SessionLocal()
     try:
         for sheet_name, func in SHEETS_MAPPING.items():
@@ -436,8 +461,22 @@ def ingest_workbook(path: Path):
                 logger.warning("Onglet %s introuvable, ignore.", sheet_name)
                 continue
             logger.info("Ingestion de l’onglet %s (%s lignes)", sheet_name, len(df))
-            func(session, df)
+            sheet_started = time.perf_counter()
+            if sheet_name in BATCHED_SHEETS:
+                func(session, df, batch_size=batch_size)
+            else:
+                func(session, df)
+            session.flush()
+            timings.append((sheet_name, len(df), time.perf_counter() - sheet_started))
+        publish_started = time.perf_counter()
+        publish_scores(session, years=[0])
+        timings.append(("(publication des scores)", 0, time.perf_counter() - publish_started))
+        commit_started = time.perf_counter()
         session.commit()
+        timings.append(("(commit)", 0, time.perf_counter() - commit_started))
+        snapshot_started = time.perf_counter()
+        if publish_score_snapshot_after_commit() is not None:
+            timings.append(("(snapshot des scores)", 0, time.perf_counter() - snapshot_started))
         logger.info("Import terminé.")
     except Exception:
         session.rollback()
@@ -446,19 +485,32 @@ def ingest_workbook(path: Path):
     finally:
         session.close()
 
+    logger.info("Durées par onglet :")
+    for sheet_name, row_count, elapsed in timings:
+        logger.info("  %-35s %8s lignes %8.2fs", sheet_name, row_count or "-", elapsed)
+    logger.info("  %-35s %8s        %8.2fs", "TOTAL", "", time.perf_counter() - started)
+
 
 def main():
     logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
     parser = argparse.ArgumentParser(description="Ingestion complète Diag360_EvolV2.xlsx")
     parser.add_argument("--file", required=True, help="Chemin vers le fichier XLSX")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help="Nombre de lignes par COPY/upsert pour Table Valeurs et Table Scores indicateurs",
+    )
     args = parser.parse_args()
 
     path = Path(args.file)
     if not path.exists():
         raise FileNotFoundError(path)
+    if args.batch_size <= 0:
+        parser.error("--batch-size doit être strictement positif")
 
     Base.metadata.create_all(bind=engine)
-    ingest_workbook(path)
+    ingest_workbook(path, batch_size=args.batch_size)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,26 @@
+import argparse
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.services.score_cube import publish_score_snapshot
+
+
+def main(argv: Optional[list[str]] = None):
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(
+        description="Publie le snapshot mmap des scores (cube NumPy) lu par les workers de l'API."
+    )
+    parser.add_argument(
+        "--dir",
+        default=settings.score_snapshot_dir,
+        help="Répertoire des snapshots (défaut : SCORE_SNAPSHOT_DIR).",
+    )
+    args = parser.parse_args(argv)
+    if not args.dir:
+        parser.error("--dir ou SCORE_SNAPSHOT_DIR requis")
+    publish_score_snapshot(args.dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,8 +20,26 @@ class Settings(BaseSettings):
 
     database_url: str | None = None
 
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_connect_timeout_seconds: int = 10
+    db_statement_timeout_ms: int = 30000
+
     cors_origins: List[AnyHttpUrl] = [AnyHttpUrl("http://localhost:5173")]
 
+    score_cache_enabled: bool = True
+    score_cache_max_entries: int = 1024
+    score_cache_ttl_seconds: float = 3600.0
+    data_version_probe_seconds: float = 2.0
+    score_http_max_age: int = 300
+    score_batch_max_epcis: int = 50
+    score_cube_enabled: bool = False
+    score_snapshot_dir: str | None = None
+    score_snapshot_keep: int = 3
+    scoring_spec_path: str | None = None
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
     @field_validator("database_url", mode="before")
@@ -0,0 +1,14 @@
+"""Numeric helpers shared by the scoring pipeline and the API serving layer."""
+from __future__ import annotations
+
+import numpy as np
+
+
+def round_half_up(values, digits: int):
+    """NUMERIC rounding (half away from zero, scores are positive) of float values.
+
+    Pre-rounding to 9 decimals absorbs float noise on exact halves (61.315).
+    """
+
+    scale = 10**digits
+    return np.floor(np.round(values, 9) * scale + 0.5) / scale
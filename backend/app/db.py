@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, sessionmaker
 
 from app.core.config import settings
@@ -8,9 +9,29 @@ class Base(DeclarativeBase):
     """Base class for all ORM models."""
 
 
-engine = create_engine(settings.database_url, future=True, pool_pre_ping=True)
+def _engine_options() -> dict:
+    connect_args = {"connect_timeout": settings.db_connect_timeout_seconds}
+    if settings.db_statement_timeout_ms:
+        connect_args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+    return {
+        "pool_pre_ping": True,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "connect_args": connect_args,
+    }
+
+
+# Synchronous engine: CLIs, ingestion scripts and the remaining sync routes.
+engine = create_engine(settings.database_url, future=True, **_engine_options())
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, future=True)
 
+# Async engine (psycopg async driver): score routes await PostgreSQL instead of
+# holding a threadpool worker. The pool is per event loop/process.
+async_engine = create_async_engine(settings.database_url, **_engine_options())
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db():
     db = SessionLocal()
@@ -18,3 +39,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,7 +1,7 @@
 from app.db import Base
 
 from .diag360_ref import Indicator, IndicatorNeedLink, IndicatorObjectiveLink, IndicatorType, IndicatorTypeLink, Need, Objective  # noqa: F401
-from .diag360_raw import Epci, IndicatorScore, IndicatorValue  # noqa: F401
+from .diag360_raw import DataVersion, Epci, IndicatorScore, IndicatorValue, ScoreDimension, ScoreGlobal, ScoreRank, ScoreRollup, ScoreWatermark  # noqa: F401
 
 __all__ = [
     "Base",
@@ -15,4 +15,10 @@ __all__ = [
     "Epci",
     "IndicatorValue",
     "IndicatorScore",
+    "ScoreGlobal",
+    "ScoreRollup",
+    "ScoreRank",
+    "ScoreDimension",
+    "ScoreWatermark",
+    "DataVersion",
 ]
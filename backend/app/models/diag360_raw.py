@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Numeric, String, Text, func
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, Numeric, String, Text, func
 from sqlalchemy.dialects.postgresql import JSONB
 
 from app.db import Base
@@ -38,6 +38,7 @@ class IndicatorValue(Base):
     epci_id = Column("id_epci", String, ForeignKey("epci.id_epci", ondelete="CASCADE"), primary_key=True)
     indicator_id = Column("id_indicateur", String, ForeignKey("indicateur.id_indicateur", ondelete="CASCADE"), primary_key=True)
     year = Column("annee", Numeric, primary_key=True, default=0)
+    epci_label = Column("libelle_epci", Text)
     value = Column("valeur_brute", Numeric)
     unit = Column("unite", Text)
     source = Column(Text)
@@ -51,6 +52,7 @@ class IndicatorScore(Base):
     epci_id = Column("id_epci", String, ForeignKey("epci.id_epci", ondelete="CASCADE"), primary_key=True)
     indicator_id = Column("id_indicateur", String, ForeignKey("indicateur.id_indicateur", ondelete="CASCADE"), primary_key=True)
     year = Column("annee", Numeric, primary_key=True, default=0)
+    epci_label = Column("libelle_epci", Text)
     indicator_score = Column("score_indicateur", Numeric(5, 2))
     need_id = Column("id_besoin", String, ForeignKey("besoin.id_besoin"))
     need_score = Column("score_besoin", Numeric(5, 2))
@@ -61,3 +63,93 @@ class IndicatorScore(Base):
     global_score = Column("score_global", Numeric(5, 2))
     report = Column("rapport", JSONB)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
+class ScoreGlobal(Base):
+    __tablename__ = "score_global"
+
+    epci_id = Column("id_epci", String, ForeignKey("epci.id_epci", ondelete="CASCADE"), primary_key=True)
+    year = Column("annee", Integer, primary_key=True, default=0)
+    epci_label = Column("libelle_epci", Text)
+    department_code = Column("departement_code", Text)
+    region_code = Column("region_code", Text)
+    global_score = Column("score_global", Numeric(5, 2))
+    need_score = Column("score_besoin", Numeric(5, 2))
+    objective_score = Column("score_objectif", Numeric(5, 2))
+    type_score = Column("score_type", Numeric(5, 2))
+    indicator_count = Column("nb_indicateurs", Integer, nullable=False, default=0)
+    report = Column("rapport", JSONB)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class ScoreRollup(Base):
+    """Department / region averages of EPCI scores per dimension and year."""
+
+    __tablename__ = "score_rollup"
+
+    level = Column("niveau", Text, primary_key=True)
+    year = Column("annee", Integer, primary_key=True)
+    dimension = Column(Text, primary_key=True)
+    dimension_id = Column("id_dimension", Text, primary_key=True, default="")
+    code = Column(Text, primary_key=True)
+    average = Column("score_moyen", Numeric(5, 2))
+    weighted_average = Column("score_pondere", Numeric(5, 2))
+    epci_count = Column("nb_epci", Integer, nullable=False, default=0)
+    population = Column(Numeric)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class ScoreRank(Base):
+    """National and department rank of each EPCI score per dimension and year."""
+
+    __tablename__ = "score_rank"
+
+    year = Column("annee", Integer, primary_key=True)
+    epci_id = Column("id_epci", String, ForeignKey("epci.id_epci", ondelete="CASCADE"), primary_key=True)
+    dimension = Column(Text, primary_key=True)
+    dimension_id = Column("id_dimension", Text, primary_key=True, default="")
+    rank = Column("rang", Integer, nullable=False)
+    epci_count = Column("nb_epci", Integer, nullable=False)
+    percentile = Column(Numeric(4, 1))
+    quartile = Column(Integer)
+    department_rank = Column("rang_departement", Integer)
+    department_count = Column("nb_epci_departement", Integer)
+    department_percentile = Column("percentile_departement", Numeric(4, 1))
+    department_quartile = Column("quartile_departement", Integer)
+
+
+class ScoreDimension(Base):
+    """Need / objective / type score of each EPCI and year, over every indicator link."""
+
+    __tablename__ = "score_dimension"
+
+    year = Column("annee", Integer, primary_key=True)
+    epci_id = Column("id_epci", String, ForeignKey("epci.id_epci", ondelete="CASCADE"), primary_key=True)
+    dimension = Column(Text, primary_key=True)
+    dimension_id = Column("id_dimension", Text, primary_key=True)
+    score = Column(Numeric(5, 2))
+    indicator_count = Column("nb_indicateurs", Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class ScoreWatermark(Base):
+    """State of ``valeur_indicateur`` when an (indicator, year) was last scored."""
+
+    __tablename__ = "score_filigrane"
+
+    indicator_id = Column("id_indicateur", String, ForeignKey("indicateur.id_indicateur", ondelete="CASCADE"), primary_key=True)
+    year = Column("annee", Integer, primary_key=True)
+    last_import = Column("date_import_max", DateTime(timezone=True))
+    value_count = Column("nb_valeurs", Integer, nullable=False, default=0)
+    # Sum of hashtextextended(id_epci || ':' || valeur_brute) over the unit's rows.
+    checksum = Column("somme_controle", Numeric)
+    parameters = Column("parametres", JSONB, nullable=False, server_default="{}")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class DataVersion(Base):
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True, default=1)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
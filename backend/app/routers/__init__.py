@@ -1,9 +1,10 @@
 from fastapi import APIRouter
 
-from . import health, scores
+from . import health, scores, territories
 
 api_router = APIRouter()
 api_router.include_router(health.router)
 api_router.include_router(scores.router)
+api_router.include_router(territories.router)
 
 __all__ = ["api_router"]
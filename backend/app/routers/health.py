@@ -1,8 +1,21 @@
 from fastapi import APIRouter
 
+from app.services.score_cube import score_cube_stats
+from app.services.score_service import response_cache
+
 router = APIRouter(prefix="/health", tags=["health"])
 
 
 @router.get("", summary="Health check")
 def healthcheck():
     return {"status": "ok"}
+
+
+@router.get("/cache", summary="Score response cache metrics")
+def cache_metrics():
+    return response_cache.stats()
+
+
+@router.get("/cube", summary="In-memory score cube status")
+def cube_status():
+    return score_cube_stats()
@@ -1,29 +1,192 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+import hashlib
 
-from app.db import get_db
-from app.schemas import ScoreDetail, ScoreListResponse
-from app.services import score_service
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db import AsyncSessionLocal, get_async_db
+from app.schemas import (
+    ScoreBatchRequest,
+    ScoreBatchResponse,
+    ScoreDetail,
+    ScoreHistoryResponse,
+    ScoreListResponse,
+    ScoreRollupResponse,
+    ScoreWeightedRequest,
+    ScoreWeightedResponse,
+    ScoreYearsResponse,
+)
+from app.services import score_export, score_service, score_weighting
+from app.services.data_version import current_data_version_async
 
 router = APIRouter(prefix="/scores", tags=["scores"])
 
 
+def _etag(request: Request, version: int) -> str:
+    params = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha256(f"{version}|{request.url.path}|{params}".encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def _cache_headers(etag: str) -> dict[str, str]:
+    max_age = settings.score_http_max_age
+    return {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={max_age}",
+    }
+
+
+async def _not_modified(request: Request, response: Response, db: AsyncSession) -> Response | None:
+    """Answer ``If-None-Match`` with 304 before any service call; otherwise set cache headers."""
+
+    etag = _etag(request, await current_data_version_async(db))
+    headers = _cache_headers(etag)
+    # If-None-Match uses weak comparison: W/"x" matches "x".
+    candidates = {tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")}
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def _carried_headers(response: Response) -> dict[str, str]:
+    return {key: response.headers[key] for key in ("etag", "cache-control") if key in response.headers}
+
+
+def _orjson(content, response: Response) -> ORJSONResponse:
+    """Serialize plain ``content`` with orjson, skipping ``response_model`` re-validation.
+
+    The route keeps its ``response_model`` for the OpenAPI schema; the cache
+    headers set by ``_not_modified`` are carried over.
+    """
+
+    return ORJSONResponse(content, headers=_carried_headers(response))
+
+
 @router.get("", response_model=ScoreListResponse, summary="List EPCI scores")
-def list_scores(
+async def list_scores(
+    request: Request,
+    response: Response,
     search: str | None = Query(default=None, min_length=2, description="Filter by name or SIREN"),
     limit: int = Query(default=50, le=2000),
     offset: int = Query(default=0),
     order_by: str = Query(default="name", pattern="^(name|score|code)$"),
     year: int | None = Query(default=None, description="Target year (defaults to latest)"),
-    db: Session = Depends(get_db),
+    after: str | None = Query(
+        default=None,
+        description="Keyset cursor (next_cursor of the previous page); offset is ignored when set",
+    ),
+    include_total: bool = Query(default=True, description="Compute the total row count"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    not_modified = await _not_modified(request, response, db)
+    if not_modified is not None:
+        return not_modified
+    try:
+        payload = await score_service.list_scores_async(
+            db=db,
+            search=search,
+            limit=limit,
+            offset=offset,
+            order_by=order_by,
+            year=year,
+            after=after,
+            include_total=include_total,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return _orjson(payload, response)
+
+
+@router.get("/years", response_model=ScoreYearsResponse, summary="List years with published scores")
+async def list_years(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    not_modified = await _not_modified(request, response, db)
+    if not_modified is not None:
+        return not_modified
+    return await score_service.list_years_async(db=db)
+
+
+@router.get(
+    "/rollup",
+    response_model=ScoreRollupResponse,
+    summary="Department or region averages of EPCI scores (choropleth)",
+)
+async def get_score_rollup(
+    request: Request,
+    response: Response,
+    level: str = Query(default="department", pattern="^(department|region)$"),
+    year: int | None = Query(default=None, description="Target year (defaults to latest)"),
+    dimension: str | None = Query(
+        default=None,
+        pattern="^(global|need|objective|type)$",
+        description="Restrict to one dimension (all by default)",
+    ),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    return score_service.list_scores(
-        db=db,
-        search=search,
-        limit=limit,
-        offset=offset,
-        order_by=order_by,
-        year=year,
+    not_modified = await _not_modified(request, response, db)
+    if not_modified is not None:
+        return not_modified
+    payload = await score_service.get_score_rollup_async(db=db, level=level, year=year, dimension=dimension)
+    return _orjson(payload, response)
+
+
+@router.post(
+    "/batch",
+    response_model=ScoreBatchResponse,
+    summary="Retrieve detailed scores for several EPCIs in one request",
+)
+async def get_score_details_batch(payload: ScoreBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    try:
+        return await score_service.get_score_details_batch_async(db=db, epci_ids=payload.epci_ids, year=payload.year)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+@router.post(
+    "/weighted",
+    response_model=ScoreWeightedResponse,
+    summary="Re-rank every EPCI under custom need, objective or type weights",
+)
+async def get_weighted_scores(payload: ScoreWeightedRequest, db: AsyncSession = Depends(get_async_db)):
+    try:
+        ranking = await score_weighting.get_weighted_scores_async(
+            db=db,
+            dimension=payload.dimension,
+            weights=payload.weights,
+            year=payload.year,
+            limit=payload.limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return ORJSONResponse(ranking)
+
+
+@router.get(
+    "/export",
+    summary="Stream every indicator score of a year (CSV, NDJSON or Parquet)",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in score_export.MEDIA_TYPES.values()}}},
+)
+async def export_scores(
+    request: Request,
+    response: Response,
+    year: int | None = Query(default=None, description="Target year (defaults to latest)"),
+    format: str = Query(default="csv", pattern="^(csv|ndjson|parquet)$"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    not_modified = await _not_modified(request, response, db)
+    if not_modified is not None:
+        return not_modified
+    if format == "parquet" and not score_export.parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export requires pyarrow")
+    target_year = await score_service.resolve_year_async(db, year)
+    headers = _carried_headers(response)
+    headers["Content-Disposition"] = f'attachment; filename="scores_{target_year}.{format}"'
+    return StreamingResponse(
+        score_export.stream_export(AsyncSessionLocal, target_year, format),
+        media_type=score_export.MEDIA_TYPES[format],
+        headers=headers,
     )
 
 
@@ -32,12 +195,38 @@ def list_scores(
     response_model=ScoreDetail,
     summary="Retrieve detailed scores for an EPCI",
 )
-def get_score_detail(
+async def get_score_detail(
+    request: Request,
+    response: Response,
     epci_id: str,
     year: int | None = Query(default=None, description="Target year (defaults to latest)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
+):
+    not_modified = await _not_modified(request, response, db)
+    if not_modified is not None:
+        return not_modified
+    try:
+        return await score_service.get_score_detail_async(db=db, epci_id=epci_id, year=year)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+@router.get(
+    "/{epci_id}/history",
+    response_model=ScoreHistoryResponse,
+    summary="All years of an EPCI's scores with year-over-year deltas",
+    description="Only dated years with a score are listed; the undated workbook year 0 is excluded.",
+)
+async def get_score_history(
+    request: Request,
+    response: Response,
+    epci_id: str,
+    db: AsyncSession = Depends(get_async_db),
 ):
+    not_modified = await _not_modified(request, response, db)
+    if not_modified is not None:
+        return not_modified
     try:
-        return score_service.get_score_detail(db=db, epci_id=epci_id, year=year)
+        return await score_service.get_score_history_async(db=db, epci_id=epci_id)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
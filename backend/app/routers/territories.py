@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.schemas import TerritorySearchResponse
+from app.services import search_service
+
+router = APIRouter(prefix="/territories", tags=["territories"])
+
+
+@router.get("/search", response_model=TerritorySearchResponse, summary="Autocomplete EPCI by name or SIREN")
+def search_territories(
+    term: str = Query(min_length=2, description="Name fragment (accent-insensitive) or SIREN prefix"),
+    limit: int = Query(default=10, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    return search_service.search_territories(db=db, term=term, limit=limit)
@@ -1,10 +1,23 @@
 from .report import FlashReportRequest, FlashReportResponse, FlashMetric
+from .territory import TerritorySearchResponse, TerritorySearchResult
 from .score import (
     ScoreSummary,
     ScoreListResponse,
+    ScoreYearsResponse,
+    ScoreBatchRequest,
+    ScoreBatchResponse,
+    ScoreWeightedRequest,
+    ScoreWeightedResponse,
+    WeightedScore,
+    ScoreRollupResponse,
+    RollupScore,
+    ScoreHistoryResponse,
+    ScoreHistorySeries,
+    ScoreHistoryPoint,
     ScoreDetail,
     IndicatorScoreDetail,
     AggregatedScore,
+    RankDetail,
 )
 
 __all__ = [
@@ -13,7 +26,21 @@ __all__ = [
     "FlashMetric",
     "ScoreSummary",
     "ScoreListResponse",
+    "ScoreYearsResponse",
+    "ScoreBatchRequest",
+    "ScoreBatchResponse",
+    "ScoreWeightedRequest",
+    "ScoreWeightedResponse",
+    "WeightedScore",
+    "ScoreRollupResponse",
+    "RollupScore",
+    "ScoreHistoryResponse",
+    "ScoreHistorySeries",
+    "ScoreHistoryPoint",
     "ScoreDetail",
     "IndicatorScoreDetail",
     "AggregatedScore",
+    "RankDetail",
+    "TerritorySearchResponse",
+    "TerritorySearchResult",
 ]
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class ScoreSummary(BaseModel):
@@ -16,13 +16,31 @@ class ScoreSummary(BaseModel):
 
 class ScoreListResponse(BaseModel):
     items: List[ScoreSummary]
-    total: int
+    total: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class ScoreYearsResponse(BaseModel):
+    years: List[int]
+    latest: Optional[int] = None
+
+
+class RankDetail(BaseModel):
+    rank: int
+    count: int
+    percentile: Optional[float] = None
+    quartile: Optional[int] = None
+    department_rank: Optional[int] = None
+    department_count: Optional[int] = None
+    department_percentile: Optional[float] = None
+    department_quartile: Optional[int] = None
 
 
 class AggregatedScore(BaseModel):
     id: Optional[str] = None
     label: Optional[str] = None
     score: Optional[float] = None
+    rank: Optional[RankDetail] = None
 
 
 class IndicatorScoreDetail(BaseModel):
@@ -38,11 +56,86 @@ class IndicatorScoreDetail(BaseModel):
     type_id: Optional[str] = None
     type_label: Optional[str] = None
     type_score: Optional[float] = None
+    rank: Optional[RankDetail] = None
 
 
 class ScoreDetail(BaseModel):
     summary: ScoreSummary
+    rank: Optional[RankDetail] = None
     needs: List[AggregatedScore]
     objectives: List[AggregatedScore]
     types: List[AggregatedScore]
     indicators: List[IndicatorScoreDetail]
+
+
+class ScoreBatchRequest(BaseModel):
+    epci_ids: List[str] = Field(min_length=1)
+    year: Optional[int] = None
+
+
+class ScoreBatchResponse(BaseModel):
+    year: int
+    items: List[ScoreDetail]
+    missing: List[str] = []
+
+
+class ScoreWeightedRequest(BaseModel):
+    dimension: str = Field(default="need", pattern="^(need|objective|type)$")
+    weights: Dict[str, float] = Field(
+        min_length=1,
+        description="Weight per need, objective or type id (e.g. {\"BV1\": 2, \"BS1\": 1}); missing ids weigh 0",
+    )
+    year: Optional[int] = None
+    limit: Optional[int] = Field(default=None, ge=1, description="Return only the top N EPCIs (all by default)")
+
+
+class WeightedScore(BaseModel):
+    rank: Optional[int] = None
+    epci_id: str
+    epci_label: str
+    department_code: Optional[str] = None
+    region_code: Optional[str] = None
+    score: Optional[float] = None
+
+
+class ScoreWeightedResponse(BaseModel):
+    dimension: str
+    year: int
+    weights: Dict[str, float]
+    total: int
+    items: List[WeightedScore]
+
+
+class RollupScore(BaseModel):
+    code: str
+    dimension: str
+    dimension_id: Optional[str] = None
+    average: Optional[float] = None
+    weighted_average: Optional[float] = None
+    epci_count: int
+    population: Optional[float] = None
+
+
+class ScoreRollupResponse(BaseModel):
+    level: str
+    year: int
+    items: List[RollupScore]
+
+
+class ScoreHistoryPoint(BaseModel):
+    year: int
+    score: Optional[float] = None
+    delta: Optional[float] = None
+
+
+class ScoreHistorySeries(BaseModel):
+    dimension: str
+    id: Optional[str] = None
+    label: Optional[str] = None
+    points: List[ScoreHistoryPoint]
+
+
+class ScoreHistoryResponse(BaseModel):
+    epci_id: str
+    years: List[int]
+    series: List[ScoreHistorySeries]
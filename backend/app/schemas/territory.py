@@ -0,0 +1,15 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class TerritorySearchResult(BaseModel):
+    epci_id: str
+    epci_label: str
+    department_code: Optional[str] = None
+    region_code: Optional[str] = None
+    rank: float
+
+
+class TerritorySearchResponse(BaseModel):
+    items: List[TerritorySearchResult]
@@ -1,5 +1,19 @@
-from .report_service import generate_flash_report
+# Submodules are imported on use (``from app.services import score_cube``), not
+# here: the batch scoring workers import ``bulk_upsert`` alone and must not load
+# the API serving modules (starlette, cube holder).
 
 __all__ = [
-    "generate_flash_report",
+    "bulk_upsert",
+    "data_version",
+    "score_cube",
+    "score_export",
+    "score_hierarchy",
+    "score_publication",
+    "score_rank",
+    "score_rollup",
+    "score_service",
+    "score_snapshot",
+    "score_summary",
+    "score_weighting",
+    "search_service",
 ]
@@ -0,0 +1,132 @@
+"""Set-based writers for the large Diag360 tables.
+
+Rows are streamed through PostgreSQL ``COPY`` into a temporary staging table,
+then merged into the target with a single ``INSERT ... ON CONFLICT DO UPDATE``.
+This replaces the per-row ``session.merge`` pattern (one SELECT + one
+INSERT/UPDATE per row) used by the ingestion scripts.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import time
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import Table, text
+from sqlalchemy.orm import Session
+
+from app.models import IndicatorValue
+
+logger = logging.getLogger("diag360.bulk_upsert")
+
+VALUE_COLUMNS = ("id_epci", "id_indicateur", "annee", "valeur_brute", "unite", "source", "meta")
+
+
+def _json(value: Any) -> str | None:
+    if value is None:
+        return None
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def copy_upsert(
+    session: Session,
+    table: Table,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    *,
+    update_columns: Sequence[str] | None = None,
+    touch_columns: Sequence[str] = (),
+) -> int:
+    """Upsert ``rows`` (tuples ordered like ``columns``) into ``table``.
+
+    The conflict target is the table primary key. ``update_columns`` defaults to
+    every non-key column in ``columns``; ``touch_columns`` are set to ``now()``
+    on both insert and update. Duplicated keys inside ``rows`` keep a single
+    occurrence. The caller owns the transaction (no commit here).
+    """
+
+    started = time.perf_counter()
+    session.flush()
+    key_columns = [col.name for col in table.primary_key.columns]
+    missing = [col for col in key_columns if col not in columns]
+    if missing:
+        raise ValueError(f"Colonnes de clé manquantes pour {table.name}: {missing}")
+    if update_columns is None:
+        update_columns = [col for col in columns if col not in key_columns]
+
+    staging = f"_stage_{table.name}"
+    column_list = ", ".join(columns)
+    key_list = ", ".join(key_columns)
+    insert_columns = list(columns) + [col for col in touch_columns if col not in columns]
+    select_list = ", ".join(list(columns) + ["now()" for col in touch_columns if col not in columns])
+    assignments = [f"{col} = EXCLUDED.{col}" for col in update_columns]
+    assignments += [f"{col} = now()" for col in touch_columns]
+
+    session.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+    session.execute(
+        text(f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS SELECT {column_list} FROM {table.name} WITH NO DATA")
+    )
+
+    dbapi_connection = session.connection().connection.dbapi_connection
+    staged = 0
+    with dbapi_connection.cursor() as cursor:
+        with cursor.copy(f"COPY {staging} ({column_list}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(row)
+                staged += 1
+
+    if staged == 0:
+        session.execute(text(f"DROP TABLE {staging}"))
+        return 0
+
+    conflict_action = f"DO UPDATE SET {', '.join(assignments)}" if assignments else "DO NOTHING"
+    session.execute(
+        text(
+            f"""
+            INSERT INTO {table.name} ({", ".join(insert_columns)})
+            SELECT DISTINCT ON ({key_list}) {select_list}
+            FROM {staging}
+            ORDER BY {key_list}
+            ON CONFLICT ({key_list}) {conflict_action}
+            """
+        )
+    )
+    session.execute(text(f"DROP TABLE {staging}"))
+
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "%s : %s lignes upsertées en %.2fs (%.0f lignes/s)",
+        table.name,
+        staged,
+        elapsed,
+        staged / elapsed if elapsed > 0 else float("inf"),
+    )
+    return staged
+
+
+def upsert_indicator_values(session: Session, rows: Iterable[Any], *, default_source: str | None = None) -> int:
+    """Bulk upsert of ``RawValue``-like objects into ``valeur_indicateur``.
+
+    Each row exposes ``epci_id``, ``indicator_id``, ``year``, ``value`` and
+    optionally ``unit``, ``source`` and ``meta``.
+    """
+
+    records = (
+        (
+            str(row.epci_id),
+            str(row.indicator_id),
+            int(row.year),
+            row.value,
+            getattr(row, "unit", None),
+            getattr(row, "source", None) or default_source,
+            _json(getattr(row, "meta", None) or {}),
+        )
+        for row in rows
+    )
+    return copy_upsert(
+        session,
+        IndicatorValue.__table__,
+        VALUE_COLUMNS,
+        records,
+        touch_columns=("date_import",),
+    )
@@ -0,0 +1,81 @@
+"""Small thread-safe TTL + LRU cache with data-version invalidation."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class VersionedTTLCache:
+    """LRU cache whose entries expire after ``ttl`` seconds or when the data version changes."""
+
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[int, float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _sync_version(self, version: int) -> None:
+        if self._version != version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key: Hashable, version: int) -> tuple[bool, Any]:
+        now = time.monotonic()
+        with self._lock:
+            self._sync_version(version)
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[2]
+
+    def set(self, key: Hashable, version: int, value: Any) -> None:
+        with self._lock:
+            if self._version is not None and version < self._version:
+                return
+            self._sync_version(version)
+            self._entries[key] = (version, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key: Hashable, version: int, factory: Callable[[], Any]) -> Any:
+        found, value = self.get(key, version)
+        if found:
+            return value
+        value = factory()
+        self.set(key, version, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "data_version": self._version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,78 @@
+"""Published data version, used to invalidate in-process caches.
+
+Writers bump the single ``data_version`` row in the same transaction as the
+scores they publish. Readers probe it at most once every
+``settings.data_version_probe_seconds`` per process.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.diag360_raw import DataVersion
+
+
+def bump_data_version(session: Session) -> int:
+    stmt = pg_insert(DataVersion).values(id=1, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[DataVersion.id],
+        set_={"version": DataVersion.version + 1, "updated_at": func.now()},
+    ).returning(DataVersion.version)
+    return int(session.execute(stmt).scalar_one())
+
+
+class _VersionProbe:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._version: int | None = None
+        self._checked_at = 0.0
+
+    _statement = select(DataVersion.version).where(DataVersion.id == 1)
+
+    def _fresh(self, now: float) -> bool:
+        return self._version is not None and now - self._checked_at < settings.data_version_probe_seconds
+
+    def _store(self, version, now: float) -> int:
+        with self._lock:
+            self._version = int(version or 0)
+            self._checked_at = now
+            return self._version
+
+    def get(self, db: Session) -> int:
+        now = time.monotonic()
+        if self._fresh(now):
+            return self._version
+        return self._store(db.execute(self._statement).scalar(), now)
+
+    async def get_async(self, db: AsyncSession) -> int:
+        now = time.monotonic()
+        if self._fresh(now):
+            return self._version
+        return self._store((await db.execute(self._statement)).scalar(), now)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._version = None
+
+
+_probe = _VersionProbe()
+
+
+def current_data_version(db: Session) -> int:
+    return _probe.get(db)
+
+
+async def current_data_version_async(db: AsyncSession) -> int:
+    return await _probe.get_async(db)
+
+
+def reset_data_version_probe() -> None:
+    """Force the next ``current_data_version`` call to hit the database."""
+
+    _probe.reset()
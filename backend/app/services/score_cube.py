@@ -0,0 +1,756 @@
+"""In-memory NumPy cube of ``score_indicateur`` answering the score routes without SQL.
+
+Enabled by ``settings.score_cube_enabled``. Every score column is held as a
+float32 EPCI × indicator × year array (NaN where there is no row or no score),
+with the need/objective/type of each row as int16 codes, index maps and the
+reference labels. Per-EPCI need, objective and type scores are read from
+``score_dimension`` and global scores derived once per load (the values of
+``score_rollup.epci_dimension_scores``), so listings, details with their
+ranks and department/region rollups are plain array operations.
+
+A cube is immutable. When the published data version moves, the next request
+loads a new one in a worker thread (concurrent requests use SQL meanwhile) and
+the reference is swapped in one assignment. With ``settings.score_snapshot_dir``
+the cube is memory-mapped from the snapshot the pipeline publishes
+(``publish_score_snapshot``, see ``score_snapshot``) instead of read from the
+database by every worker.
+"""
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+import unicodedata
+from collections import namedtuple
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import BigInteger, Integer, cast, func, select
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.numeric import round_half_up
+from app.db import SessionLocal
+from app.models.diag360_raw import DataVersion, Epci, IndicatorScore, ScoreDimension
+from app.models.diag360_ref import Indicator, IndicatorType, Need, Objective
+from app.schemas.score import AggregatedScore, IndicatorScoreDetail, RankDetail, ScoreDetail, ScoreSummary
+from app.services import score_snapshot
+from app.services.data_version import current_data_version, current_data_version_async
+
+logger = logging.getLogger("diag360.score_cube")
+
+SCORE_COLUMNS = ("indicator_score", "need_score", "objective_score", "type_score", "global_score")
+GROUP_DIMENSIONS = ("need", "objective", "type")
+DIMENSIONS = ("global",) + GROUP_DIMENSIONS + ("indicator",)
+LOAD_CHUNK_ROWS = 50_000
+
+# Same field order as score_service._SUMMARY_FIELDS (rows feed _list_payload).
+SummaryRow = namedtuple(
+    "SummaryRow",
+    ("epci_id", "epci_label", "department_code", "region_code", "global_score", "indicator_count", "updated_at"),
+)
+
+
+def fold_label(value: str) -> str:
+    """Accent- and case-insensitive form of a label (``f_unaccent_lower`` in SQL)."""
+
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def _stored_scores(values: np.ndarray) -> np.ndarray:
+    """float32 cube values back to the NUMERIC(5,2) they were read from, as float64."""
+
+    return np.round(values.astype(np.float64), 2)
+
+
+def _grouped_means(values: np.ndarray, codes: np.ndarray, groups: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean of ``values`` per (EPCI, code, year) and the number of rows behind it.
+
+    ``codes`` has the shape of ``values`` with -1 for rows outside any group
+    (or missing). NULL scores count as rows but not in the mean, as AVG does.
+    Sums are exact (integer hundredths), so equal means compare equal for ranking.
+    """
+
+    epcis, _, years = values.shape
+    in_group = codes >= 0
+    epci_idx, _, year_idx = np.nonzero(in_group)
+    flat = (epci_idx * groups + codes[in_group]) * years + year_idx
+    size = epcis * groups * years
+    scores = np.rint(values[in_group] * 100)
+    known = ~np.isnan(scores)
+    sums = np.bincount(flat[known], weights=scores[known], minlength=size)
+    counts = np.bincount(flat[known], minlength=size)
+    rows = np.bincount(flat, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(counts > 0, sums / np.maximum(counts, 1) / 100, np.nan)
+    shape = (epcis, groups, years)
+    return means.reshape(shape), rows.reshape(shape)
+
+
+def _rank_arrays(matrix: np.ndarray, own: np.ndarray):
+    """Rank (1 = best), count, percentile and quartile of ``own`` within ``matrix`` columns.
+
+    Same definitions as ``score_rank._rank_columns``: RANK() by descending score
+    and PERCENT_RANK() by ascending score over the non-NULL scores.
+    """
+
+    count = (~np.isnan(matrix)).sum(axis=0)
+    higher = (matrix > own).sum(axis=0)
+    lower = (matrix < own).sum(axis=0)
+    percent_rank = np.where(count > 1, lower / np.maximum(count - 1, 1), 0.0)
+    percentile = round_half_up(percent_rank * 100, 1)
+    quartile = np.minimum(4, np.floor(percent_rank * 4) + 1)
+    return higher + 1, count, percentile, quartile
+
+
+def _rank_lists(matrix: np.ndarray, own: np.ndarray) -> list:
+    rank, count, percentile, quartile = _rank_arrays(matrix, own)
+    return [rank.tolist(), count.tolist(), percentile.tolist(), quartile.astype(np.int64).tolist()]
+
+
+def derive_arrays(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Per-EPCI indicator count, indicator and global scores computed from the loaded arrays.
+
+    Part of ``ScoreCube.arrays`` so that snapshots carry them too. Need,
+    objective and type scores are loaded as is from ``score_dimension``.
+    """
+
+    present = arrays["present"]
+    derived = {
+        "indicator_count": present.sum(axis=1, dtype=np.int32),
+        "epci_indicator_score": _stored_scores(arrays["indicator_score"]),
+    }
+    derived["epci_global_score"], global_rows = _grouped_means(
+        _stored_scores(arrays["global_score"]), np.where(present, 0, -1), 1
+    )
+    derived["epci_global_rows"] = global_rows.astype(np.int32)
+    return derived
+
+
+class ScoreCube:
+    """One immutable load of ``score_indicateur`` for every EPCI, indicator and year.
+
+    ``meta`` holds the JSON-serialisable index lists and labels, ``arrays`` the
+    NumPy arrays (possibly read-only memory maps of a snapshot); derived
+    per-dimension arrays are computed at construction when absent.
+    """
+
+    def __init__(self, meta: dict, arrays: Dict[str, np.ndarray]) -> None:
+        if "indicator_count" not in arrays:
+            arrays = {**arrays, **derive_arrays(arrays)}
+        self.meta = meta
+        self.arrays = arrays
+        self.version = int(meta["version"])
+        self.years: List[int] = [int(year) for year in meta["years"]]
+        self.epci_ids: List[str] = list(meta["epci_ids"])
+        self.epci_labels: List[str] = list(meta["epci_labels"])
+        self.department_codes: List[Optional[str]] = list(meta["department_codes"])
+        self.region_codes: List[Optional[str]] = list(meta["region_codes"])
+        self.indicator_ids: List[str] = list(meta["indicator_ids"])
+        self.indicator_labels: List[str] = list(meta["indicator_labels"])
+        self.dimension_ids: Dict[str, List[str]] = {
+            dimension: list(meta["dimension_ids"][dimension]) for dimension in GROUP_DIMENSIONS
+        }
+        self.dimension_labels: Dict[str, Dict[str, str]] = {
+            dimension: dict(meta["dimension_labels"][dimension]) for dimension in GROUP_DIMENSIONS
+        }
+        self.dimension_ids["global"] = [""]
+        self.dimension_ids["indicator"] = self.indicator_ids
+
+        self.year_index = {year: position for position, year in enumerate(self.years)}
+        self.epci_index = {epci_id: position for position, epci_id in enumerate(self.epci_ids)}
+        self._folded_labels = [fold_label(label) for label in self.epci_labels]
+
+        self.indicator_count = arrays["indicator_count"]
+        # Per-EPCI score and row count of every dimension: (EPCI, dimension id, year).
+        self.scores: Dict[str, np.ndarray] = {dimension: arrays[f"epci_{dimension}_score"] for dimension in DIMENSIONS}
+        self.rows: Dict[str, np.ndarray] = {
+            dimension: arrays[f"epci_{dimension}_rows"] for dimension in DIMENSIONS if dimension != "indicator"
+        }
+        self.rows["indicator"] = arrays["present"]
+        self._orders: Dict[tuple, tuple] = {}
+        self._groups: Dict[str, tuple] = {}
+
+    # -- listing -----------------------------------------------------------------
+
+    def _list_score(self, epci: int, year: int) -> Optional[float]:
+        value = self.scores["global"][epci, 0, year]
+        return None if np.isnan(value) else float(round_half_up(value, 2))
+
+    @staticmethod
+    def _sort_key(order_by: str, score: Optional[float], label: str, epci_id: str) -> tuple:
+        if order_by == "code":
+            return (epci_id,)
+        if order_by == "score":
+            # score DESC NULLS LAST, id ASC
+            return (1, 0.0, epci_id) if score is None else (0, -score, epci_id)
+        # Code point order, as the SQL path's COLLATE "C": cursors work across both.
+        return (label, epci_id)
+
+    def _order(self, year: int, order_by: str) -> tuple:
+        """Listed EPCIs of ``year`` in ``order_by`` order with their sort keys (memoised)."""
+
+        key = (year, order_by)
+        cached = self._orders.get(key)
+        if cached is None:
+            listed = np.flatnonzero(self.indicator_count[:, year] > 0)
+            keyed = sorted(
+                (
+                    self._sort_key(
+                        order_by,
+                        self._list_score(epci, year),
+                        self.epci_labels[epci],
+                        self.epci_ids[epci],
+                    ),
+                    epci,
+                )
+                for epci in listed
+            )
+            cached = (
+                np.array([epci for _, epci in keyed], dtype=np.int64),
+                [sort_key for sort_key, _ in keyed],
+            )
+            self._orders[key] = cached
+        return cached
+
+    def _search_mask(self, search: str) -> np.ndarray:
+        term = search.strip()
+        # Same rule as search_service.epci_search_clause: digits are a SIREN prefix.
+        if term.isdigit():
+            return np.array([epci_id.startswith(term) for epci_id in self.epci_ids], dtype=bool)
+        folded = fold_label(term)
+        return np.array([folded in label for label in self._folded_labels], dtype=bool)
+
+    def list_rows(
+        self,
+        search: Optional[str],
+        limit: int,
+        offset: int,
+        order_by: str,
+        year: int,
+        keyset: Optional[Tuple[Optional[str], str]],
+        include_total: bool,
+    ) -> Tuple[List[SummaryRow], Optional[int]]:
+        """One page of EPCI summaries and the total, as ``score_service.list_scores`` pages them."""
+
+        position = self.year_index.get(year)
+        if position is None:
+            return [], 0 if include_total else None
+        order, keys = self._order(position, order_by)
+        candidates = np.arange(len(order))
+        if search:
+            candidates = np.flatnonzero(self._search_mask(search)[order])
+        total = int(len(candidates)) if include_total else None
+
+        if keyset is not None:
+            sort_key, epci_id = keyset
+            score = float(sort_key) if order_by == "score" and sort_key is not None else None
+            start = bisect.bisect_right(keys, self._sort_key(order_by, score, sort_key, epci_id))
+            candidates = candidates[np.searchsorted(candidates, start):]
+        else:
+            candidates = candidates[offset:]
+
+        updated_at = self.arrays["updated_at"]
+        rows = []
+        for epci in order[candidates[:limit]]:
+            rows.append(
+                SummaryRow(
+                    self.epci_ids[epci],
+                    self.epci_labels[epci],
+                    self.department_codes[epci],
+                    self.region_codes[epci],
+                    self._list_score(epci, position),
+                    int(self.indicator_count[epci, position]),
+                    _timestamp(updated_at[epci, position]),
+                )
+            )
+        return rows, total
+
+    # -- detail ------------------------------------------------------------------
+
+    def _ranks(self, dimension: str, epci: int, year: int) -> List[Optional[RankDetail]]:
+        """National and department rank of the EPCI for every id of ``dimension``."""
+
+        matrix = self.scores[dimension][:, :, year]
+        own = matrix[epci]
+        national = _rank_lists(matrix, own)
+        department = [[None] * len(own)] * 4
+        if self.department_codes[epci] is not None:
+            _, group_of = self._group_index("department")
+            department = _rank_lists(matrix[group_of == group_of[epci]], own)
+
+        ranks: List[Optional[RankDetail]] = []
+        for column, missing in enumerate(np.isnan(own).tolist()):
+            if missing:
+                ranks.append(None)
+                continue
+            ranks.append(
+                RankDetail(
+                    rank=national[0][column],
+                    count=national[1][column],
+                    percentile=national[2][column],
+                    quartile=national[3][column],
+                    department_rank=department[0][column],
+                    department_count=department[1][column],
+                    department_percentile=department[2][column],
+                    department_quartile=department[3][column],
+                )
+            )
+        return ranks
+
+    def _aggregates(self, dimension: str, epci: int, year: int) -> List[AggregatedScore]:
+        ranks = self._ranks(dimension, epci, year)
+        scores = _float_list(self.scores[dimension][epci, :, year])
+        ids = self.dimension_ids[dimension]
+        labels = self.dimension_labels[dimension]
+        items = [
+            AggregatedScore(id=ids[code], label=labels.get(ids[code]), score=scores[code], rank=ranks[code])
+            for code in np.flatnonzero(self.rows[dimension][epci, :, year]).tolist()
+        ]
+        return sorted(items, key=lambda item: (item.label is None, item.label or ""))
+
+    def detail(self, epci_id: str, year: int) -> Optional[ScoreDetail]:
+        """``ScoreDetail`` of one EPCI for ``year``, or None when it has no scores."""
+
+        epci = self.epci_index.get(epci_id)
+        position = self.year_index.get(year)
+        if epci is None or position is None or self.indicator_count[epci, position] == 0:
+            return None
+
+        summary = ScoreSummary(
+            epci_id=epci_id,
+            epci_label=self.epci_labels[epci],
+            department_code=self.department_codes[epci],
+            region_code=self.region_codes[epci],
+            global_score=_float_list(self.scores["global"][epci, :, position])[0],
+            indicator_count=int(self.indicator_count[epci, position]),
+            updated_at=_timestamp(self.arrays["updated_at"][epci, position]),
+        )
+        indicator_ranks = self._ranks("indicator", epci, position)
+        indicator_scores = _float_list(self.scores["indicator"][epci, :, position])
+        # Per dimension: (ids, labels, row codes, row scores) of this EPCI's indicator rows.
+        row_dimensions = [
+            (
+                dimension,
+                self.dimension_ids[dimension],
+                self.dimension_labels[dimension],
+                self.arrays[f"{dimension}_code"][epci, :, position].tolist(),
+                _float_list(self.arrays[f"{dimension}_score"][epci, :, position], digits=2),
+            )
+            for dimension in GROUP_DIMENSIONS
+        ]
+        indicators = []
+        for indicator in np.flatnonzero(self.arrays["present"][epci, :, position]).tolist():
+            fields = {}
+            for dimension, ids, labels, codes, scores in row_dimensions:
+                dimension_id = ids[codes[indicator]] if codes[indicator] >= 0 else None
+                fields[f"{dimension}_id"] = dimension_id
+                fields[f"{dimension}_label"] = labels.get(dimension_id)
+                fields[f"{dimension}_score"] = scores[indicator]
+            indicators.append(
+                IndicatorScoreDetail(
+                    indicator_id=self.indicator_ids[indicator],
+                    indicator_label=self.indicator_labels[indicator],
+                    indicator_score=indicator_scores[indicator],
+                    rank=indicator_ranks[indicator],
+                    **fields,
+                )
+            )
+        indicators.sort(key=lambda item: item.indicator_label)
+        return ScoreDetail(
+            summary=summary,
+            rank=self._ranks("global", epci, position)[0],
+            needs=self._aggregates("need", epci, position),
+            objectives=self._aggregates("objective", epci, position),
+            types=self._aggregates("type", epci, position),
+            indicators=indicators,
+        )
+
+    def details(self, epci_ids: Sequence[str], year: int) -> Dict[str, ScoreDetail]:
+        found = {}
+        for epci_id in epci_ids:
+            detail = self.detail(epci_id, year)
+            if detail is not None:
+                found[epci_id] = detail
+        return found
+
+    # -- rollups -----------------------------------------------------------------
+
+    def _group_index(self, level: str) -> tuple:
+        """Sorted department (or region) codes and each EPCI's position in them (-1 if none)."""
+
+        cached = self._groups.get(level)
+        if cached is None:
+            epci_codes = self.department_codes if level == "department" else self.region_codes
+            codes = sorted({code for code in epci_codes if code is not None})
+            positions = {code: position for position, code in enumerate(codes)}
+            group_of = np.array([positions.get(code, -1) if code is not None else -1 for code in epci_codes])
+            cached = (codes, group_of)
+            self._groups[level] = cached
+        return cached
+
+    def rollup_rows(self, level: str, year: int, dimension: Optional[str] = None) -> List[tuple]:
+        """``score_rollup`` rows of ``level`` and ``year``: same averages as ``rollup_statement``.
+
+        Tuples follow score_service._ROLLUP_FIELDS, ordered by dimension,
+        dimension id and code.
+        """
+
+        position = self.year_index.get(year)
+        if position is None:
+            return []
+        codes, group_of = self._group_index(level)
+        members = np.zeros((len(self.epci_ids), len(codes)))
+        grouped = group_of >= 0
+        members[np.flatnonzero(grouped), group_of[grouped]] = 1.0
+        population = self.arrays["population"]
+        has_population = ~np.isnan(population)
+        population = np.where(has_population, population, 0.0)
+
+        rows = []
+        dimensions = ("global",) + GROUP_DIMENSIONS
+        for name in dimensions if dimension is None else (dimension,):
+            matrix = self.scores[name][:, :, position]
+            known = ~np.isnan(matrix)
+            values = np.where(known, matrix, 0.0)
+            weighted = known & has_population[:, None]
+            exists = members.T @ (self.rows[name][:, :, position] > 0)
+            counts = members.T @ known
+            sums = members.T @ values
+            weighted_sums = members.T @ (values * population[:, None])
+            weights = members.T @ np.where(weighted, population[:, None], 0.0)
+            weight_rows = members.T @ weighted
+            with np.errstate(invalid="ignore", divide="ignore"):
+                averages = round_half_up(sums / counts, 2)
+                weighted_averages = round_half_up(weighted_sums / weights, 2)
+
+            ids = self.dimension_ids[name]
+            # Column-major lists: one conversion instead of a NumPy scalar per value.
+            exists, counts, weights, weight_rows = (
+                array.T.tolist() for array in (exists > 0, counts, weights, weight_rows > 0)
+            )
+            averages, weighted_averages = averages.T.tolist(), weighted_averages.T.tolist()
+            for column in sorted(range(len(ids)), key=ids.__getitem__):
+                for group, code in enumerate(codes):
+                    if not exists[column][group]:
+                        continue
+                    rows.append(
+                        (
+                            code,
+                            name,
+                            ids[column] or None,
+                            averages[column][group] if counts[column][group] else None,
+                            weighted_averages[column][group] if weights[column][group] else None,
+                            int(counts[column][group]),
+                            weights[column][group] if weight_rows[column][group] else None,
+                        )
+                    )
+        return rows
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "years": self.years,
+            "epcis": len(self.epci_ids),
+            "indicators": len(self.indicator_ids),
+            "bytes": int(sum(array.nbytes for array in self.arrays.values())),
+        }
+
+
+def _float_list(values: np.ndarray, digits: Optional[int] = None) -> List[Optional[float]]:
+    """Python floats (None for NaN); ``digits`` rounds float32 values back to their NUMERIC."""
+
+    if digits is not None:
+        values = np.round(values.astype(np.float64), digits)
+    return [None if value != value else value for value in values.tolist()]
+
+
+def _timestamp(microseconds) -> Optional[datetime]:
+    if microseconds == 0:
+        return None
+    return datetime.fromtimestamp(int(microseconds) / 1_000_000, tz=timezone.utc)
+
+
+def _positions(index: pd.Index, values) -> np.ndarray:
+    """Position of each value in ``index`` (-1 for NULL), one hash lookup pass."""
+
+    return index.get_indexer(pd.Index(values, dtype=object))
+
+
+def load_score_cube(session: Session) -> ScoreCube:
+    """Read ``score_indicateur`` and its references into a new ``ScoreCube``.
+
+    Runs in one REPEATABLE READ transaction so the cube matches the data
+    version it is tagged with.
+    """
+
+    connection = session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+    version = connection.execute(select(DataVersion.version).where(DataVersion.id == 1)).scalar()
+    epcis = connection.execute(
+        select(
+            Epci.id, Epci.label, Epci.department_code, Epci.region_code, cast(Epci.population_total, DOUBLE_PRECISION)
+        ).order_by(Epci.id)
+    ).all()
+    indicators = connection.execute(select(Indicator.id, Indicator.label).order_by(Indicator.id)).all()
+    score_year = cast(IndicatorScore.year, Integer)
+    years = list(connection.execute(select(score_year).distinct().order_by(score_year)).scalars())
+    references = {
+        "need": connection.execute(select(Need.id, Need.label).order_by(Need.id)).all(),
+        "objective": connection.execute(select(Objective.id, Objective.label).order_by(Objective.id)).all(),
+        "type": connection.execute(select(IndicatorType.id, IndicatorType.label).order_by(IndicatorType.id)).all(),
+    }
+
+    meta = {
+        "version": int(version or 0),
+        "years": years,
+        "epci_ids": [row[0] for row in epcis],
+        "epci_labels": [row[1] for row in epcis],
+        "department_codes": [row[2] for row in epcis],
+        "region_codes": [row[3] for row in epcis],
+        "indicator_ids": [row[0] for row in indicators],
+        "indicator_labels": [row[1] for row in indicators],
+        "dimension_ids": {dimension: [row[0] for row in rows] for dimension, rows in references.items()},
+        "dimension_labels": {dimension: {row[0]: row[1] for row in rows} for dimension, rows in references.items()},
+    }
+    shape = (len(epcis), len(indicators), len(years))
+    arrays: Dict[str, np.ndarray] = {name: np.full(shape, np.nan, dtype=np.float32) for name in SCORE_COLUMNS}
+    arrays.update({f"{dimension}_code": np.full(shape, -1, dtype=np.int16) for dimension in GROUP_DIMENSIONS})
+    arrays["present"] = np.zeros(shape, dtype=bool)
+    arrays["updated_at"] = np.zeros(shape[0::2], dtype=np.int64)
+    arrays["population"] = np.array([np.nan if row[4] is None else row[4] for row in epcis], dtype=np.float64)
+
+    epci_index = pd.Index(meta["epci_ids"], dtype=object)
+    indicator_index = pd.Index(meta["indicator_ids"], dtype=object)
+    year_index = pd.Index(years)
+    code_index = {dimension: pd.Index(ids, dtype=object) for dimension, ids in meta["dimension_ids"].items()}
+
+    statement = select(
+        IndicatorScore.epci_id,
+        IndicatorScore.indicator_id,
+        score_year,
+        *(cast(getattr(IndicatorScore, name), DOUBLE_PRECISION) for name in SCORE_COLUMNS),
+        IndicatorScore.need_id,
+        IndicatorScore.objective_id,
+        IndicatorScore.type_id,
+        # Epoch microseconds: no datetime object per row.
+        cast(func.extract("epoch", IndicatorScore.updated_at) * 1_000_000, BigInteger),
+    ).execution_options(yield_per=LOAD_CHUNK_ROWS)
+    for partition in connection.execute(statement).partitions():
+        columns = list(zip(*partition))
+        epci = _positions(epci_index, columns[0])
+        indicator = _positions(indicator_index, columns[1])
+        year = year_index.get_indexer(np.array(columns[2]))
+        for offset, name in enumerate(SCORE_COLUMNS, start=3):
+            arrays[name][epci, indicator, year] = np.array(columns[offset], dtype=np.float64)
+        for offset, dimension in enumerate(GROUP_DIMENSIONS, start=8):
+            arrays[f"{dimension}_code"][epci, indicator, year] = _positions(code_index[dimension], columns[offset])
+        arrays["present"][epci, indicator, year] = True
+        np.maximum.at(arrays["updated_at"], (epci, year), np.array(columns[11], dtype=np.int64))
+
+    # Need/objective/type scores over every indicator link (rows only carry the primary one).
+    for dimension in GROUP_DIMENSIONS:
+        dimension_shape = (len(epcis), len(meta["dimension_ids"][dimension]), len(years))
+        arrays[f"epci_{dimension}_score"] = np.full(dimension_shape, np.nan)
+        arrays[f"epci_{dimension}_rows"] = np.zeros(dimension_shape, dtype=np.int32)
+    statement = select(
+        ScoreDimension.epci_id,
+        ScoreDimension.dimension,
+        ScoreDimension.dimension_id,
+        ScoreDimension.year,
+        cast(ScoreDimension.score, DOUBLE_PRECISION),
+        ScoreDimension.indicator_count,
+    )
+    rows = pd.DataFrame(
+        connection.execute(statement).all(), columns=["epci", "dimension", "dimension_id", "year", "score", "count"]
+    )
+    for dimension, group in rows.groupby("dimension"):
+        if dimension not in code_index:
+            continue
+        position = (
+            _positions(epci_index, group["epci"]),
+            _positions(code_index[dimension], group["dimension_id"]),
+            year_index.get_indexer(group["year"].to_numpy()),
+        )
+        known = (position[0] >= 0) & (position[1] >= 0) & (position[2] >= 0)
+        position = tuple(axis[known] for axis in position)
+        arrays[f"epci_{dimension}_score"][position] = group["score"].to_numpy(dtype=np.float64)[known]
+        arrays[f"epci_{dimension}_rows"][position] = group["count"].to_numpy(dtype=np.int32)[known]
+    session.rollback()
+    return ScoreCube(meta, arrays)
+
+
+def _is_current(cube: Optional[ScoreCube], version: Optional[int]) -> bool:
+    return cube is not None and (version is None or cube.version >= version)
+
+
+class _CubeHolder:
+    """Process-wide reference to the current cube; reloads are serialised.
+
+    The cube comes from the published snapshot when
+    ``settings.score_snapshot_dir`` is set (memory-mapped, shared by workers),
+    otherwise from the database.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.cube: Optional[ScoreCube] = None
+        self.snapshot: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+
+    def _load(self) -> Optional[ScoreCube]:
+        directory = settings.score_snapshot_dir
+        if not directory:
+            with SessionLocal() as session:
+                return load_score_cube(session)
+        name = score_snapshot.current_snapshot(directory)
+        if name is None or name == self.snapshot:
+            return None
+        snapshot = score_snapshot.read_snapshot(directory, name)
+        if snapshot is None:
+            return None
+        name, meta, arrays = snapshot
+        cube = ScoreCube(meta, arrays)
+        # Only once built: a snapshot that fails to load is retried next time.
+        self.snapshot = name
+        return cube
+
+    def refresh(self, version: Optional[int] = None) -> Optional[ScoreCube]:
+        """The cube if it is at least at ``version``, reloading it if needed; else None.
+
+        Only the first load blocks. While another thread reloads, or when the
+        reload fails or the published snapshot lags behind ``version``, callers
+        get None and answer from SQL: a cube never serves an older version.
+        """
+
+        cube = self.cube
+        if _is_current(cube, version):
+            return cube
+        if not self._lock.acquire(blocking=cube is None):
+            return None
+        try:
+            if not _is_current(self.cube, version):
+                started = time.perf_counter()
+                try:
+                    fresh = self._load()
+                except Exception:
+                    logger.exception("Chargement du cube de scores impossible")
+                    fresh = None
+                if fresh is not None:
+                    self.load_seconds = time.perf_counter() - started
+                    self.loaded_at = time.time()
+                    self.cube = fresh
+                    logger.info(
+                        "Cube de scores chargé (version %s%s, %s EPCI × %s indicateurs × %s années) en %.3fs",
+                        fresh.version,
+                        f", snapshot {self.snapshot}" if settings.score_snapshot_dir else "",
+                        len(fresh.epci_ids),
+                        len(fresh.indicator_ids),
+                        len(fresh.years),
+                        self.load_seconds,
+                    )
+            return self.cube if _is_current(self.cube, version) else None
+        finally:
+            self._lock.release()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.cube = None
+            self.snapshot = None
+
+
+_holder = _CubeHolder()
+
+
+def get_score_cube(db: Session) -> Optional[ScoreCube]:
+    """Current cube when ``settings.score_cube_enabled``, else None (SQL path)."""
+
+    if not settings.score_cube_enabled:
+        return None
+    return _holder.refresh(current_data_version(db))
+
+
+async def get_score_cube_async(db: AsyncSession) -> Optional[ScoreCube]:
+    if not settings.score_cube_enabled:
+        return None
+    version = await current_data_version_async(db)
+    cube = _holder.cube
+    if _is_current(cube, version):
+        return cube
+    return await run_in_threadpool(_holder.refresh, version)
+
+
+async def warm_score_cube() -> None:
+    """Load the cube at startup so the first requests do not pay for it."""
+
+    if settings.score_cube_enabled:
+        await run_in_threadpool(_holder.refresh)
+
+
+def reset_score_cube() -> None:
+    _holder.reset()
+
+
+def publish_score_snapshot(directory: Optional[str] = None) -> Optional[Path]:
+    """Write the committed scores as a new snapshot for the API workers.
+
+    Call after the transaction running ``publish_scores`` has committed. Without
+    an explicit ``directory`` this is a no-op (None) unless the cube is enabled
+    (``SCORE_CUBE_ENABLED``) and ``SCORE_SNAPSHOT_DIR`` is set: no worker would
+    read the snapshot otherwise.
+    """
+
+    if directory is None and not settings.score_cube_enabled:
+        return None
+    directory = directory or settings.score_snapshot_dir
+    if not directory:
+        return None
+    started = time.perf_counter()
+    with SessionLocal() as session:
+        cube = load_score_cube(session)
+    path = score_snapshot.write_snapshot(directory, cube.meta, cube.arrays, keep=settings.score_snapshot_keep)
+    logger.info(
+        "Snapshot de scores publié : %s (version %s, %.1f Mo) en %.2fs",
+        path,
+        cube.version,
+        cube.stats()["bytes"] / 1e6,
+        time.perf_counter() - started,
+    )
+    return path
+
+
+def publish_score_snapshot_after_commit() -> Optional[Path]:
+    """``publish_score_snapshot`` for pipelines whose scores are already committed.
+
+    A failure is logged, not raised: the data is in the database, and the
+    workers serve it through SQL until the next snapshot is published.
+    """
+
+    try:
+        return publish_score_snapshot()
+    except Exception:
+        logger.exception(
+            "Échec de la publication du snapshot de scores (scores enregistrés en base ; "
+            "relancer scripts/run_pipeline.sh score-snapshot)."
+        )
+        return None
+
+
+def score_cube_stats() -> dict:
+    cube = _holder.cube
+    return {
+        "enabled": settings.score_cube_enabled,
+        "loaded": cube is not None,
+        "snapshot": _holder.snapshot,
+        "load_seconds": _holder.load_seconds,
+        "loaded_at": _holder.loaded_at,
+        **(cube.stats() if cube is not None else {}),
+    }
@@ -0,0 +1,212 @@
+"""Streaming export of every indicator score of a year (CSV, NDJSON, Parquet).
+
+The ``score_indicateur`` ⋈ ``epci`` ⋈ reference-label join is read through a
+server-side cursor (``AsyncSession.stream`` + ``yield_per``) and encoded chunk
+by chunk, so memory stays flat whatever the number of rows. Parquet needs
+``pyarrow`` (in ``requirements.txt``); without it the route answers 400.
+"""
+from __future__ import annotations
+
+import csv
+import io
+from typing import AsyncIterator, Callable, Dict, Sequence
+
+import orjson
+from sqlalchemy import Integer, cast, select
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.diag360_raw import Epci, IndicatorScore
+from app.models.diag360_ref import Indicator, IndicatorType, Need, Objective
+
+try:  # only needed for format=parquet
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - depends on the deployment
+    pa = None
+    pq = None
+
+EXPORT_CHUNK_ROWS = 5_000
+
+EXPORT_COLUMNS = (
+    "year",
+    "epci_id",
+    "epci_label",
+    "department_code",
+    "region_code",
+    "indicator_id",
+    "indicator_label",
+    "indicator_score",
+    "need_id",
+    "need_label",
+    "need_score",
+    "objective_id",
+    "objective_label",
+    "objective_score",
+    "type_id",
+    "type_label",
+    "type_score",
+    "global_score",
+    "updated_at",
+)
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def parquet_available() -> bool:
+    return pa is not None
+
+
+def export_statement(year: int):
+    """All indicator scores of ``year`` with labels, ordered by EPCI then indicator."""
+
+    def score(column, name: str):
+        return cast(column, DOUBLE_PRECISION).label(name)
+
+    return (
+        select(
+            cast(IndicatorScore.year, Integer).label("year"),
+            IndicatorScore.epci_id.label("epci_id"),
+            Epci.label.label("epci_label"),
+            Epci.department_code.label("department_code"),
+            Epci.region_code.label("region_code"),
+            IndicatorScore.indicator_id.label("indicator_id"),
+            Indicator.label.label("indicator_label"),
+            score(IndicatorScore.indicator_score, "indicator_score"),
+            IndicatorScore.need_id.label("need_id"),
+            Need.label.label("need_label"),
+            score(IndicatorScore.need_score, "need_score"),
+            IndicatorScore.objective_id.label("objective_id"),
+            Objective.label.label("objective_label"),
+            score(IndicatorScore.objective_score, "objective_score"),
+            IndicatorScore.type_id.label("type_id"),
+            IndicatorType.label.label("type_label"),
+            score(IndicatorScore.type_score, "type_score"),
+            score(IndicatorScore.global_score, "global_score"),
+            IndicatorScore.updated_at.label("updated_at"),
+        )
+        .join(Epci, Epci.id == IndicatorScore.epci_id)
+        .join(Indicator, Indicator.id == IndicatorScore.indicator_id)
+        .join(Need, Need.id == IndicatorScore.need_id, isouter=True)
+        .join(Objective, Objective.id == IndicatorScore.objective_id, isouter=True)
+        .join(IndicatorType, IndicatorType.id == IndicatorScore.type_id, isouter=True)
+        .where(IndicatorScore.year == year)
+        .order_by(IndicatorScore.epci_id, IndicatorScore.indicator_id)
+    )
+
+
+def _csv_encoder() -> Callable[[Sequence[tuple], bool], bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    state = {"header": False}
+
+    def encode(rows: Sequence[tuple], last: bool) -> bytes:
+        if not state["header"]:
+            writer.writerow(EXPORT_COLUMNS)
+            state["header"] = True
+        writer.writerows(
+            tuple(value.isoformat() if hasattr(value, "isoformat") else value for value in row) for row in rows
+        )
+        chunk = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    return encode
+
+
+def _ndjson_encoder() -> Callable[[Sequence[tuple], bool], bytes]:
+    def encode(rows: Sequence[tuple], last: bool) -> bytes:
+        return b"".join(orjson.dumps(dict(zip(EXPORT_COLUMNS, row))) + b"\n" for row in rows)
+
+    return encode
+
+
+class _ParquetSink:
+    """Write-only file object handing back what ParquetWriter wrote since the last drain."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_schema():
+    types = {name: pa.string() for name in EXPORT_COLUMNS}
+    types.update({name: pa.float64() for name in EXPORT_COLUMNS if name.endswith("_score")})
+    types["year"] = pa.int32()
+    types["updated_at"] = pa.timestamp("us", tz="UTC")
+    return pa.schema([(name, types[name]) for name in EXPORT_COLUMNS])
+
+
+def _parquet_encoder() -> Callable[[Sequence[tuple], bool], bytes]:
+    schema = _parquet_schema()
+    sink = _ParquetSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+
+    def encode(rows: Sequence[tuple], last: bool) -> bytes:
+        if rows:
+            columns = list(zip(*rows))
+            # One row group per chunk.
+            arrays = [pa.array(values, type=field.type) for values, field in zip(columns, schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        if last:
+            writer.close()
+        return sink.drain()
+
+    return encode
+
+
+_ENCODERS: Dict[str, Callable[[], Callable[[Sequence[tuple], bool], bytes]]] = {
+    "csv": _csv_encoder,
+    "ndjson": _ndjson_encoder,
+    "parquet": _parquet_encoder,
+}
+
+
+async def stream_export(
+    session_factory: Callable[[], AsyncSession],
+    year: int,
+    export_format: str,
+    chunk_rows: int = EXPORT_CHUNK_ROWS,
+) -> AsyncIterator[bytes]:
+    """Yield the encoded export of ``year``.
+
+    The session is opened here, not by a request dependency: FastAPI closes
+    dependencies before a ``StreamingResponse`` body is consumed.
+    """
+
+    encode = _ENCODERS[export_format]()
+    async with session_factory() as session:
+        result = await session.stream(export_statement(year).execution_options(yield_per=chunk_rows))
+        async for partition in result.partitions():
+            chunk = encode([tuple(row) for row in partition], False)
+            if chunk:
+                yield chunk
+    tail = encode([], True)
+    if tail:
+        yield tail
@@ -0,0 +1,246 @@
+"""Need, objective, type and global scores aggregated from indicator scores.
+
+An indicator belongs to needs, objectives and types through the
+``indicateur_besoin`` / ``indicateur_objectif`` / ``indicateur_type`` link
+tables (and the ``ids_besoins`` / ``ids_objectifs`` / ``ids_types`` arrays the
+workbook ingestion maintains). For each EPCI and year:
+
+- a need (objective, type) score is the mean of the indicator scores linked to it;
+- the global score is the mean of the EPCI's need scores.
+
+Three statements write them. The first stores every need, objective and type
+score of each EPCI in ``score_dimension``, over all links: this is what the
+detail view, ranks, rollups, weighting and the cube read. The second fills
+every ``score_indicateur`` row with its indicator's primary need, objective
+and type (lowest id when it has several) and their scores, plus the global
+score. The third fills ``score_besoin`` / ``score_objectif`` / ``score_type``
+(means of the EPCI's scores per dimension) and ``rapport`` (every score by id)
+in ``score_global``. Rows whose values do not change are not rewritten. Run
+before ``score_publication.publish_scores``, which derives
+``score_global.score_global``, rollups and ranks from these tables.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, delete, exists, func, literal, select, tuple_, union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models import Indicator, IndicatorNeedLink, IndicatorObjectiveLink, IndicatorScore, IndicatorTypeLink, ScoreDimension, ScoreGlobal
+
+logger = logging.getLogger("diag360.score_hierarchy")
+
+HIERARCHY_DIMENSIONS = ("need", "objective", "type")
+# Keys of score_global.rapport, one object {id: score} per dimension.
+REPORT_KEYS = {"need": "besoins", "objective": "objectifs", "type": "types"}
+
+
+def indicator_links():
+    """CTE ``(dimension, indicator_id, dimension_id)`` of every indicator link."""
+
+    sources = (
+        ("need", IndicatorNeedLink.need_id, IndicatorNeedLink.indicator_id, Indicator.need_ids),
+        ("objective", IndicatorObjectiveLink.objective_id, IndicatorObjectiveLink.indicator_id, Indicator.objective_ids),
+        ("type", IndicatorTypeLink.type_id, IndicatorTypeLink.indicator_id, Indicator.type_ids),
+    )
+    selects = []
+    for dimension, link_id, link_indicator, array_ids in sources:
+        selects.append(
+            select(literal(dimension).label("dimension"), link_indicator.label("indicator_id"), link_id.label("dimension_id"))
+        )
+        selects.append(select(literal(dimension), Indicator.id, func.unnest(array_ids)))
+    return union(*selects).cte("indicator_links")
+
+
+def dimension_scores(years: Optional[list[int]], links):
+    """CTE ``(epci_id, year, dimension, dimension_id, score, indicator_count)``, 2-decimal means.
+
+    EPCI-years whose indicators have no link at all keep one row with a NULL
+    dimension, so they still get an (empty) ``score_global`` aggregate.
+    """
+
+    score_filters = [IndicatorScore.year.in_(years)] if years is not None else []
+    return (
+        select(
+            IndicatorScore.epci_id.label("epci_id"),
+            IndicatorScore.year.label("year"),
+            links.c.dimension,
+            links.c.dimension_id,
+            func.round(func.avg(IndicatorScore.indicator_score), 2).label("score"),
+            func.count().label("indicator_count"),
+        )
+        .outerjoin(links, links.c.indicator_id == IndicatorScore.indicator_id)
+        .where(*score_filters)
+        .group_by(IndicatorScore.epci_id, IndicatorScore.year, links.c.dimension, links.c.dimension_id)
+        .cte("dimension_scores")
+    )
+
+
+def _indicator_rows(years: Optional[list[int]], links, scores):
+    primary = (
+        select(
+            links.c.indicator_id,
+            *(
+                func.min(links.c.dimension_id).filter(links.c.dimension == dimension).label(f"{dimension}_id")
+                for dimension in HIERARCHY_DIMENSIONS
+            ),
+        )
+        .group_by(links.c.indicator_id)
+        .cte("primary_links")
+    )
+    global_scores = (
+        select(
+            scores.c.epci_id,
+            scores.c.year,
+            func.round(func.avg(scores.c.score), 2).label("score"),
+        )
+        .where(scores.c.dimension == "need")
+        .group_by(scores.c.epci_id, scores.c.year)
+        .cte("global_scores")
+    )
+    score_filters = [IndicatorScore.year.in_(years)] if years is not None else []
+    columns = [IndicatorScore.epci_id, IndicatorScore.indicator_id, IndicatorScore.year]
+    statement = select().select_from(IndicatorScore).outerjoin(primary, primary.c.indicator_id == IndicatorScore.indicator_id)
+    for dimension in HIERARCHY_DIMENSIONS:
+        dimension_id = primary.c[f"{dimension}_id"]
+        score = scores.alias(f"{dimension}_scores")
+        statement = statement.outerjoin(
+            score,
+            and_(
+                score.c.epci_id == IndicatorScore.epci_id,
+                score.c.year == IndicatorScore.year,
+                score.c.dimension == dimension,
+                score.c.dimension_id == dimension_id,
+            ),
+        )
+        columns += [dimension_id, score.c.score]
+    statement = statement.outerjoin(
+        global_scores,
+        and_(global_scores.c.epci_id == IndicatorScore.epci_id, global_scores.c.year == IndicatorScore.year),
+    )
+    return statement.add_columns(*columns, global_scores.c.score).where(*score_filters)
+
+
+def _summary_rows(scores):
+    def _mean(dimension: str):
+        return func.round(func.avg(scores.c.score).filter(scores.c.dimension == dimension), 2)
+
+    def _report(dimension: str):
+        by_id = func.jsonb_object_agg(scores.c.dimension_id, scores.c.score).filter(scores.c.dimension == dimension)
+        return literal(REPORT_KEYS[dimension]), func.coalesce(by_id, func.jsonb_build_object())
+
+    report = func.jsonb_build_object(*(part for dimension in HIERARCHY_DIMENSIONS for part in _report(dimension)))
+    return select(
+        scores.c.epci_id,
+        scores.c.year,
+        *(_mean(dimension) for dimension in HIERARCHY_DIMENSIONS),
+        report,
+    ).group_by(scores.c.epci_id, scores.c.year)
+
+
+def _log_multiple_links(session: Session) -> None:
+    links = indicator_links()
+    shared = (
+        select(links.c.dimension)
+        .group_by(links.c.dimension, links.c.indicator_id)
+        .having(func.count() > 1)
+        .subquery("shared_links")
+    )
+    shared = session.execute(select(shared.c.dimension, func.count()).group_by(shared.c.dimension)).all()
+    if shared:
+        logger.info(
+            "Indicateurs liés à plusieurs éléments (%s) : score_indicateur porte le lien principal, "
+            "score_dimension tous les liens.",
+            ", ".join(f"{dimension} {count}" for dimension, count in sorted(shared)),
+        )
+
+
+def _refresh_dimension_rows(session: Session, year_list: Optional[list[int]], scores) -> int:
+    columns = ["id_epci", "annee", "dimension", "id_dimension", "score", "nb_indicateurs"]
+    rows = select(
+        scores.c.epci_id, scores.c.year, scores.c.dimension, scores.c.dimension_id, scores.c.score, scores.c.indicator_count
+    ).where(scores.c.dimension.is_not(None))
+    upsert = pg_insert(ScoreDimension).from_select(columns, rows)
+    updated = columns[4:]
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[ScoreDimension.year, ScoreDimension.epci_id, ScoreDimension.dimension, ScoreDimension.dimension_id],
+        set_={**{column: upsert.excluded[column] for column in updated}, "updated_at": func.now()},
+        where=tuple_(*(ScoreDimension.__table__.c[column] for column in updated)).is_distinct_from(
+            tuple_(*(upsert.excluded[column] for column in updated))
+        ),
+    )
+    changed = session.execute(upsert.execution_options(preserve_rowcount=True)).rowcount
+
+    # Links or scores that disappeared since the last refresh.
+    current = dimension_scores(year_list, indicator_links())
+    year_filters = [ScoreDimension.year.in_(year_list)] if year_list is not None else []
+    stale = delete(ScoreDimension).where(
+        *year_filters,
+        ~exists().where(
+            current.c.epci_id == ScoreDimension.epci_id,
+            current.c.year == ScoreDimension.year,
+            current.c.dimension == ScoreDimension.dimension,
+            current.c.dimension_id == ScoreDimension.dimension_id,
+        ),
+    )
+    return changed + session.execute(stale.execution_options(preserve_rowcount=True)).rowcount
+
+
+def refresh_hierarchy_scores(session: Session, years: Optional[Iterable[int]] = None) -> tuple[int, int, int]:
+    """Recompute need/objective/type/global scores for ``years`` (all years when None).
+
+    Returns the number of ``score_dimension``, ``score_indicateur`` and
+    ``score_global`` rows that changed. The caller owns the transaction.
+    """
+
+    year_list = sorted({int(year) for year in years}) if years is not None else None
+    links = indicator_links()
+    scores = dimension_scores(year_list, links)
+    _log_multiple_links(session)
+    dimension_rows = _refresh_dimension_rows(session, year_list, scores)
+
+    row_columns = [
+        "id_epci",
+        "id_indicateur",
+        "annee",
+        "id_besoin",
+        "score_besoin",
+        "id_objectif",
+        "score_objectif",
+        "id_type",
+        "score_type",
+        "score_global",
+    ]
+    upsert = pg_insert(IndicatorScore).from_select(row_columns, _indicator_rows(year_list, links, scores))
+    updated = row_columns[3:]
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[IndicatorScore.epci_id, IndicatorScore.indicator_id, IndicatorScore.year],
+        set_={**{column: upsert.excluded[column] for column in updated}, "updated_at": func.now()},
+        where=tuple_(*(IndicatorScore.__table__.c[column] for column in updated)).is_distinct_from(
+            tuple_(*(upsert.excluded[column] for column in updated))
+        ),
+    )
+    indicator_rows = session.execute(upsert.execution_options(preserve_rowcount=True)).rowcount
+
+    summary_columns = ["id_epci", "annee", "score_besoin", "score_objectif", "score_type", "rapport"]
+    upsert = pg_insert(ScoreGlobal).from_select(summary_columns, _summary_rows(scores))
+    updated = summary_columns[2:]
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[ScoreGlobal.epci_id, ScoreGlobal.year],
+        set_={column: upsert.excluded[column] for column in updated},
+        where=tuple_(*(ScoreGlobal.__table__.c[column] for column in updated)).is_distinct_from(
+            tuple_(*(upsert.excluded[column] for column in updated))
+        ),
+    )
+    summary_rows = session.execute(upsert.execution_options(preserve_rowcount=True)).rowcount
+    logger.info(
+        "Scores besoins/objectifs/types/global recalculés (années=%s) : %s lignes score_dimension, "
+        "%s lignes score_indicateur, %s lignes score_global modifiées",
+        year_list if year_list is not None else "toutes",
+        dimension_rows,
+        indicator_rows,
+        summary_rows,
+    )
+    return dimension_rows, indicator_rows, summary_rows
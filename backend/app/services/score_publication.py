@@ -0,0 +1,25 @@
+"""Post-write publication step shared by every score writer.
+
+Call ``publish_scores`` in the transaction that wrote ``score_indicateur``:
+it refreshes the derived tables read by the API and bumps the data version
+so API workers drop their caches. Once committed, ``score_cube.publish_score_snapshot``
+writes the memory-mapped snapshot read by the workers (when configured).
+"""
+from __future__ import annotations
+
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.services.data_version import bump_data_version
+from app.services.score_rank import refresh_score_ranks
+from app.services.score_rollup import refresh_score_rollups
+from app.services.score_summary import refresh_score_summary
+
+
+def publish_scores(session: Session, years: Optional[Iterable[int]] = None) -> int:
+    years = sorted({int(year) for year in years}) if years is not None else None
+    refresh_score_summary(session, years=years)
+    refresh_score_rollups(session, years=years)
+    refresh_score_ranks(session, years=years)
+    return bump_data_version(session)
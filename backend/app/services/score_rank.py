@@ -0,0 +1,87 @@
+"""Ranks and percentiles of EPCI scores, stored in ``score_rank``.
+
+One SQL window pass over the per-EPCI scores of ``score_rollup.epci_dimension_scores``
+(global, need, objective, type and indicator) ranks every EPCI nationally and
+within its department. Rank 1 is the highest score; ``percentile`` is the
+share of EPCIs scoring lower (0–100) and ``quartile`` 4 is the top quarter,
+ties sharing the same value. Refreshed by ``score_publication.publish_scores``
+and joined into the detail query by ``score_service``.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Iterable, Optional
+
+from sqlalchemy import Numeric, case, cast, delete, func, select
+from sqlalchemy.orm import Session
+
+from app.models.diag360_raw import Epci, ScoreRank
+from app.services.score_rollup import epci_dimension_scores
+
+logger = logging.getLogger("diag360.score_rank")
+
+
+def _rank_columns(partition_by: list, score) -> tuple:
+    rank = func.rank().over(partition_by=partition_by, order_by=score.desc())
+    count = func.count().over(partition_by=partition_by)
+    percent_rank = func.percent_rank().over(partition_by=partition_by, order_by=score.asc())
+    percentile = func.round(cast(percent_rank * 100, Numeric), 1)
+    quartile = func.least(4, func.floor(percent_rank * 4) + 1)
+    return rank, count, percentile, quartile
+
+
+def rank_statement(years: Optional[list[int]] = None):
+    """SELECT producing every ``score_rank`` row for ``years`` (all years when None)."""
+
+    scores = epci_dimension_scores(years, include_indicators=True)
+    c = scores.c
+    national = [c.year, c.dimension, c.dimension_id]
+    has_department = Epci.department_code.is_not(None)
+
+    department_columns = [
+        case((has_department, column)) for column in _rank_columns(national + [Epci.department_code], c.score)
+    ]
+    return (
+        select(
+            c.year,
+            c.epci_id,
+            c.dimension,
+            c.dimension_id,
+            *_rank_columns(national, c.score),
+            *department_columns,
+        )
+        .join(Epci, Epci.id == c.epci_id)
+        .where(c.score.is_not(None))
+    )
+
+
+def refresh_score_ranks(session: Session, years: Optional[Iterable[int]] = None) -> None:
+    """Recompute ``score_rank`` for ``years`` (all years when None)."""
+
+    year_list = sorted({int(year) for year in years}) if years is not None else None
+    rank_filters = [ScoreRank.year.in_(year_list)] if year_list is not None else []
+
+    session.execute(delete(ScoreRank).where(*rank_filters))
+    insert = ScoreRank.__table__.insert().from_select(
+        [
+            "annee",
+            "id_epci",
+            "dimension",
+            "id_dimension",
+            "rang",
+            "nb_epci",
+            "percentile",
+            "quartile",
+            "rang_departement",
+            "nb_epci_departement",
+            "percentile_departement",
+            "quartile_departement",
+        ],
+        rank_statement(year_list),
+    )
+    inserted = session.execute(insert.execution_options(preserve_rowcount=True)).rowcount
+    logger.info(
+        "score_rank rafraîchi (années=%s) : %s lignes",
+        year_list if year_list is not None else "toutes",
+        inserted,
+    )
@@ -0,0 +1,138 @@
+"""Department and region rollups of EPCI scores, stored in ``score_rollup``.
+
+Each EPCI gets one score per dimension (global, and one per need, objective
+and type from ``score_dimension``, as in the detail view). These are then
+averaged per ``departement_code`` and ``region_code`` of the EPCI seat, both
+as a simple mean and weighted by ``population_totale``, through GROUPING
+SETS, so one statement covers every level and dimension. Refreshed
+by ``score_publication.publish_scores``.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Iterable, Optional
+
+from sqlalchemy import case, delete, func, literal, select, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from app.models.diag360_raw import Epci, IndicatorScore, ScoreDimension, ScoreRollup
+
+logger = logging.getLogger("diag360.score_rollup")
+
+ROLLUP_LEVELS = ("department", "region")
+ROLLUP_DIMENSIONS = ("global", "need", "objective", "type")
+
+
+def epci_dimension_scores(
+    years: Optional[list[int]] = None,
+    include_indicators: bool = False,
+    epci_ids: Optional[list[str]] = None,
+):
+    """CTE of per-EPCI scores: ``(epci_id, year, dimension, dimension_id, score)``.
+
+    ``dimension`` is ``global`` (``dimension_id`` ``''``), ``need``, ``objective``,
+    ``type`` and, with ``include_indicators``, ``indicator``. Need/objective/type
+    scores come from ``score_dimension`` (every indicator link counts), global
+    and indicator scores from ``score_indicateur``.
+    """
+
+    score_filters = [IndicatorScore.year.in_(years)] if years is not None else []
+    dimension_filters = [ScoreDimension.year.in_(years)] if years is not None else []
+    if epci_ids is not None:
+        score_filters.append(IndicatorScore.epci_id.in_(epci_ids))
+        dimension_filters.append(ScoreDimension.epci_id.in_(epci_ids))
+    if include_indicators:
+        is_global = func.grouping(IndicatorScore.indicator_id) == 1
+        row_scores = select(
+            IndicatorScore.epci_id.label("epci_id"),
+            IndicatorScore.year.label("year"),
+            case((is_global, "global"), else_="indicator").label("dimension"),
+            func.coalesce(IndicatorScore.indicator_id, "").label("dimension_id"),
+            case(
+                (is_global, func.avg(IndicatorScore.global_score)), else_=func.avg(IndicatorScore.indicator_score)
+            ).label("score"),
+        ).group_by(
+            func.grouping_sets(
+                tuple_(IndicatorScore.epci_id, IndicatorScore.year),
+                tuple_(IndicatorScore.epci_id, IndicatorScore.year, IndicatorScore.indicator_id),
+            )
+        )
+    else:
+        row_scores = select(
+            IndicatorScore.epci_id.label("epci_id"),
+            IndicatorScore.year.label("year"),
+            literal("global").label("dimension"),
+            literal("").label("dimension_id"),
+            func.avg(IndicatorScore.global_score).label("score"),
+        ).group_by(IndicatorScore.epci_id, IndicatorScore.year)
+    row_scores = row_scores.where(*score_filters)
+    dimension_scores = select(
+        ScoreDimension.epci_id,
+        ScoreDimension.year,
+        ScoreDimension.dimension,
+        ScoreDimension.dimension_id,
+        ScoreDimension.score,
+    ).where(*dimension_filters)
+    return union_all(row_scores, dimension_scores).cte("epci_scores")
+
+
+def rollup_statement(years: Optional[list[int]] = None):
+    """SELECT producing every ``score_rollup`` row for ``years`` (all years when None)."""
+
+    c = epci_dimension_scores(years).c
+    population = Epci.population_total
+    weighted_population = case((c.score.is_not(None), population))
+    # GROUPING(department, region) is 0b01 for the department grouping set.
+    level_bit = func.grouping(Epci.department_code, Epci.region_code)
+    return (
+        select(
+            case((level_bit == 0b01, literal("department")), else_=literal("region")).label("level"),
+            c.year,
+            c.dimension,
+            c.dimension_id,
+            func.coalesce(Epci.department_code, Epci.region_code).label("code"),
+            func.round(func.avg(c.score), 2).label("average"),
+            func.round(func.sum(c.score * population) / func.nullif(func.sum(weighted_population), 0), 2).label(
+                "weighted_average"
+            ),
+            func.count(c.score).label("epci_count"),
+            func.sum(weighted_population).label("population"),
+        )
+        .join(Epci, Epci.id == c.epci_id)
+        .group_by(
+            func.grouping_sets(
+                tuple_(c.year, c.dimension, c.dimension_id, Epci.department_code),
+                tuple_(c.year, c.dimension, c.dimension_id, Epci.region_code),
+            )
+        )
+        .having(func.coalesce(Epci.department_code, Epci.region_code).is_not(None))
+    )
+
+
+def refresh_score_rollups(session: Session, years: Optional[Iterable[int]] = None) -> None:
+    """Recompute ``score_rollup`` for ``years`` (all years when None)."""
+
+    year_list = sorted({int(year) for year in years}) if years is not None else None
+    rollup_filters = [ScoreRollup.year.in_(year_list)] if year_list is not None else []
+
+    session.execute(delete(ScoreRollup).where(*rollup_filters))
+    insert = ScoreRollup.__table__.insert().from_select(
+        [
+            "niveau",
+            "annee",
+            "dimension",
+            "id_dimension",
+            "code",
+            "score_moyen",
+            "score_pondere",
+            "nb_epci",
+            "population",
+        ],
+        rollup_statement(year_list),
+    )
+    inserted = session.execute(insert.execution_options(preserve_rowcount=True)).rowcount
+    logger.info(
+        "score_rollup rafraîchi (années=%s) : %s lignes",
+        year_list if year_list is not None else "toutes",
+        inserted,
+    )
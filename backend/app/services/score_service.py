@@ -1,28 +1,95 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import base64
+import json
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from sqlalchemy import asc, desc, func, select
+from sqlalchemy import Integer, Text, and_, any_, bindparam, case, cast, func, null, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.models.diag360_raw import Epci, IndicatorScore
+from app.core.config import settings
+from app.models.diag360_raw import Epci, IndicatorScore, ScoreDimension, ScoreGlobal, ScoreRank, ScoreRollup
 from app.models.diag360_ref import Indicator, IndicatorType, Need, Objective
 from app.schemas.score import (
     AggregatedScore,
     IndicatorScoreDetail,
+    RankDetail,
+    ScoreBatchResponse,
+    ScoreHistoryPoint,
+    ScoreHistoryResponse,
+    ScoreHistorySeries,
     ScoreDetail,
     ScoreListResponse,
     ScoreSummary,
+    ScoreYearsResponse,
 )
+from app.services.cache import VersionedTTLCache
+from app.services.data_version import current_data_version, current_data_version_async
+from app.services.score_cube import get_score_cube, get_score_cube_async
+from app.services.score_rollup import epci_dimension_scores
+from app.services.search_service import epci_search_clause
 
+# Responses only change when a pipeline publishes new scores (data_version bump).
+response_cache = VersionedTTLCache(
+    max_entries=settings.score_cache_max_entries,
+    ttl=settings.score_cache_ttl_seconds,
+)
+
+
+# Available years change a few times a year: kept per process, always on.
+_years_cache = VersionedTTLCache(max_entries=1, ttl=settings.score_cache_ttl_seconds)
+
+
+_YEARS_STATEMENT = select(ScoreGlobal.year).distinct().order_by(ScoreGlobal.year.desc())
+
+
+def available_years(db: Session) -> List[int]:
+    """Distinct years with published scores, most recent first."""
+
+    cube = get_score_cube(db)
+    if cube is not None:
+        return _cube_years(cube)
+
+    def _load() -> List[int]:
+        return [int(value) for value in db.execute(_YEARS_STATEMENT).scalars()]
+
+    return list(_years_cache.get_or_set("years", current_data_version(db), _load))
+
+
+async def available_years_async(db: AsyncSession) -> List[int]:
+    cube = await get_score_cube_async(db)
+    if cube is not None:
+        return _cube_years(cube)
+    version = await current_data_version_async(db)
+    found, years = _years_cache.get("years", version)
+    if not found:
+        years = [int(value) for value in (await db.execute(_YEARS_STATEMENT)).scalars()]
+        _years_cache.set("years", version, years)
+    return list(years)
 
-def _resolve_year(db: Session, year: Optional[int]) -> int:
+
+def _cube_years(cube) -> List[int]:
+    return sorted(cube.years, reverse=True)
+
+
+def _latest_year(years: List[int]) -> int:
+    return years[0] if years else 0
+
+
+def resolve_year(db: Session, year: Optional[int]) -> int:
     if year is not None:
         return year
-    latest_year = db.execute(select(func.max(IndicatorScore.year))).scalar()
-    if latest_year is None:
-        return 0
-    return int(latest_year)
+    return _latest_year(available_years(db))
+
+
+async def resolve_year_async(db: AsyncSession, year: Optional[int]) -> int:
+    if year is not None:
+        return year
+    return _latest_year(await available_years_async(db))
 
 
 def _to_float(value):
@@ -31,6 +98,112 @@ def _to_float(value):
     return float(value)
 
 
+def _cached(db: Session, key: tuple, factory):
+    if not settings.score_cache_enabled:
+        return factory()
+    return response_cache.get_or_set(key, current_data_version(db), factory)
+
+
+async def _cached_async(db: AsyncSession, key: tuple, factory):
+    """``_cached`` for coroutine factories; a cache hit does not check out a connection."""
+
+    if not settings.score_cache_enabled:
+        return await factory()
+    version = await current_data_version_async(db)
+    found, value = response_cache.get(key, version)
+    if found:
+        return value
+    value = await factory()
+    response_cache.set(key, version, value)
+    return value
+
+
+def _summary_from_row(row) -> ScoreSummary:
+    return ScoreSummary(
+        epci_id=row.epci_id,
+        epci_label=row.epci_label or "",
+        department_code=row.department_code,
+        region_code=row.region_code,
+        global_score=_to_float(row.global_score),
+        indicator_count=int(row.indicator_count or 0),
+        updated_at=row.updated_at,
+    )
+
+
+# Map-view listings return up to 2 000 rows: they are read as float8 tuples and
+# returned as plain dicts (serialized by orjson in the router) instead of
+# ORM objects -> Decimal -> ScoreSummary -> response_model re-validation.
+_SUMMARY_FIELDS = (
+    "epci_id",
+    "epci_label",
+    "department_code",
+    "region_code",
+    "global_score",
+    "indicator_count",
+    "updated_at",
+)
+
+
+def _summary_columns() -> tuple:
+    return (
+        ScoreGlobal.epci_id,
+        func.coalesce(ScoreGlobal.epci_label, "").label("epci_label"),
+        ScoreGlobal.department_code,
+        ScoreGlobal.region_code,
+        cast(ScoreGlobal.global_score, DOUBLE_PRECISION).label("global_score"),
+        func.coalesce(ScoreGlobal.indicator_count, 0).label("indicator_count"),
+        ScoreGlobal.updated_at,
+    )
+
+
+def encode_cursor(order_by: str, row) -> str:
+    if order_by == "score":
+        sort_key = None if row.global_score is None else str(row.global_score)
+    elif order_by == "code":
+        sort_key = row.epci_id
+    else:
+        sort_key = row.epci_label
+    payload = json.dumps([order_by, sort_key, row.epci_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order_by: str) -> Tuple[Optional[str], str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_order, sort_key, epci_id = json.loads(base64.urlsafe_b64decode(padded))
+        if cursor_order == "score" and sort_key is not None:
+            Decimal(sort_key)
+    except (ValueError, TypeError, ArithmeticError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if cursor_order != order_by:
+        raise ValueError(f"Cursor was issued for order_by={cursor_order}")
+    return sort_key, str(epci_id)
+
+
+# Byte order ("C") = Python string order: the cube pages labels the same
+# way, so a cursor stays valid when a request falls back from one to the other.
+# Coalesced like the label the cursor carries (index in 014_score_global_label_key.sql).
+_LABEL_ORDER = func.coalesce(ScoreGlobal.epci_label, "").collate("C")
+
+
+def _keyset_filter(order_by: str, sort_key: Optional[str], epci_id: str):
+    """Rows strictly after ``(sort_key, epci_id)`` in the ``order_by`` ordering."""
+
+    if order_by == "code":
+        return ScoreGlobal.epci_id > epci_id
+    if order_by == "score":
+        # ORDER BY score DESC NULLS LAST, id_epci ASC
+        if sort_key is None:
+            return ScoreGlobal.global_score.is_(None) & (ScoreGlobal.epci_id > epci_id)
+        score = Decimal(sort_key)
+        return (
+            (ScoreGlobal.global_score < score)
+            | ((ScoreGlobal.global_score == score) & (ScoreGlobal.epci_id > epci_id))
+            | ScoreGlobal.global_score.is_(None)
+        )
+    return tuple_(_LABEL_ORDER, ScoreGlobal.epci_id) > tuple_(sort_key, epci_id)
+
+
 def list_scores(
     db: Session,
     search: Optional[str] = None,
@@ -38,164 +211,182 @@ def list_scores(
     offset: int = 0,
     order_by: str = "name",
     year: Optional[int] = None,
+    after: Optional[str] = None,
+    include_total: bool = True,
 ) -> ScoreListResponse:
-    target_year = _resolve_year(db, year)
+    """Page through EPCI summaries.
 
-    summary_stmt = (
-        select(
-            IndicatorScore.epci_id.label("epci_id"),
-            Epci.label.label("epci_label"),
-            Epci.department_code.label("department_code"),
-            Epci.region_code.label("region_code"),
-            func.avg(IndicatorScore.global_score).label("global_score"),
-            func.count(IndicatorScore.indicator_id).label("indicator_count"),
-            func.max(IndicatorScore.updated_at).label("updated_at"),
-        )
-        .join(Epci, Epci.id == IndicatorScore.epci_id)
-        .where(IndicatorScore.year == target_year)
-        .group_by(
-            IndicatorScore.epci_id,
-            Epci.label,
-            Epci.department_code,
-            Epci.region_code,
-        )
+    With ``after`` (a ``next_cursor`` from a previous page) the page starts
+    right after that row through an index range scan and ``offset`` is ignored.
+    ``include_total=False`` skips the COUNT query.
+    """
+
+    target_year = resolve_year(db, year)
+    keyset = decode_cursor(after, order_by) if after else None
+
+    def _load() -> dict:
+        cube = get_score_cube(db)
+        if cube is not None:
+            rows, total = cube.list_rows(search, limit, offset, order_by, target_year, keyset, include_total)
+            return _list_payload(rows, total, order_by, limit)
+        filters = _list_filters(search, target_year)
+        total = None
+        if include_total:
+            total = int(db.execute(_count_statement(filters)).scalar() or 0)
+            if total == 0:
+                return _list_payload([], 0, order_by, limit)
+        rows = db.execute(_page_statement(filters, limit, offset, order_by, keyset)).all()
+        return _list_payload(rows, total, order_by, limit)
+
+    payload = _cached(db, ("list", search, limit, offset, order_by, target_year, after, include_total), _load)
+    return ScoreListResponse.model_validate(payload)
+
+
+async def list_scores_async(
+    db: AsyncSession,
+    search: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    order_by: str = "name",
+    year: Optional[int] = None,
+    after: Optional[str] = None,
+    include_total: bool = True,
+) -> dict:
+    """Async ``list_scores`` for the API routes; same statements (or cube), same cache.
+
+    Returns the ``ScoreListResponse``-shaped payload as plain dicts, ready for
+    ``ORJSONResponse``.
+    """
+
+    target_year = await resolve_year_async(db, year)
+    keyset = decode_cursor(after, order_by) if after else None
+
+    async def _load() -> dict:
+        cube = await get_score_cube_async(db)
+        if cube is not None:
+            rows, total = cube.list_rows(search, limit, offset, order_by, target_year, keyset, include_total)
+            return _list_payload(rows, total, order_by, limit)
+        filters = _list_filters(search, target_year)
+        total = None
+        if include_total:
+            total = int((await db.execute(_count_statement(filters))).scalar() or 0)
+            if total == 0:
+                return _list_payload([], 0, order_by, limit)
+        rows = (await db.execute(_page_statement(filters, limit, offset, order_by, keyset))).all()
+        return _list_payload(rows, total, order_by, limit)
+
+    return await _cached_async(
+        db, ("list", search, limit, offset, order_by, target_year, after, include_total), _load
     )
 
+
+def _list_filters(search: Optional[str], target_year: int) -> list:
+    filters = [ScoreGlobal.year == target_year]
     if search:
-        pattern = f"%{search.lower()}%"
-        summary_stmt = summary_stmt.where(
-            func.lower(Epci.label).like(pattern)
-            | func.lower(IndicatorScore.epci_id).like(pattern)
-        )
+        filters.append(ScoreGlobal.epci_id.in_(select(Epci.id).where(epci_search_clause(search))))
+    return filters
+
 
-    summary_subquery = summary_stmt.subquery()
-    total = db.execute(select(func.count()).select_from(summary_subquery)).scalar()
-    total = int(total or 0)
+def _count_statement(filters: list):
+    return select(func.count()).select_from(ScoreGlobal).where(*filters)
 
-    if total == 0:
-        return ScoreListResponse(items=[], total=0)
 
-    order_expr = summary_subquery.c.epci_label.asc()
+def _page_statement(
+    filters: list,
+    limit: int,
+    offset: int,
+    order_by: str,
+    keyset: Optional[Tuple[Optional[str], str]],
+):
+    order_exprs = [_LABEL_ORDER.asc(), ScoreGlobal.epci_id.asc()]
     if order_by == "score":
-        order_expr = summary_subquery.c.global_score.desc().nullslast()
+        order_exprs = [ScoreGlobal.global_score.desc().nullslast(), ScoreGlobal.epci_id.asc()]
     elif order_by == "code":
-        order_expr = summary_subquery.c.epci_id.asc()
+        order_exprs = [ScoreGlobal.epci_id.asc()]
 
-    page_stmt = (
-        select(summary_subquery)
-        .order_by(order_expr)
-        .offset(offset)
-        .limit(limit)
-    )
+    page_stmt = select(*_summary_columns()).where(*filters).order_by(*order_exprs).limit(limit)
+    if keyset is not None:
+        page_stmt = page_stmt.where(_keyset_filter(order_by, *keyset))
+    else:
+        page_stmt = page_stmt.offset(offset)
+    return page_stmt
 
-    rows = db.execute(page_stmt).mappings().all()
-    items: List[ScoreSummary] = [
-        ScoreSummary(
-            epci_id=row["epci_id"],
-            epci_label=row["epci_label"],
-            department_code=row["department_code"],
-            region_code=row["region_code"],
-            global_score=_to_float(row["global_score"]),
-            indicator_count=int(row["indicator_count"] or 0),
-            updated_at=row["updated_at"],
-        )
-        for row in rows
-    ]
 
-    return ScoreListResponse(items=items, total=total)
+def _list_payload(rows: Sequence, total: Optional[int], order_by: str, limit: int) -> dict:
+    next_cursor = encode_cursor(order_by, rows[-1]) if rows and len(rows) == limit else None
+    return {
+        "items": [dict(zip(_SUMMARY_FIELDS, row)) for row in rows],
+        "total": total,
+        "next_cursor": next_cursor,
+    }
 
 
-def get_score_detail(
-    db: Session,
-    epci_id: str,
-    year: Optional[int] = None,
-) -> ScoreDetail:
-    target_year = _resolve_year(db, year)
+# GROUPING(indicator, need, objective, type) bitmask of each detail row level
+# (need/objective/type rows from score_dimension use the same encoding).
+_LEVEL_INDICATOR = 0
+_LEVEL_NEED = 0b1011
+_LEVEL_OBJECTIVE = 0b1101
+_LEVEL_TYPE = 0b1110
+_LEVEL_SUMMARY = 0b1111
 
-    summary_stmt = (
-        select(
-            IndicatorScore.epci_id.label("epci_id"),
-            Epci.label.label("epci_label"),
-            Epci.department_code.label("department_code"),
-            Epci.region_code.label("region_code"),
-            func.avg(IndicatorScore.global_score).label("global_score"),
-            func.count(IndicatorScore.indicator_id).label("indicator_count"),
-            func.max(IndicatorScore.updated_at).label("updated_at"),
-        )
-        .join(Epci, Epci.id == IndicatorScore.epci_id)
-        .where(IndicatorScore.year == target_year, IndicatorScore.epci_id == epci_id)
-        .group_by(
-            IndicatorScore.epci_id,
-            Epci.label,
-            Epci.department_code,
-            Epci.region_code,
-        )
-    )
 
-    summary_row = db.execute(summary_stmt).mappings().first()
-    if not summary_row:
-        raise ValueError("EPCI not found")
-
-    summary = ScoreSummary(
-        epci_id=summary_row["epci_id"],
-        epci_label=summary_row["epci_label"],
-        department_code=summary_row["department_code"],
-        region_code=summary_row["region_code"],
-        global_score=_to_float(summary_row["global_score"]),
-        indicator_count=int(summary_row["indicator_count"] or 0),
-        updated_at=summary_row["updated_at"],
-    )
+def _dimension_detail_rows(epci_ids, year: int):
+    """Need/objective/type rows of the detail statement, read from ``score_dimension``.
 
-    needs_rows = db.execute(
-        select(
-            IndicatorScore.need_id.label("id"),
-            Need.label.label("label"),
-            func.avg(IndicatorScore.need_score).label("score"),
-        )
-        .join(Need, Need.id == IndicatorScore.need_id, isouter=True)
-        .where(
-            IndicatorScore.year == target_year,
-            IndicatorScore.epci_id == epci_id,
-            IndicatorScore.need_id.is_not(None),
-        )
-        .group_by(IndicatorScore.need_id, Need.label)
-        .order_by(asc(Need.label))
-    ).mappings()
+    Same columns as the ``detail_groups`` grouping sets, with the level the
+    matching grouping set would have.
+    """
 
-    objectives_rows = db.execute(
-        select(
-            IndicatorScore.objective_id.label("id"),
-            Objective.label.label("label"),
-            func.avg(IndicatorScore.objective_score).label("score"),
-        )
-        .join(Objective, Objective.id == IndicatorScore.objective_id, isouter=True)
-        .where(
-            IndicatorScore.year == target_year,
-            IndicatorScore.epci_id == epci_id,
-            IndicatorScore.objective_id.is_not(None),
-        )
-        .group_by(IndicatorScore.objective_id, Objective.label)
-        .order_by(asc(Objective.label))
-    ).mappings()
+    d = ScoreDimension
 
-    types_rows = db.execute(
+    def _when(dimension: str, value):
+        return case((d.dimension == dimension, value))
+
+    return (
         select(
-            IndicatorScore.type_id.label("id"),
-            IndicatorType.label.label("label"),
-            func.avg(IndicatorScore.type_score).label("score"),
-        )
-        .join(IndicatorType, IndicatorType.id == IndicatorScore.type_id, isouter=True)
-        .where(
-            IndicatorScore.year == target_year,
-            IndicatorScore.epci_id == epci_id,
-            IndicatorScore.type_id.is_not(None),
+            case((d.dimension == "need", _LEVEL_NEED), (d.dimension == "objective", _LEVEL_OBJECTIVE), else_=_LEVEL_TYPE),
+            d.epci_id,
+            *(null() for _ in range(9)),
+            _when("need", d.dimension_id),
+            Need.label,
+            null(),
+            _when("need", d.score),
+            _when("objective", d.dimension_id),
+            Objective.label,
+            null(),
+            _when("objective", d.score),
+            _when("type", d.dimension_id),
+            IndicatorType.label,
+            null(),
+            _when("type", d.score),
         )
-        .group_by(IndicatorScore.type_id, IndicatorType.label)
-        .order_by(asc(IndicatorType.label))
-    ).mappings()
+        .join(Need, and_(d.dimension == "need", Need.id == d.dimension_id), isouter=True)
+        .join(Objective, and_(d.dimension == "objective", Objective.id == d.dimension_id), isouter=True)
+        .join(IndicatorType, and_(d.dimension == "type", IndicatorType.id == d.dimension_id), isouter=True)
+        .where(d.year == year, d.epci_id == epci_ids)
+    )
+
+
+def _detail_statement(epci_ids: Sequence[str], year: int):
+    """One statement returning summary, need/objective/type aggregates and indicator rows.
 
-    indicators_rows = db.execute(
+    The ``(annee, id_epci)`` slice of ``score_indicateur`` is read once and
+    aggregated through GROUPING SETS into the summary and indicator rows; the
+    need/objective/type rows come from ``score_dimension``, which counts every
+    indicator link (rows only carry the primary one). Each output row carries
+    its level as a GROUPING() bitmask. Rows come ordered by EPCI with the
+    summary first, then types, objectives, needs and indicators, each sorted
+    by label.
+    """
+
+    # One array parameter (= ANY) instead of an expanding IN list.
+    epci_ids = any_(bindparam("epci_ids", list(epci_ids), type_=ARRAY(Text)))
+    scores = (
         select(
+            IndicatorScore.epci_id.label("epci_id"),
+            Epci.label.label("epci_label"),
+            Epci.department_code.label("department_code"),
+            Epci.region_code.label("region_code"),
             IndicatorScore.indicator_id.label("indicator_id"),
             Indicator.label.label("indicator_label"),
             IndicatorScore.indicator_score.label("indicator_score"),
@@ -208,61 +399,378 @@ def get_score_detail(
             IndicatorScore.type_id.label("type_id"),
             IndicatorType.label.label("type_label"),
             IndicatorScore.type_score.label("type_score"),
+            IndicatorScore.global_score.label("global_score"),
+            IndicatorScore.updated_at.label("updated_at"),
         )
+        .join(Epci, Epci.id == IndicatorScore.epci_id)
         .join(Indicator, Indicator.id == IndicatorScore.indicator_id)
         .join(Need, Need.id == IndicatorScore.need_id, isouter=True)
         .join(Objective, Objective.id == IndicatorScore.objective_id, isouter=True)
         .join(IndicatorType, IndicatorType.id == IndicatorScore.type_id, isouter=True)
-        .where(IndicatorScore.year == target_year, IndicatorScore.epci_id == epci_id)
-        .order_by(asc(Indicator.label))
-    ).mappings()
-
-    needs = [
-        AggregatedScore(
-            id=row["id"],
-            label=row["label"],
-            score=_to_float(row["score"]),
+        .where(IndicatorScore.year == year, IndicatorScore.epci_id == epci_ids)
+        .cte("detail_slice")
+    )
+    c = scores.c
+    level = func.grouping(c.indicator_id, c.need_id, c.objective_id, c.type_id)
+
+    row_groups = select(
+        level.label("level"),
+        c.epci_id,
+        c.epci_label,
+        c.department_code,
+        c.region_code,
+        func.avg(c.global_score).label("global_score"),
+        func.count(c.indicator_id).label("indicator_count"),
+        func.max(c.updated_at).label("updated_at"),
+        c.indicator_id,
+        c.indicator_label,
+        c.indicator_score,
+        c.need_id,
+        c.need_label,
+        c.need_score,
+        func.avg(c.need_score).label("need_avg"),
+        c.objective_id,
+        c.objective_label,
+        c.objective_score,
+        func.avg(c.objective_score).label("objective_avg"),
+        c.type_id,
+        c.type_label,
+        c.type_score,
+        func.avg(c.type_score).label("type_avg"),
+    ).group_by(
+        func.grouping_sets(
+            tuple_(c.epci_id, c.epci_label, c.department_code, c.region_code),
+            tuple_(
+                c.epci_id,
+                c.indicator_id,
+                c.indicator_label,
+                c.indicator_score,
+                c.need_id,
+                c.need_label,
+                c.need_score,
+                c.objective_id,
+                c.objective_label,
+                c.objective_score,
+                c.type_id,
+                c.type_label,
+                c.type_score,
+            ),
         )
-        for row in needs_rows
-    ]
-    objectives = [
-        AggregatedScore(
-            id=row["id"],
-            label=row["label"],
-            score=_to_float(row["score"]),
+    )
+    groups = union_all(row_groups, _dimension_detail_rows(epci_ids, year)).subquery("detail_groups")
+    g = groups.c
+
+    # Each output row picks up its precomputed rank (score_rank primary key lookup).
+    dimension = case(
+        (g.level == _LEVEL_SUMMARY, "global"),
+        (g.level == _LEVEL_NEED, "need"),
+        (g.level == _LEVEL_OBJECTIVE, "objective"),
+        (g.level == _LEVEL_TYPE, "type"),
+        else_="indicator",
+    )
+    dimension_id = func.coalesce(g.indicator_id, g.need_id, g.objective_id, g.type_id, "")
+    return (
+        select(
+            groups,
+            ScoreRank.rank.label("rank"),
+            ScoreRank.epci_count.label("rank_count"),
+            ScoreRank.percentile.label("percentile"),
+            ScoreRank.quartile.label("quartile"),
+            ScoreRank.department_rank.label("department_rank"),
+            ScoreRank.department_count.label("department_count"),
+            ScoreRank.department_percentile.label("department_percentile"),
+            ScoreRank.department_quartile.label("department_quartile"),
         )
-        for row in objectives_rows
-    ]
-    types = [
-        AggregatedScore(
-            id=row["id"],
-            label=row["label"],
-            score=_to_float(row["score"]),
+        .outerjoin(
+            ScoreRank,
+            and_(
+                ScoreRank.year == year,
+                ScoreRank.epci_id == g.epci_id,
+                ScoreRank.dimension == dimension,
+                ScoreRank.dimension_id == dimension_id,
+            ),
         )
-        for row in types_rows
-    ]
-    indicators = [
-        IndicatorScoreDetail(
-            indicator_id=row["indicator_id"],
-            indicator_label=row["indicator_label"],
-            indicator_score=_to_float(row["indicator_score"]),
-            need_id=row["need_id"],
-            need_label=row["need_label"],
-            need_score=_to_float(row["need_score"]),
-            objective_id=row["objective_id"],
-            objective_label=row["objective_label"],
-            objective_score=_to_float(row["objective_score"]),
-            type_id=row["type_id"],
-            type_label=row["type_label"],
-            type_score=_to_float(row["type_score"]),
+        .order_by(
+            g.epci_id,
+            g.level.desc(),
+            func.coalesce(g.indicator_label, g.need_label, g.objective_label, g.type_label).asc().nullslast(),
         )
-        for row in indicators_rows
-    ]
-
-    return ScoreDetail(
-        summary=summary,
-        needs=needs,
-        objectives=objectives,
-        types=types,
-        indicators=indicators,
     )
+
+
+def _fetch_score_details(db: Session, epci_ids: Sequence[str], year: int) -> Dict[str, ScoreDetail]:
+    """Build ``ScoreDetail`` objects for ``epci_ids`` in one round-trip and one pass."""
+
+    cube = get_score_cube(db)
+    if cube is not None:
+        return cube.details(epci_ids, year)
+    return _details_from_rows(db.execute(_detail_statement(epci_ids, year)).mappings())
+
+
+async def _fetch_score_details_async(
+    db: AsyncSession, epci_ids: Sequence[str], year: int
+) -> Dict[str, ScoreDetail]:
+    cube = await get_score_cube_async(db)
+    if cube is not None:
+        return cube.details(epci_ids, year)
+    return _details_from_rows((await db.execute(_detail_statement(epci_ids, year))).mappings())
+
+
+def _rank_from_row(row) -> Optional[RankDetail]:
+    if row["rank"] is None:
+        return None
+    return RankDetail(
+        rank=row["rank"],
+        count=row["rank_count"],
+        percentile=_to_float(row["percentile"]),
+        quartile=row["quartile"],
+        department_rank=row["department_rank"],
+        department_count=row["department_count"],
+        department_percentile=_to_float(row["department_percentile"]),
+        department_quartile=row["department_quartile"],
+    )
+
+
+def _details_from_rows(rows) -> Dict[str, ScoreDetail]:
+    details: Dict[str, ScoreDetail] = {}
+    for row in rows:
+        level = row["level"]
+        if level == _LEVEL_SUMMARY:
+            details[row["epci_id"]] = ScoreDetail(
+                summary=_summary_from_row(SimpleNamespace(**row)),
+                rank=_rank_from_row(row),
+                needs=[],
+                objectives=[],
+                types=[],
+                indicators=[],
+            )
+            continue
+        detail = details.get(row["epci_id"])
+        if detail is None:
+            continue
+        if level == _LEVEL_NEED and row["need_id"] is not None:
+            detail.needs.append(
+                AggregatedScore(
+                    id=row["need_id"],
+                    label=row["need_label"],
+                    score=_to_float(row["need_avg"]),
+                    rank=_rank_from_row(row),
+                )
+            )
+        elif level == _LEVEL_OBJECTIVE and row["objective_id"] is not None:
+            detail.objectives.append(
+                AggregatedScore(
+                    id=row["objective_id"],
+                    label=row["objective_label"],
+                    score=_to_float(row["objective_avg"]),
+                    rank=_rank_from_row(row),
+                )
+            )
+        elif level == _LEVEL_TYPE and row["type_id"] is not None:
+            detail.types.append(
+                AggregatedScore(
+                    id=row["type_id"],
+                    label=row["type_label"],
+                    score=_to_float(row["type_avg"]),
+                    rank=_rank_from_row(row),
+                )
+            )
+        elif level == _LEVEL_INDICATOR:
+            detail.indicators.append(
+                IndicatorScoreDetail(
+                    indicator_id=row["indicator_id"],
+                    indicator_label=row["indicator_label"],
+                    indicator_score=_to_float(row["indicator_score"]),
+                    need_id=row["need_id"],
+                    need_label=row["need_label"],
+                    need_score=_to_float(row["need_score"]),
+                    objective_id=row["objective_id"],
+                    objective_label=row["objective_label"],
+                    objective_score=_to_float(row["objective_score"]),
+                    type_id=row["type_id"],
+                    type_label=row["type_label"],
+                    type_score=_to_float(row["type_score"]),
+                    rank=_rank_from_row(row),
+                )
+            )
+    return details
+
+
+def get_score_detail(
+    db: Session,
+    epci_id: str,
+    year: Optional[int] = None,
+) -> ScoreDetail:
+    target_year = resolve_year(db, year)
+
+    def _load() -> ScoreDetail:
+        detail = _fetch_score_details(db, [epci_id], target_year).get(epci_id)
+        if detail is None:
+            raise ValueError("EPCI not found")
+        return detail
+
+    return _cached(db, ("detail", epci_id, target_year), _load)
+
+
+async def get_score_detail_async(
+    db: AsyncSession,
+    epci_id: str,
+    year: Optional[int] = None,
+) -> ScoreDetail:
+    target_year = await resolve_year_async(db, year)
+
+    async def _load() -> ScoreDetail:
+        detail = (await _fetch_score_details_async(db, [epci_id], target_year)).get(epci_id)
+        if detail is None:
+            raise ValueError("EPCI not found")
+        return detail
+
+    return await _cached_async(db, ("detail", epci_id, target_year), _load)
+
+
+async def get_score_details_batch_async(
+    db: AsyncSession,
+    epci_ids: Sequence[str],
+    year: Optional[int] = None,
+) -> ScoreBatchResponse:
+    """``ScoreDetail`` for several EPCIs: cached ones are reused, the rest come from one query."""
+
+    requested = list(dict.fromkeys(epci_ids))
+    if len(requested) > settings.score_batch_max_epcis:
+        raise ValueError(f"At most {settings.score_batch_max_epcis} EPCIs per batch")
+    target_year = await resolve_year_async(db, year)
+
+    details: Dict[str, ScoreDetail] = {}
+    version = await current_data_version_async(db) if settings.score_cache_enabled else None
+    if version is not None:
+        for epci_id in requested:
+            found, detail = response_cache.get(("detail", epci_id, target_year), version)
+            if found:
+                details[epci_id] = detail
+
+    misses = [epci_id for epci_id in requested if epci_id not in details]
+    if misses:
+        fetched = await _fetch_score_details_async(db, misses, target_year)
+        details.update(fetched)
+        if version is not None:
+            for epci_id, detail in fetched.items():
+                response_cache.set(("detail", epci_id, target_year), version, detail)
+
+    return ScoreBatchResponse(
+        year=target_year,
+        items=[details[epci_id] for epci_id in requested if epci_id in details],
+        missing=[epci_id for epci_id in requested if epci_id not in details],
+    )
+
+
+_HISTORY_DIMENSIONS = ("global", "need", "objective", "type", "indicator")
+
+
+def _history_statement(epci_id: str):
+    """Every scored year of every dimension score of ``epci_id`` with its year-over-year delta.
+
+    Years without a score and the undated workbook year 0 are left out
+    before the window, so ``delta`` is computed by a LAG against the previous
+    year that has a score for the same dimension. Bounded by one EPCI's rows
+    of ``score_indicateur``.
+    """
+
+    scores = epci_dimension_scores(include_indicators=True, epci_ids=[epci_id])
+    c = select(scores).where(scores.c.score.is_not(None), scores.c.year != 0).subquery("scored").c
+    series = {"partition_by": [c.dimension, c.dimension_id], "order_by": c.year}
+    label = func.coalesce(Indicator.label, Need.label, Objective.label, IndicatorType.label)
+    return (
+        select(
+            c.dimension,
+            func.nullif(c.dimension_id, "").label("dimension_id"),
+            label.label("label"),
+            cast(c.year, Integer).label("year"),
+            cast(c.score, DOUBLE_PRECISION).label("score"),
+            # Subtract in NUMERIC, then cast: no float noise on the delta.
+            cast(c.score - func.lag(c.score).over(**series), DOUBLE_PRECISION).label("delta"),
+        )
+        .outerjoin(Indicator, (c.dimension == "indicator") & (Indicator.id == c.dimension_id))
+        .outerjoin(Need, (c.dimension == "need") & (Need.id == c.dimension_id))
+        .outerjoin(Objective, (c.dimension == "objective") & (Objective.id == c.dimension_id))
+        .outerjoin(IndicatorType, (c.dimension == "type") & (IndicatorType.id == c.dimension_id))
+        .order_by(c.dimension, label, c.dimension_id, c.year)
+    )
+
+
+async def get_score_history_async(db: AsyncSession, epci_id: str) -> ScoreHistoryResponse:
+    """All years of global, need, objective, type and indicator scores of one EPCI."""
+
+    async def _load() -> ScoreHistoryResponse:
+        rows = (await db.execute(_history_statement(epci_id))).all()
+        if not rows:
+            raise ValueError("EPCI not found")
+        series: Dict[tuple, ScoreHistorySeries] = {}
+        for row in rows:
+            key = (row.dimension, row.dimension_id)
+            if key not in series:
+                series[key] = ScoreHistorySeries(
+                    dimension=row.dimension, id=row.dimension_id, label=row.label, points=[]
+                )
+            series[key].points.append(ScoreHistoryPoint(year=row.year, score=row.score, delta=row.delta))
+        ordered = sorted(series.values(), key=lambda item: _HISTORY_DIMENSIONS.index(item.dimension))
+        return ScoreHistoryResponse(
+            epci_id=epci_id,
+            years=sorted({row.year for row in rows}),
+            series=ordered,
+        )
+
+    return await _cached_async(db, ("history", epci_id), _load)
+
+
+_ROLLUP_FIELDS = ("code", "dimension", "dimension_id", "average", "weighted_average", "epci_count", "population")
+
+
+async def get_score_rollup_async(
+    db: AsyncSession,
+    level: str,
+    year: Optional[int] = None,
+    dimension: Optional[str] = None,
+) -> dict:
+    """Department or region averages from ``score_rollup`` as a plain payload (see ``_list_payload``)."""
+
+    target_year = await resolve_year_async(db, year)
+
+    async def _load() -> dict:
+        cube = await get_score_cube_async(db)
+        if cube is not None:
+            rows = cube.rollup_rows(level, target_year, dimension)
+            return {"level": level, "year": target_year, "items": [dict(zip(_ROLLUP_FIELDS, row)) for row in rows]}
+        filters = [ScoreRollup.level == level, ScoreRollup.year == target_year]
+        if dimension is not None:
+            filters.append(ScoreRollup.dimension == dimension)
+        stmt = (
+            select(
+                ScoreRollup.code,
+                ScoreRollup.dimension,
+                func.nullif(ScoreRollup.dimension_id, ""),
+                cast(ScoreRollup.average, DOUBLE_PRECISION),
+                cast(ScoreRollup.weighted_average, DOUBLE_PRECISION),
+                ScoreRollup.epci_count,
+                cast(ScoreRollup.population, DOUBLE_PRECISION),
+            )
+            .where(*filters)
+            .order_by(ScoreRollup.dimension, ScoreRollup.dimension_id, ScoreRollup.code)
+        )
+        rows = (await db.execute(stmt)).all()
+        return {
+            "level": level,
+            "year": target_year,
+            "items": [dict(zip(_ROLLUP_FIELDS, row)) for row in rows],
+        }
+
+    return await _cached_async(db, ("rollup", level, target_year, dimension), _load)
+
+
+def list_years(db: Session) -> ScoreYearsResponse:
+    years = available_years(db)
+    return ScoreYearsResponse(years=years, latest=years[0] if years else None)
+
+
+async def list_years_async(db: AsyncSession) -> ScoreYearsResponse:
+    years = await available_years_async(db)
+    return ScoreYearsResponse(years=years, latest=years[0] if years else None)
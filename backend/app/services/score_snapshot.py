@@ -0,0 +1,133 @@
+"""Versioned, memory-mapped snapshots of the score cube shared by API workers.
+
+The pipeline writes each published version once, as a directory of ``.npy``
+arrays plus ``index.json`` (cube metadata and array manifest), then points
+``CURRENT`` at it with an atomic rename. Workers open the arrays with
+``np.load(mmap_mode="r")``: pages are shared through the OS page cache, so
+memory per worker stays flat and opening a snapshot takes milliseconds::
+
+    <score_snapshot_dir>/
+        CURRENT                           "v000042-20261018T065000123456"
+        v000042-20261018T065000123456/
+            index.json
+            present.npy  indicator_score.npy  epci_need_score.npy  ...
+
+Older snapshot directories are pruned; a worker still mapping one keeps its
+pages until it swaps (POSIX unlink semantics).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("diag360.score_snapshot")
+
+# 2: need/objective/type arrays read from score_dimension (every indicator link).
+SNAPSHOT_FORMAT = 2
+CURRENT_FILE = "CURRENT"
+INDEX_FILE = "index.json"
+
+
+def _fsync_file(path: Path) -> None:
+    with open(path, "rb") as handle:
+        os.fsync(handle.fileno())
+
+
+def _fsync_directory(path: Path) -> None:
+    descriptor = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def _replace_text(path: Path, text: str) -> None:
+    staging = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    staging.write_text(text + "\n", encoding="utf-8")
+    _fsync_file(staging)
+    os.replace(staging, path)
+    _fsync_directory(path.parent)
+
+
+def current_snapshot(directory: str | Path) -> Optional[str]:
+    """Name of the snapshot ``CURRENT`` points to, or None when nothing is published."""
+
+    try:
+        name = (Path(directory) / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return name or None
+
+
+def write_snapshot(directory: str | Path, meta: dict, arrays: Dict[str, np.ndarray], keep: int = 3) -> Path:
+    """Write ``meta`` and ``arrays`` as a new snapshot and make it current.
+
+    The snapshot is fully written and fsynced in a hidden staging directory
+    before being renamed into place; readers never see a partial snapshot.
+    """
+
+    root = Path(directory)
+    root.mkdir(parents=True, exist_ok=True)
+    name = f"v{int(meta['version']):06d}-{datetime.now(timezone.utc):%Y%m%dT%H%M%S%f}"
+    staging = Path(tempfile.mkdtemp(prefix=f".{name}.", dir=root))
+    try:
+        manifest = {}
+        for array_name, array in arrays.items():
+            path = staging / f"{array_name}.npy"
+            np.save(path, np.ascontiguousarray(array), allow_pickle=False)
+            _fsync_file(path)
+            manifest[array_name] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+        index = {"format": SNAPSHOT_FORMAT, "meta": meta, "arrays": manifest}
+        (staging / INDEX_FILE).write_text(json.dumps(index, ensure_ascii=False), encoding="utf-8")
+        _fsync_file(staging / INDEX_FILE)
+        _fsync_directory(staging)
+        final = root / name
+        os.rename(staging, final)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    _replace_text(root / CURRENT_FILE, name)
+    _prune(root, keep=max(keep, 1))
+    return final
+
+
+def read_snapshot(directory: str | Path, name: Optional[str] = None) -> Optional[Tuple[str, dict, Dict[str, np.ndarray]]]:
+    """Memory-map snapshot ``name`` (default: current) as ``(name, meta, arrays)``.
+
+    Returns None when no snapshot is published; raises ValueError when the
+    snapshot does not match its manifest.
+    """
+
+    name = name or current_snapshot(directory)
+    if name is None:
+        return None
+    path = Path(directory) / name
+    index = json.loads((path / INDEX_FILE).read_text(encoding="utf-8"))
+    if index.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported snapshot format {index.get('format')!r} in {path}")
+    arrays = {}
+    for array_name, spec in index["arrays"].items():
+        array = np.load(path / f"{array_name}.npy", mmap_mode="r", allow_pickle=False)
+        if array.dtype.str != spec["dtype"] or list(array.shape) != spec["shape"]:
+            raise ValueError(f"Snapshot array {array_name} in {path} does not match its manifest")
+        arrays[array_name] = array
+    return name, index["meta"], arrays
+
+
+def _prune(root: Path, keep: int) -> None:
+    """Remove all but the ``keep`` most recent snapshots (names sort by version, then time)."""
+
+    current = current_snapshot(root)
+    snapshots = sorted(path for path in root.iterdir() if path.is_dir() and path.name.startswith("v"))
+    for path in snapshots[:-keep]:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
+            logger.info("Snapshot de scores supprimé : %s", path.name)
@@ -0,0 +1,93 @@
+"""Maintenance of the per-EPCI summary stored in ``score_global``.
+
+``list_scores`` reads this table instead of aggregating ``score_indicateur`` on
+every request. It is refreshed by ``score_publication.publish_scores``, which
+every code path writing indicator scores calls for the years it touched.
+"""
+from __future__ import annotations
+
+import logging
+from typing import Iterable, Optional
+
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.models.diag360_raw import Epci, IndicatorScore, ScoreGlobal
+
+logger = logging.getLogger("diag360.score_summary")
+
+
+def summary_aggregate(years: Optional[list[int]] = None):
+    """Per (EPCI, year) aggregate of ``score_indicateur`` feeding ``score_global``."""
+
+    score_filters = [IndicatorScore.year.in_(years)] if years is not None else []
+    return (
+        select(
+            IndicatorScore.epci_id,
+            IndicatorScore.year,
+            Epci.label,
+            Epci.department_code,
+            Epci.region_code,
+            func.avg(IndicatorScore.global_score),
+            func.count(IndicatorScore.indicator_id),
+            func.max(IndicatorScore.updated_at),
+        )
+        .join(Epci, Epci.id == IndicatorScore.epci_id)
+        .where(*score_filters)
+        .group_by(
+            IndicatorScore.epci_id,
+            IndicatorScore.year,
+            Epci.label,
+            Epci.department_code,
+            Epci.region_code,
+        )
+    )
+
+
+def refresh_score_summary(session: Session, years: Optional[Iterable[int]] = None) -> None:
+    """Recompute ``score_global`` summary columns for ``years`` (all years when None).
+
+    Only the summary columns are overwritten: need/objective/type scores and
+    ``rapport`` written by the aggregation CLI are preserved.
+    """
+
+    year_list = sorted({int(year) for year in years}) if years is not None else None
+    summary_filters = [ScoreGlobal.year.in_(year_list)] if year_list is not None else []
+
+    aggregate = summary_aggregate(year_list)
+    upsert = pg_insert(ScoreGlobal).from_select(
+        [
+            ScoreGlobal.epci_id,
+            ScoreGlobal.year,
+            ScoreGlobal.epci_label,
+            ScoreGlobal.department_code,
+            ScoreGlobal.region_code,
+            ScoreGlobal.global_score,
+            ScoreGlobal.indicator_count,
+            ScoreGlobal.updated_at,
+        ],
+        aggregate,
+    )
+    summary_columns = ["libelle_epci", "departement_code", "region_code", "score_global", "nb_indicateurs", "updated_at"]
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[ScoreGlobal.epci_id, ScoreGlobal.year],
+        set_={column: upsert.excluded[column] for column in summary_columns},
+    )
+    # INSERT rowcount is only kept after the cursor closes when asked for.
+    upserted = session.execute(upsert.execution_options(preserve_rowcount=True)).rowcount
+
+    stale = delete(ScoreGlobal).where(
+        *summary_filters,
+        ~exists().where(
+            IndicatorScore.epci_id == ScoreGlobal.epci_id,
+            IndicatorScore.year == ScoreGlobal.year,
+        ),
+    )
+    removed = session.execute(stale).rowcount
+    logger.info(
+        "score_global rafraîchi (années=%s) : %s lignes à jour, %s supprimées",
+        year_list if year_list is not None else "toutes",
+        upserted,
+        removed,
+    )
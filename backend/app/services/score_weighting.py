@@ -0,0 +1,192 @@
+"""Re-ranking of EPCIs under user-supplied need, objective or type weights.
+
+``score = Σ w_k · s_k / Σ w_k`` over the needs (objectives, types) the EPCI
+has a score for, ``s_k`` being its per-EPCI mean as in the detail view. The
+EPCI × dimension matrix of a year is cached per data version (taken from the
+score cube when loaded, else built by one SQL query), so a request costs two
+matrix–vector products and a sort, whatever the weights.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import cast, select
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.numeric import round_half_up
+from app.models.diag360_raw import Epci
+from app.services.cache import VersionedTTLCache
+from app.services.data_version import current_data_version_async
+from app.services.score_cube import ScoreCube, get_score_cube_async
+from app.services.score_rollup import epci_dimension_scores
+from app.services.score_service import resolve_year_async
+
+WEIGHTED_DIMENSIONS = ("need", "objective", "type")
+
+_WEIGHTED_FIELDS = ("rank", "epci_id", "epci_label", "department_code", "region_code", "score")
+
+_matrix_cache = VersionedTTLCache(max_entries=16, ttl=settings.score_cache_ttl_seconds)
+
+
+@dataclass(frozen=True)
+class DimensionMatrix:
+    """Per-EPCI scores of one dimension and year; rows sorted by EPCI id."""
+
+    dimension_ids: List[str]
+    epci_ids: List[str]
+    epci_labels: List[str]
+    department_codes: List[Optional[str]]
+    region_codes: List[Optional[str]]
+    values: np.ndarray  # EPCI × dimension id, 0 where unknown
+    known: np.ndarray  # 1.0 where the EPCI has a score
+
+
+def _matrix(dimension_ids, epcis: List[tuple], scores: np.ndarray) -> DimensionMatrix:
+    known = ~np.isnan(scores)
+    return DimensionMatrix(
+        dimension_ids=list(dimension_ids),
+        epci_ids=[row[0] for row in epcis],
+        epci_labels=[row[1] for row in epcis],
+        department_codes=[row[2] for row in epcis],
+        region_codes=[row[3] for row in epcis],
+        values=np.ascontiguousarray(np.where(known, scores, 0.0)),
+        known=np.ascontiguousarray(known, dtype=np.float64),
+    )
+
+
+def matrix_from_cube(cube: ScoreCube, dimension: str, year: int) -> DimensionMatrix:
+    position = cube.year_index.get(year)
+    if position is None:
+        return _matrix([], [], np.empty((0, 0)))
+    rows = cube.rows[dimension][:, :, position] > 0
+    listed = np.flatnonzero(rows.any(axis=1))
+    columns = np.flatnonzero(rows.any(axis=0))
+    epcis = [
+        (cube.epci_ids[epci], cube.epci_labels[epci], cube.department_codes[epci], cube.region_codes[epci])
+        for epci in listed.tolist()
+    ]
+    ids = [cube.dimension_ids[dimension][column] for column in columns.tolist()]
+    return _matrix(ids, epcis, cube.scores[dimension][np.ix_(listed, columns, [position])][:, :, 0])
+
+
+def matrix_statement(dimension: str, year: int):
+    c = epci_dimension_scores([year]).c
+    return (
+        select(
+            c.epci_id,
+            Epci.label,
+            Epci.department_code,
+            Epci.region_code,
+            c.dimension_id,
+            cast(c.score, DOUBLE_PRECISION),
+        )
+        .join(Epci, Epci.id == c.epci_id)
+        .where(c.dimension == dimension)
+        .order_by(c.epci_id, c.dimension_id)
+    )
+
+
+def matrix_from_rows(rows) -> DimensionMatrix:
+    dimension_ids = sorted({row[4] for row in rows})
+    column_of = {dimension_id: column for column, dimension_id in enumerate(dimension_ids)}
+    epcis: List[tuple] = []
+    scores: List[List[float]] = []
+    for epci_id, label, department_code, region_code, dimension_id, score in rows:
+        if not epcis or epcis[-1][0] != epci_id:
+            epcis.append((epci_id, label, department_code, region_code))
+            scores.append([math.nan] * len(dimension_ids))
+        scores[-1][column_of[dimension_id]] = math.nan if score is None else score
+    return _matrix(dimension_ids, epcis, np.array(scores, dtype=np.float64).reshape(len(epcis), len(dimension_ids)))
+
+
+async def _dimension_matrix_async(db: AsyncSession, dimension: str, year: int) -> DimensionMatrix:
+    version = await current_data_version_async(db)
+    key = (dimension, year)
+    found, matrix = _matrix_cache.get(key, version)
+    if not found:
+        cube = await get_score_cube_async(db)
+        if cube is not None:
+            matrix = matrix_from_cube(cube, dimension, year)
+        else:
+            matrix = matrix_from_rows((await db.execute(matrix_statement(dimension, year))).all())
+        _matrix_cache.set(key, version, matrix)
+    return matrix
+
+
+def weighted_ranking(matrix: DimensionMatrix, weights: Dict[str, float], limit: Optional[int] = None) -> dict:
+    """Rank every EPCI of ``matrix`` by its ``weights``-weighted score.
+
+    Weights are normalised to sum to 1; ids left out weigh 0. Scores are
+    rounded to 2 decimals and ranked like ``score_rank`` (ties share a rank);
+    EPCIs without any weighted score come last, unranked.
+    """
+
+    column_of = {dimension_id: column for column, dimension_id in enumerate(matrix.dimension_ids)}
+    unknown = sorted(set(weights) - set(column_of))
+    if unknown:
+        raise ValueError(f"Unknown ids: {', '.join(unknown)}")
+    if any(not math.isfinite(weight) or weight < 0 for weight in weights.values()):
+        raise ValueError("Weights must be finite and non-negative")
+    total_weight = sum(weights.values())
+    if total_weight <= 0:
+        raise ValueError("At least one weight must be positive")
+
+    vector = np.zeros(len(matrix.dimension_ids))
+    for dimension_id, weight in weights.items():
+        vector[column_of[dimension_id]] = weight / total_weight
+    numerator = matrix.values @ vector
+    denominator = matrix.known @ vector
+    with np.errstate(invalid="ignore", divide="ignore"):
+        scores = round_half_up(np.where(denominator > 0, numerator / denominator, np.nan), 2)
+
+    # Descending score, NaN last; stable, so ties keep EPCI id order.
+    order = np.argsort(-scores, kind="stable")
+    ordered = scores[order]
+    scored = int((~np.isnan(ordered)).sum())
+    ranks = np.searchsorted(-ordered[:scored], -ordered[:scored], side="left") + 1
+
+    rank_list = ranks.tolist()
+    score_list = ordered.tolist()
+    items = []
+    for position, epci in enumerate(order[:limit].tolist()):
+        items.append(
+            dict(
+                zip(
+                    _WEIGHTED_FIELDS,
+                    (
+                        rank_list[position] if position < scored else None,
+                        matrix.epci_ids[epci],
+                        matrix.epci_labels[epci],
+                        matrix.department_codes[epci],
+                        matrix.region_codes[epci],
+                        score_list[position] if position < scored else None,
+                    ),
+                )
+            )
+        )
+    return {
+        "weights": {dimension_id: weight / total_weight for dimension_id, weight in weights.items()},
+        "total": len(matrix.epci_ids),
+        "items": items,
+    }
+
+
+async def get_weighted_scores_async(
+    db: AsyncSession,
+    dimension: str,
+    weights: Dict[str, float],
+    year: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> dict:
+    """``ScoreWeightedResponse``-shaped payload of EPCIs re-ranked under ``weights``."""
+
+    if dimension not in WEIGHTED_DIMENSIONS:
+        raise ValueError(f"dimension must be one of {', '.join(WEIGHTED_DIMENSIONS)}")
+    target_year = await resolve_year_async(db, year)
+    matrix = await _dimension_matrix_async(db, dimension, target_year)
+    return {"dimension": dimension, "year": target_year, **weighted_ranking(matrix, weights, limit)}
@@ -0,0 +1,81 @@
+"""EPCI search backed by the ``pg_trgm`` / SIREN prefix indexes.
+
+Numeric terms match SIREN prefixes (``idx_epci_id_prefix``); other terms match
+the accent-insensitive label through the ``f_unaccent_lower`` trigram index
+(``idx_epci_libelle_trgm``). See ``docker/postgres/init/007_search_indexes.sql``.
+"""
+from __future__ import annotations
+
+from sqlalchemy import case, func, literal, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.diag360_raw import Epci
+from app.schemas.territory import TerritorySearchResponse, TerritorySearchResult
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _is_siren_term(term: str) -> bool:
+    return term.isdigit()
+
+
+def epci_search_clause(term: str):
+    """WHERE clause on ``Epci`` matching ``term`` through the search indexes."""
+
+    term = term.strip()
+    if _is_siren_term(term):
+        return Epci.id.like(f"{_escape_like(term)}%", escape="\\")
+    normalised_label = func.f_unaccent_lower(Epci.label)
+    pattern = literal("%") + func.f_unaccent_lower(_escape_like(term)) + literal("%")
+    return normalised_label.like(pattern, escape="\\")
+
+
+def search_territories(db: Session, term: str, limit: int = 10) -> TerritorySearchResponse:
+    """Ranked autocomplete: SIREN prefix, then label prefix, substring and fuzzy matches."""
+
+    term = term.strip()
+    if _is_siren_term(term):
+        stmt = (
+            select(Epci.id, Epci.label, Epci.department_code, Epci.region_code, literal(1.0).label("rank"))
+            .where(epci_search_clause(term))
+            .order_by(Epci.id)
+            .limit(limit)
+        )
+    else:
+        normalised_label = func.f_unaccent_lower(Epci.label)
+        normalised_term = func.f_unaccent_lower(term)
+        similarity = func.word_similarity(normalised_term, normalised_label)
+        prefix_bonus = case(
+            (normalised_label.like(func.f_unaccent_lower(_escape_like(term)) + literal("%"), escape="\\"), 1.0),
+            else_=0.0,
+        )
+        rank = (prefix_bonus + similarity).label("rank")
+        stmt = (
+            select(Epci.id, Epci.label, Epci.department_code, Epci.region_code, rank)
+            .where(
+                or_(
+                    epci_search_clause(term),
+                    # Typo-tolerant match: index-assisted word_similarity above
+                    # pg_trgm.word_similarity_threshold.
+                    normalised_term.op("<%")(normalised_label),
+                )
+            )
+            .order_by(rank.desc(), Epci.label)
+            .limit(limit)
+        )
+
+    rows = db.execute(stmt).all()
+    return TerritorySearchResponse(
+        items=[
+            TerritorySearchResult(
+                epci_id=row.id,
+                epci_label=row.label,
+                department_code=row.department_code,
+                region_code=row.region_code,
+                rank=float(row.rank),
+            )
+            for row in rows
+        ]
+    )
@@ -25,7 +25,8 @@ import pandas as pd
 from sqlalchemy import select
 
 from app.db import SessionLocal
-from app.models import Indicator, IndicatorValue
+from app.models import Indicator
+from app.services.bulk_upsert import upsert_indicator_values
 
 
 logger = logging.getLogger(__name__)
@@ -82,21 +83,8 @@ def transform_df_to_raw_values(df: pd.DataFrame) -> Iterator[RawValue]:
 
 
 def persist_values(session, rows: Iterable[RawValue]) -> int:
-    """Insérer ou mettre à jour les valeurs brutes."""
-
-    inserted = 0
-    for row in rows:
-        record = IndicatorValue(
-            epci_id=row.epci_id,
-            indicator_id=row.indicator_id,
-            year=row.year,
-            value=row.value,
-            unit=row.unit,
-            source=row.source,
-            meta=row.meta or {},
-        )
-        session.merge(record)
-        inserted += 1
+    """Insérer ou mettre à jour les valeurs brutes (COPY + upsert ensembliste)."""
+    inserted = upsert_indicator_values(session, rows)
     session.commit()
     return inserted
 
@@ -22,7 +22,8 @@ from sqlalchemy import select
 backend_path = Path(__file__).resolve().parent.parent.parent
 sys.path.append(str(backend_path))
 from app.db import SessionLocal
-from app.models import Indicator, IndicatorValue
+from app.models import Indicator
+from app.services.bulk_upsert import upsert_indicator_values
 
 # Import de vos fonctions utilitaires existantes
 scripts_path = backend_path / "scripts"
@@ -228,22 +229,9 @@ def transform_payload(df: pd.DataFrame) -> Iterator[RawValue]:
 
 
 def persist_values(session, rows: Iterable[RawValue]) -> int:
-    """Insérer ou mettre à jour les valeurs brutes."""
-    inserted = 0
-    for row in rows:
-        record = IndicatorValue(
-            epci_id=row.epci_id,
-            indicator_id=row.indicator_id,
-            year=row.year,
-            value=row.value,
-            unit=row.unit,
-            source=row.source or DEFAULT_SOURCE,
-            meta=row.meta or {},
-        )
-        session.merge(record)
-        inserted += 1
+    """Insérer ou mettre à jour les valeurs brutes (COPY + upsert ensembliste)."""
+    inserted = upsert_indicator_values(session, rows, default_source=DEFAULT_SOURCE)
     session.commit()
-    logger.info(f"Commit de {inserted} valeurs en base")
     return inserted
 
 
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Charge concurrente sur les routes scores : handlers sync (threadpool) vs async.
+
+Démarre dans un processus séparé une application uvicorn exposant chaque
+variante (`/sync/...` avec `Session`, `/async/...` avec `AsyncSession`), puis
+ouvre `--clients` connexions simultanées pendant `--duration` secondes et
+affiche débit, latences p50/p95/p99 et erreurs. Le cache de réponses est
+désactivé pour mesurer le chemin PostgreSQL.
+
+    python scripts/bench/bench_api_concurrency.py --year 0 --clients 200 --duration 20
+
+`--base-url http://host/api/scores` mesure une instance déjà déployée
+(routes `/{epci_id}` et liste) au lieu du serveur embarqué.
+
+Nécessite httpx (`pip install httpx`).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import uvicorn
+from fastapi import Depends, FastAPI
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+backend_path = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(backend_path))
+from app.core.config import settings
+from app.db import SessionLocal, engine, get_async_db, get_db
+from app.models import ScoreGlobal
+from app.services import score_service
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - outil de mesure uniquement
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_list(year: int, offset: int = 0, db: Session = Depends(get_db)):
+        return score_service.list_scores(db, limit=50, offset=offset, year=year)
+
+    @app.get("/sync/{epci_id}")
+    def sync_detail(epci_id: str, year: int, db: Session = Depends(get_db)):
+        return score_service.get_score_detail(db, epci_id, year)
+
+    @app.get("/async")
+    async def async_list(year: int, offset: int = 0, db: AsyncSession = Depends(get_async_db)):
+        return await score_service.list_scores_async(db, limit=50, offset=offset, year=year)
+
+    @app.get("/async/{epci_id}")
+    async def async_detail(epci_id: str, year: int, db: AsyncSession = Depends(get_async_db)):
+        return await score_service.get_score_detail_async(db, epci_id, year)
+
+    return app
+
+
+def serve(port: int) -> None:
+    settings.score_cache_enabled = False
+    uvicorn.Server(uvicorn.Config(build_app(), host="127.0.0.1", port=port, log_level="warning")).run()
+
+
+async def wait_until_ready(base_url: str, timeout: float = 15.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                await client.get(f"{base_url}/docs")
+                return
+            except httpx.TransportError:
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.2)
+
+
+async def load(base_url: str, paths: list[str], clients: int, duration: float) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+
+        async def worker(seed: int) -> None:
+            nonlocal errors
+            rng = random.Random(seed)
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(rng.choice(paths))
+                    ok = response.status_code == 200
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(index) for index in range(clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    def percentile(value: float) -> float:
+        return latencies[max(0, int(len(latencies) * value) - 1)] if latencies else float("nan")
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) if latencies else float("nan"),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+    }
+
+
+def report(label: str, result: dict) -> None:
+    print(
+        f"{label:<14} req/s={result['rps']:8.1f} ok={result['requests']:<7} erreurs={result['errors']:<5} "
+        f"p50={result['p50']:.1f}ms p95={result['p95']:.1f}ms p99={result['p99']:.1f}ms"
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark de charge sync vs async des routes scores")
+    parser.add_argument("--year", type=int, default=0, help="Année ciblée")
+    parser.add_argument("--clients", type=int, default=200, help="Clients simultanés")
+    parser.add_argument("--duration", type=float, default=20.0, help="Durée de chaque mesure (s)")
+    parser.add_argument("--endpoint", choices=("detail", "list"), default="detail")
+    parser.add_argument("--port", type=int, default=8765, help="Port du serveur embarqué")
+    parser.add_argument("--base-url", help="Mesurer une instance existante (ex. http://localhost:8000/api/scores)")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    args = build_parser().parse_args()
+    if httpx is None:
+        logger.error("httpx est requis : pip install httpx")
+        return 1
+
+    session = SessionLocal()
+    try:
+        epci_ids = session.execute(select(ScoreGlobal.epci_id).where(ScoreGlobal.year == args.year)).scalars().all()
+    finally:
+        session.close()
+    # Le serveur embarqué est forké : il ne doit pas hériter des connexions du parent.
+    engine.dispose()
+    if not epci_ids:
+        logger.warning("Aucun EPCI avec des scores pour l'année %s", args.year)
+        return 1
+
+    rng = random.Random(args.seed)
+    if args.endpoint == "detail":
+        suffixes = [f"/{epci_id}?year={args.year}" for epci_id in rng.choices(epci_ids, k=1000)]
+    else:
+        suffixes = [f"?year={args.year}&offset={rng.randrange(0, len(epci_ids), 50)}" for _ in range(1000)]
+
+    print(
+        f"{args.clients} clients, {args.duration:.0f}s par variante, endpoint={args.endpoint}, "
+        f"pool={settings.db_pool_size}+{settings.db_max_overflow}"
+    )
+    if args.base_url:
+        base_url = args.base_url.rstrip("/")
+        report("instance", asyncio.run(load(base_url, [f"{base_url}{s}" for s in suffixes], args.clients, args.duration)))
+        return 0
+
+    server = multiprocessing.Process(target=serve, args=(args.port,), daemon=True)
+    server.start()
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        asyncio.run(wait_until_ready(base_url))
+        for variant in ("sync", "async"):
+            paths = [f"/{variant}{suffix}" for suffix in suffixes]
+            asyncio.run(load(base_url, paths[:50], min(args.clients, 10), 2.0))  # chauffe du pool
+            report(variant, asyncio.run(load(base_url, paths, args.clients, args.duration)))
+    finally:
+        server.terminate()
+        server.join()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
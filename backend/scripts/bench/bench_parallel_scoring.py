@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Scoring parallèle (`compute_indicator_scores --jobs N`) : équivalence et temps de calcul.
+
+Calcule les scores de toutes les unités indicateur × année, d'abord en série
+(une lecture par année), puis via `score_units_parallel` (une lecture par
+paquet d'indicateurs d'une année, environ N paquets par année) pour chaque
+nombre de processus demandé, sans écrire en base. Vérifie que chaque unité reçoit les
+mêmes scores (code retour 1 sinon) et rapporte durée totale et p50/max par
+unité. L'accélération dépend du nombre de cœurs disponibles.
+
+    python scripts/bench/bench_parallel_scoring.py --jobs 2 --jobs 4 --jobs 16
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+backend_path = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(backend_path))
+from app.calculations import scoring_engine
+from app.db import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, action="append", default=None, help="Nombre de processus (répétable)")
+    parser.add_argument("--method", default="minmax", choices=[m for m in scoring_engine.NORMALISATIONS if m != "threshold"])
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    job_counts = args.jobs or [2, os.cpu_count() or 1]
+
+    expected = {}
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        for year in scoring_engine.value_years(db):
+            matrix = scoring_engine.load_value_matrix(db, year)
+            scores = scoring_engine.normalise(matrix.values, args.method)
+            for column, indicator_id in enumerate(matrix.indicator_ids):
+                present = ~np.isnan(scores[:, column])
+                epci_ids = [matrix.epci_ids[row] for row in np.flatnonzero(present).tolist()]
+                expected[indicator_id, year] = dict(zip(epci_ids, scores[present, column].tolist()))
+    logger.info("Série (lecture par année) : %s unités en %.2fs", len(expected), time.perf_counter() - started)
+    engine.dispose()
+
+    mismatches = 0
+    for jobs in job_counts:
+        started = time.perf_counter()
+        results = scoring_engine.score_units_parallel(expected, jobs, method=args.method)
+        elapsed = time.perf_counter() - started
+        busy = [result.read_seconds + result.normalise_seconds for result in results]
+        logger.info(
+            "--jobs %-3s : %.2fs, par unité p50=%.1f ms max=%.1f ms",
+            jobs,
+            elapsed,
+            statistics.median(busy) * 1000,
+            max(busy) * 1000,
+        )
+        for result in results:
+            matrix = result.matrix
+            present = np.flatnonzero(~np.isnan(result.scores[:, 0])).tolist()
+            actual = {matrix.epci_ids[row]: float(result.scores[row, 0]) for row in present}
+            if actual != expected[result.indicator_id, result.year]:
+                mismatches += 1
+                logger.error("Écart pour %s/%s (--jobs %s)", result.indicator_id, result.year, jobs)
+    logger.info("%s écart(s)", mismatches)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
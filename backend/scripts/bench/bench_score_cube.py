@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Cube NumPy en mémoire vs SQL : équivalence des réponses et latences p50/p95.
+
+Charge le cube (temps, mémoire), puis compare pour un échantillon d'EPCI la
+liste (tri score / code / nom, recherche, curseur), le détail avec rangs et
+les agrégats départementaux/régionaux. Parcourt aussi chaque tri page par page
+en alternant cube et SQL avec le même `next_cursor` (bascule pendant un
+rechargement) : aucun EPCI ne doit être sauté ni dupliqué. Code retour 1 si
+une réponse diffère.
+
+    python scripts/bench/bench_score_cube.py --samples 200
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import select
+
+backend_path = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(backend_path))
+from app.db import SessionLocal
+from app.models import ScoreRollup
+from app.services import score_cube, score_service
+
+logger = logging.getLogger(__name__)
+
+
+def _same(left, right) -> bool:
+    if isinstance(left, float) and isinstance(right, float):
+        return math.isclose(left, right, rel_tol=1e-9, abs_tol=1e-6)
+    if isinstance(left, dict) and isinstance(right, dict):
+        return left.keys() == right.keys() and all(_same(left[key], right[key]) for key in left)
+    if isinstance(left, (list, tuple)) and isinstance(right, (list, tuple)):
+        return len(left) == len(right) and all(_same(a, b) for a, b in zip(left, right))
+    return left == right
+
+
+def _percentiles(samples: list[float]) -> str:
+    ordered = sorted(samples)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    return f"p50={statistics.median(ordered) * 1000:.3f}ms p95={p95 * 1000:.3f}ms"
+
+
+def sql_list(db, year, order_by, limit, search=None, keyset=None):
+    filters = score_service._list_filters(search, year)
+    total = int(db.execute(score_service._count_statement(filters)).scalar() or 0)
+    rows = db.execute(score_service._page_statement(filters, limit, 0, order_by, keyset)).all()
+    return score_service._list_payload(rows, total, order_by, limit)
+
+
+def cube_list(cube, year, order_by, limit, search=None, keyset=None):
+    rows, total = cube.list_rows(search, limit, 0, order_by, year, keyset, True)
+    return score_service._list_payload(rows, total, order_by, limit)
+
+
+def sql_rollup(db, level, year):
+    stmt = (
+        select(
+            ScoreRollup.code,
+            ScoreRollup.dimension,
+            ScoreRollup.dimension_id,
+            ScoreRollup.average,
+            ScoreRollup.weighted_average,
+            ScoreRollup.epci_count,
+            ScoreRollup.population,
+        )
+        .where(ScoreRollup.level == level, ScoreRollup.year == year)
+        .order_by(ScoreRollup.dimension, ScoreRollup.dimension_id, ScoreRollup.code)
+    )
+    return [
+        (code, dimension, dimension_id or None, *(None if v is None else float(v) for v in (avg, wavg)), count,
+         None if population is None else float(population))
+        for code, dimension, dimension_id, avg, wavg, count, population in db.execute(stmt)
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--year", type=int, default=None)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=360)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    random.seed(args.seed)
+
+    mismatches = 0
+
+    def check(name: str, left, right) -> None:
+        nonlocal mismatches
+        if not _same(left, right):
+            mismatches += 1
+            logger.error("Écart cube/SQL : %s", name)
+
+    with SessionLocal() as db:
+        started = time.perf_counter()
+        cube = score_cube.load_score_cube(db)
+        load_seconds = time.perf_counter() - started
+        stats = cube.stats()
+        logger.info(
+            "Cube chargé en %.2fs : %s EPCI × %s indicateurs × %s années, %.1f Mo",
+            load_seconds,
+            stats["epcis"],
+            stats["indicators"],
+            len(stats["years"]),
+            stats["bytes"] / 1e6,
+        )
+        year = args.year if args.year is not None else score_service._cube_years(cube)[0]
+
+        for order_by in ("score", "code", "name"):
+            check(f"liste {order_by}", cube_list(cube, year, order_by, 100), sql_list(db, year, order_by, 100))
+            first = cube_list(cube, year, order_by, 100)
+            if first["next_cursor"]:
+                keyset = score_service.decode_cursor(first["next_cursor"], order_by)
+                check(
+                    f"liste {order_by} page 2",
+                    cube_list(cube, year, order_by, 100, keyset=keyset),
+                    sql_list(db, year, order_by, 100, keyset=keyset),
+                )
+            # Pagination cube → SQL → cube… avec les mêmes curseurs.
+            expected = [item["epci_id"] for item in cube_list(cube, year, order_by, 100_000)["items"]]
+            seen, keyset, page = [], None, 0
+            while True:
+                source = cube_list if page % 2 == 0 else lambda *a, **k: sql_list(db, *a[1:], **k)
+                payload = source(cube, year, order_by, 97, keyset=keyset)
+                seen.extend(item["epci_id"] for item in payload["items"])
+                if not payload["next_cursor"]:
+                    break
+                keyset = score_service.decode_cursor(payload["next_cursor"], order_by)
+                page += 1
+            check(f"pagination alternée cube/SQL {order_by} ({page + 1} pages)", seen, expected)
+        by_name = lambda payload: sorted(payload["items"], key=lambda item: item["epci_id"])  # noqa: E731
+        for term in ("com", "2", "agglo"):
+            check(
+                f"recherche {term!r}",
+                by_name(cube_list(cube, year, "name", 5000, search=term)),
+                by_name(sql_list(db, year, "name", 5000, search=term)),
+            )
+
+        for level in ("department", "region"):
+            check(f"rollup {level}", cube.rollup_rows(level, year), sql_rollup(db, level, year))
+
+        epci_ids = [row.epci_id for row in cube.list_rows(None, 100_000, 0, "code", year, None, False)[0]]
+        sample = random.sample(epci_ids, min(args.samples, len(epci_ids)))
+        sql_times, cube_times = [], []
+        for epci_id in sample:
+            started = time.perf_counter()
+            expected = score_service._details_from_rows(
+                db.execute(score_service._detail_statement([epci_id], year)).mappings()
+            )[epci_id]
+            sql_times.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            actual = cube.detail(epci_id, year)
+            cube_times.append(time.perf_counter() - started)
+            left, right = actual.model_dump(), expected.model_dump()
+            for key in ("needs", "objectives", "types", "indicators"):
+                sort_key = "indicator_id" if key == "indicators" else "id"
+                left[key].sort(key=lambda item: item[sort_key])
+                right[key].sort(key=lambda item: item[sort_key])
+            check(f"détail {epci_id}", left, right)
+
+        timings = {"liste": ([], []), "rollup": ([], [])}
+        for _ in range(min(args.samples, 50)):
+            for name, run_sql, run_cube in (
+                ("liste", lambda: sql_list(db, year, "score", 50), lambda: cube_list(cube, year, "score", 50)),
+                ("rollup", lambda: sql_rollup(db, "department", year), lambda: cube.rollup_rows("department", year)),
+            ):
+                for run, samples in zip((run_sql, run_cube), timings[name]):
+                    started = time.perf_counter()
+                    run()
+                    samples.append(time.perf_counter() - started)
+
+    logger.info("Détail SQL  : %s", _percentiles(sql_times))
+    logger.info("Détail cube : %s", _percentiles(cube_times))
+    for name, (sql_samples, cube_samples) in timings.items():
+        logger.info("%s SQL  : %s", name.capitalize(), _percentiles(sql_samples))
+        logger.info("%s cube : %s", name.capitalize(), _percentiles(cube_samples))
+    logger.info("%s écart(s)", mismatches)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
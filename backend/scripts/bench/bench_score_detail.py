@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Benchmark de `get_score_detail` : 5 requêtes (ancien code) vs GROUPING SETS.
+
+Compte les requêtes SQL émises et mesure les latences p50/p95 sur un
+échantillon d'EPCI de l'année cible, en simulant les rafales de clics sur la carte.
+
+    python scripts/bench/bench_score_detail.py --year 0 --samples 200
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import asc, event, func, select
+
+backend_path = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(backend_path))
+from app.db import SessionLocal, engine
+from app.models import Epci, Indicator, IndicatorScore, IndicatorType, Need, Objective, ScoreGlobal
+from app.services import score_service
+
+logger = logging.getLogger(__name__)
+
+
+def legacy_get_score_detail(db, epci_id: str, year: int):
+    """Reproduction de l'implémentation historique (une requête par niveau)."""
+
+    slice_filter = (IndicatorScore.year == year, IndicatorScore.epci_id == epci_id)
+    summary = db.execute(
+        select(
+            IndicatorScore.epci_id,
+            Epci.label,
+            func.avg(IndicatorScore.global_score),
+            func.count(IndicatorScore.indicator_id),
+            func.max(IndicatorScore.updated_at),
+        )
+        .join(Epci, Epci.id == IndicatorScore.epci_id)
+        .where(*slice_filter)
+        .group_by(IndicatorScore.epci_id, Epci.label)
+    ).first()
+    if summary is None:
+        raise ValueError("EPCI not found")
+    for id_column, score_column, model in (
+        (IndicatorScore.need_id, IndicatorScore.need_score, Need),
+        (IndicatorScore.objective_id, IndicatorScore.objective_score, Objective),
+        (IndicatorScore.type_id, IndicatorScore.type_score, IndicatorType),
+    ):
+        db.execute(
+            select(id_column, model.label, func.avg(score_column))
+            .join(model, model.id == id_column, isouter=True)
+            .where(*slice_filter, id_column.is_not(None))
+            .group_by(id_column, model.label)
+            .order_by(asc(model.label))
+        ).all()
+    db.execute(
+        select(IndicatorScore, Indicator.label, Need.label, Objective.label, IndicatorType.label)
+        .join(Indicator, Indicator.id == IndicatorScore.indicator_id)
+        .join(Need, Need.id == IndicatorScore.need_id, isouter=True)
+        .join(Objective, Objective.id == IndicatorScore.objective_id, isouter=True)
+        .join(IndicatorType, IndicatorType.id == IndicatorScore.type_id, isouter=True)
+        .where(*slice_filter)
+        .order_by(asc(Indicator.label))
+    ).all()
+
+
+def measure(label: str, func_, epci_ids: list[str], year: int) -> None:
+    statements = 0
+
+    def _count(*_args, **_kwargs):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    durations = []
+    try:
+        for epci_id in epci_ids:
+            session = SessionLocal()
+            try:
+                started = time.perf_counter()
+                func_(session, epci_id, year)
+                durations.append((time.perf_counter() - started) * 1000)
+            finally:
+                session.close()
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    durations.sort()
+    p95 = durations[max(0, int(len(durations) * 0.95) - 1)]
+    print(
+        f"{label:<16} requêtes/appel={statements / len(epci_ids):.1f} "
+        f"p50={statistics.median(durations):.2f}ms p95={p95:.2f}ms"
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark get_score_detail (avant/après)")
+    parser.add_argument("--year", type=int, default=0, help="Année ciblée")
+    parser.add_argument("--samples", type=int, default=200, help="Nombre d'appels par variante")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s - %(message)s")
+    args = build_parser().parse_args()
+
+    session = SessionLocal()
+    try:
+        epci_ids = session.execute(select(ScoreGlobal.epci_id).where(ScoreGlobal.year == args.year)).scalars().all()
+    finally:
+        session.close()
+    if not epci_ids:
+        logger.warning("Aucun EPCI avec des scores pour l'année %s", args.year)
+        return
+
+    sample = random.Random(args.seed).choices(epci_ids, k=args.samples)
+    # Une passe de chauffe pour ne pas mesurer l'ouverture du pool.
+    measure("chauffe", lambda db, epci_id, year: score_service.get_score_detail(db, epci_id, year), sample[:5], args.year)
+    measure("5 requêtes", legacy_get_score_detail, sample, args.year)
+    measure("grouping sets", lambda db, epci_id, year: score_service.get_score_detail(db, epci_id, year), sample, args.year)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Snapshot mmap du cube de scores : démarrage à froid et mémoire par worker.
+
+Publie un snapshot dans un répertoire temporaire (ou `--dir`), puis lance N
+processus « workers » qui ouvrent le cube soit depuis la base, soit depuis le
+snapshot, servent des détails sur tout le territoire et rapportent leur temps
+d'ouverture et leur mémoire (RSS, PSS : les pages partagées du snapshot sont
+réparties entre workers). Vérifie aussi que le cube du snapshot répond comme
+celui chargé en base (code retour 1 sinon).
+
+    python scripts/bench/bench_score_snapshot.py --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import logging
+import multiprocessing
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+backend_path = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(backend_path))
+from app.db import SessionLocal, engine
+from app.services import score_cube, score_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+def _memory_kb() -> dict:
+    values = {}
+    with open("/proc/self/smaps_rollup", encoding="ascii") as handle:
+        for line in handle:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower()] = int(rest.split()[0])
+    return values
+
+
+def _worker(source: str, directory: str, year: int, barrier, results) -> None:
+    engine.dispose(close=False)
+    started = time.perf_counter()
+    if source == "snapshot":
+        name, meta, arrays = score_snapshot.read_snapshot(directory)
+        cube = score_cube.ScoreCube(meta, arrays)
+    else:
+        with SessionLocal() as session:
+            cube = score_cube.load_score_cube(session)
+    opened = time.perf_counter() - started
+    for epci_id in cube.epci_ids:
+        cube.detail(epci_id, year)
+    cube.rollup_rows("department", year)
+    # Every worker is mapped before anyone measures: PSS splits the shared pages.
+    barrier.wait()
+    memory = _memory_kb()
+    results.put((source, opened, memory["rss"], memory["pss"]))
+    barrier.wait()
+
+
+def _run(source: str, directory: str, year: int, workers: int) -> list:
+    context = multiprocessing.get_context("fork")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_worker, args=(source, directory, year, barrier, results)) for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return collected
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", default=None, help="Répertoire de snapshots (défaut : temporaire)")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    with tempfile.TemporaryDirectory(prefix="diag360-snapshots-") as scratch:
+        directory = args.dir or scratch
+        started = time.perf_counter()
+        path = score_cube.publish_score_snapshot(directory)
+        logger.info("Snapshot publié en %.2fs : %s", time.perf_counter() - started, path)
+
+        with SessionLocal() as session:
+            reference = score_cube.load_score_cube(session)
+        _, meta, arrays = score_snapshot.read_snapshot(directory)
+        mapped = score_cube.ScoreCube(meta, arrays)
+        year = max(reference.years)
+        mismatches = sum(
+            reference.detail(epci_id, year) != mapped.detail(epci_id, year) for epci_id in reference.epci_ids
+        )
+        mismatches += reference.rollup_rows("region", year) != mapped.rollup_rows("region", year)
+        logger.info("%s écart(s) entre cube chargé en base et cube du snapshot", mismatches)
+
+        # Workers are forked: do not hand them the cubes built here.
+        del reference, mapped, arrays
+        gc.collect()
+        engine.dispose()
+        for source in ("database", "snapshot"):
+            rows = _run(source, directory, year, args.workers)
+            opened = sorted(row[1] for row in rows)
+            logger.info(
+                "%-8s : ouverture p50=%.3fs, par worker RSS=%.1f Mo PSS=%.1f Mo (moyenne sur %s workers)",
+                source,
+                opened[len(opened) // 2],
+                sum(row[2] for row in rows) / len(rows) / 1024,
+                sum(row[3] for row in rows) / len(rows) / 1024,
+                len(rows),
+            )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Moteur de scoring vectorisé : équivalence avec la boucle par ligne et passage à l'échelle.
+
+Lit une année de `valeur_indicateur`, calcule les scores min/max avec
+l'ancienne implémentation du template (dictionnaires + générateurs Python) et
+avec `scoring_engine.normalise`, compare les deux (code retour 1 en cas
+d'écart), puis mesure le temps de normalisation de chaque méthode sur la
+matrice répliquée ×1, ×2, ×4, ×8 (le temps doit croître linéairement avec le
+nombre de cellules). Aucune écriture en base.
+
+    python scripts/bench/bench_scoring_engine.py --year 2024
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+
+backend_path = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(backend_path))
+from app.calculations import scoring_engine
+from app.db import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def row_loop_minmax(matrix: scoring_engine.ValueMatrix) -> dict:
+    """Scores {(epci, indicateur): score} calculés comme l'ancien template."""
+
+    raw_values: dict[str, dict[str, float]] = defaultdict(dict)
+    for epci, indicator in zip(*np.nonzero(~np.isnan(matrix.values))):
+        raw_values[matrix.indicator_ids[indicator]][matrix.epci_ids[epci]] = float(matrix.values[epci, indicator])
+    scores = {}
+    for indicator_id, epci_map in raw_values.items():
+        min_value = min(epci_map.values())
+        max_value = max(epci_map.values())
+        span = max(max_value - min_value, 1e-9)
+        for epci_id, value in epci_map.items():
+            scores[epci_id, indicator_id] = round((value - min_value) / span * 100, 2)
+    return scores
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--year", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=5, help="Mesures par taille (médiane retenue)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    with SessionLocal() as db:
+        year = args.year if args.year is not None else scoring_engine.value_years(db)[-1]
+        started = time.perf_counter()
+        matrix = scoring_engine.load_value_matrix(db, year)
+        logger.info(
+            "%s valeurs (%s EPCI × %s indicateurs) lues en %.2fs",
+            matrix.cells,
+            len(matrix.epci_ids),
+            len(matrix.indicator_ids),
+            time.perf_counter() - started,
+        )
+
+    started = time.perf_counter()
+    expected = row_loop_minmax(matrix)
+    loop_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    scores = scoring_engine.normalise(matrix.values, "minmax")
+    vector_seconds = time.perf_counter() - started
+    logger.info("min/max boucle par ligne : %.3fs, vectorisé : %.4fs", loop_seconds, vector_seconds)
+
+    epci_rows = {epci_id: row for row, epci_id in enumerate(matrix.epci_ids)}
+    indicator_columns = {indicator_id: column for column, indicator_id in enumerate(matrix.indicator_ids)}
+    mismatches = 0
+    for (epci_id, indicator_id), score in expected.items():
+        actual = scores[epci_rows[epci_id], indicator_columns[indicator_id]]
+        # round() est un arrondi bancaire sur des flottants, NUMERIC arrondit au demi supérieur.
+        if abs(actual - score) > 0.011:
+            mismatches += 1
+            if mismatches <= 5:
+                logger.error("Écart %s/%s : %s vs %s", epci_id, indicator_id, actual, score)
+
+    thresholds = np.nanpercentile(matrix.values, [25, 50, 75], axis=0)
+    for method in scoring_engine.NORMALISATIONS:
+        timings = []
+        for factor in (1, 2, 4, 8):
+            values = np.tile(matrix.values, (factor, 1))
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                scoring_engine.normalise(values, method, thresholds if method == "threshold" else None)
+                samples.append(time.perf_counter() - started)
+            timings.append(f"×{factor}={sorted(samples)[len(samples) // 2] * 1000:.1f}ms")
+        logger.info("%-9s : %s", method, " ".join(timings))
+    logger.info("%s écart(s)", mismatches)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Spécification de scoring par indicateur : équivalence et coût avec des centaines d'indicateurs.
+
+Lit une année de `valeur_indicateur`, réplique ses colonnes jusqu'à
+`--indicators` indicateurs et tire une règle aléatoire par indicateur (méthode,
+sens, transformation, plafonds, bornes, seuils). Compare les scores de
+`ScoringSpec.compile(...).apply` à une boucle de référence qui applique chaque
+règle colonne par colonne (code retour 1 en cas d'écart), puis rapporte le
+temps de compilation, d'application et de la boucle. Contrôle aussi les
+valeurs hors du domaine de la transformation (borne basse, indicateur sans
+valeur valide). Aucune écriture en base.
+
+    python scripts/bench/bench_scoring_spec.py --year 2024 --indicators 600
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+backend_path = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(backend_path))
+from app.calculations import scoring_engine
+from app.calculations.scoring_spec import TRANSFORMS, parse_spec
+from app.db import SessionLocal
+from app.core.numeric import round_half_up
+
+logger = logging.getLogger(__name__)
+
+
+def random_rule(column: np.ndarray, rng: random.Random) -> dict:
+    present = column[~np.isnan(column)]
+    low, high = (float(np.min(present)), float(np.max(present))) if present.size else (0.0, 1.0)
+    rule = {"method": rng.choice(scoring_engine.NORMALISATIONS), "direction": rng.choice(["higher", "lower"])}
+    positive = low >= 0
+    rule["transform"] = rng.choice(["none", "log1p", "sqrt"] if positive else ["none"])
+    if rng.random() < 0.4 and high > low:
+        rule["clip"] = [None if rng.random() < 0.5 else low + (high - low) * 0.1, low + (high - low) * 0.9]
+    if rule["method"] == "minmax" and rng.random() < 0.4 and high > low:
+        rule["bounds"] = [low, low + (high - low) * 0.5]
+    if rule["method"] == "threshold":
+        rule["thresholds"] = sorted({round(low + (high - low) * rng.random(), 3) for _ in range(rng.randint(1, 5))})
+    return rule
+
+
+def reference_scores(values: np.ndarray, rules: list[dict]) -> np.ndarray:
+    """Règles appliquées une colonne à la fois."""
+
+    scores = np.full(values.shape, np.nan)
+    for position, rule in enumerate(rules):
+        function = TRANSFORMS[rule.get("transform", "none")] or (lambda x: x)
+        low, high = rule.get("clip") or (None, None)
+        column = np.clip(values[:, position], -math.inf if low is None else low, math.inf if high is None else high)
+        column = function(column)[:, np.newaxis]
+        options = {}
+        if rule.get("bounds"):
+            options["bounds"] = tuple(function(np.array([bound], dtype=np.float64)) for bound in rule["bounds"])
+        if rule["method"] == "threshold":
+            options["thresholds"] = function(np.array(rule["thresholds"], dtype=np.float64))
+        column_scores = scoring_engine.normalise(column, rule["method"], **options)[:, 0]
+        if rule["direction"] == "lower":
+            column_scores = round_half_up(100.0 - column_scores, 2)
+        scores[:, position] = column_scores
+    return scores
+
+
+def domain_mismatches() -> int:
+    """Valeurs hors domaine : placées à la borne basse, sinon au plus bas de l'indicateur."""
+
+    spec = parse_spec(
+        {
+            "version": 1,
+            "indicators": {
+                "borne": {"transform": "log", "bounds": [1, 1000]},
+                "observe": {"transform": "log"},
+                "invalide": {"transform": "log"},
+                "invalide_bas": {"transform": "sqrt", "direction": "lower"},
+            },
+        }
+    )
+    values = np.array([[0.0, 0.0, 0.0, -1.0], [10.0, 10.0, -1.0, -4.0], [1000.0, 100.0, np.nan, np.nan]])
+    expected = np.array([[0.0, 0.0, 0.0, 100.0], [33.33, 0.0, 0.0, 100.0], [100.0, 100.0, np.nan, np.nan]])
+    scores = spec.compile(["borne", "observe", "invalide", "invalide_bas"]).apply(values)
+    return int(np.count_nonzero(~np.isclose(scores, expected, atol=0.005, equal_nan=True)))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--year", type=int, default=None, help="Année (défaut : la plus récente)")
+    parser.add_argument("--indicators", type=int, default=600, help="Nombre d'indicateurs simulés")
+    parser.add_argument("--seed", type=int, default=360)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    with SessionLocal() as db:
+        year = args.year or scoring_engine.value_years(db)[-1]
+        matrix = scoring_engine.load_value_matrix(db, year)
+    repeats = math.ceil(args.indicators / len(matrix.indicator_ids))
+    values = np.tile(matrix.values, (1, repeats))[:, : args.indicators]
+    indicator_ids = [f"{indicator_id}_{copy}" for copy in range(repeats) for indicator_id in matrix.indicator_ids][: args.indicators]
+
+    rng = random.Random(args.seed)
+    rules = [random_rule(values[:, position], rng) for position in range(values.shape[1])]
+    spec = parse_spec({"version": 1, "indicators": dict(zip(indicator_ids, rules))})
+
+    started = time.perf_counter()
+    compiled = spec.compile(indicator_ids)
+    compiled_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    scores = compiled.apply(values)
+    apply_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    expected = reference_scores(values, rules)
+    reference_seconds = time.perf_counter() - started
+
+    mismatches = int(np.count_nonzero(~np.isclose(scores, expected, atol=0.005, equal_nan=True)))
+    domain = domain_mismatches()
+    logger.info(
+        "Année %s : %s EPCI × %s indicateurs (%s valeurs), %s",
+        year,
+        values.shape[0],
+        values.shape[1],
+        int(np.count_nonzero(~np.isnan(values))),
+        ", ".join(f"{method} {len(columns)}" for method, columns in compiled.method_columns.items()),
+    )
+    logger.info("Compilation de la spécification : %.1f ms", compiled_seconds * 1000)
+    logger.info("Application vectorisée          : %.1f ms", apply_seconds * 1000)
+    logger.info("Boucle par indicateur           : %.1f ms", reference_seconds * 1000)
+    logger.info("%s écart(s), %s écart(s) hors domaine", mismatches, domain)
+    return 1 if mismatches or domain else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Micro-benchmark de sérialisation de la liste des scores (temps pour 1 000 lignes).
+
+Compare, sur la même page de `score_global` :
+
+* ancien chemin : objets ORM -> `Decimal` -> `ScoreSummary` -> validation et
+  sérialisation `response_model` par FastAPI -> `JSONResponse` ;
+* chemin rapide : tuples `float8` -> dicts -> `ORJSONResponse`.
+
+Les temps de lecture SQL et de sérialisation sont affichés séparément.
+
+    python scripts/bench/bench_serialization.py --year 0 --limit 2000 --repeat 20
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import select
+
+backend_path = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(backend_path))
+from app.db import SessionLocal
+from app.models import ScoreGlobal
+from app.schemas import ScoreListResponse
+from app.services.score_service import _list_payload, _summary_columns, _summary_from_row
+
+response_field = create_model_field(name="Response_list_scores", type_=ScoreListResponse, mode="serialization")
+
+
+def legacy_fetch(session, year: int, limit: int):
+    stmt = select(ScoreGlobal).where(ScoreGlobal.year == year).order_by(ScoreGlobal.epci_id).limit(limit)
+    return session.execute(stmt).scalars().all()
+
+
+def legacy_serialize(rows) -> bytes:
+    content = ScoreListResponse(items=[_summary_from_row(row) for row in rows], total=len(rows))
+    jsonable = asyncio.run(serialize_response(field=response_field, response_content=content, is_coroutine=False))
+    return JSONResponse(jsonable).body
+
+
+def fast_fetch(session, year: int, limit: int):
+    stmt = select(*_summary_columns()).where(ScoreGlobal.year == year).order_by(ScoreGlobal.epci_id).limit(limit)
+    return session.execute(stmt).all()
+
+
+def fast_serialize(rows) -> bytes:
+    return ORJSONResponse(_list_payload(rows, len(rows), "code", len(rows) + 1)).body
+
+
+def timed(func_, *args, repeat: int) -> tuple[float, object]:
+    durations = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func_(*args)
+        durations.append(time.perf_counter() - started)
+    return statistics.median(durations), result
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Micro-benchmark de sérialisation de /api/scores")
+    parser.add_argument("--year", type=int, default=0, help="Année ciblée")
+    parser.add_argument("--limit", type=int, default=2000, help="Taille de la page")
+    parser.add_argument("--repeat", type=int, default=20, help="Répétitions (médiane retenue)")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    session = SessionLocal()
+    try:
+        results = {}
+        for label, fetch, serialize in (
+            ("ancien", legacy_fetch, legacy_serialize),
+            ("rapide", fast_fetch, fast_serialize),
+        ):
+
+            def _fetch(fetch=fetch):
+                session.expunge_all()  # pas d'identity map partagée entre répétitions
+                return fetch(session, args.year, args.limit)
+
+            _fetch()  # chauffe
+            fetch_time, rows = timed(_fetch, repeat=args.repeat)
+            if not rows:
+                print(f"Aucun score pour l'année {args.year}")
+                return 1
+            serialize_time, body = timed(serialize, rows, repeat=args.repeat)
+            per_thousand = 1000 / len(rows)
+            results[label] = serialize_time
+            print(
+                f"{label:<7} lignes={len(rows):<5} lecture={fetch_time * per_thousand * 1000:7.2f}ms/1000 "
+                f"sérialisation={serialize_time * per_thousand * 1000:7.2f}ms/1000 taille={len(body) / 1024:.0f}Kio"
+            )
+        print(f"gain sérialisation : x{results['ancien'] / results['rapide']:.1f}")
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Classement pondéré (`POST /api/scores/weighted`) : exactitude et latence.
+
+Compare, pour des vecteurs de poids aléatoires, le classement calculé par
+produit matrice–vecteur (`score_weighting.weighted_ranking`) à une agrégation
+SQL directe de `score_indicateur`, puis mesure p50/p95 du re-classement de
+tous les EPCI (objectif : < 5 ms). Code retour 1 en cas d'écart.
+
+    python scripts/bench/bench_weighted_scores.py --dimension need --samples 500
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import math
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import Float, String, cast, column, func, select, values
+
+backend_path = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(backend_path))
+from app.db import SessionLocal
+from app.services import score_cube, score_weighting
+from app.services.score_rollup import epci_dimension_scores
+
+logger = logging.getLogger(__name__)
+
+
+def sql_weighted_scores(db, dimension: str, year: int, weights: dict) -> dict:
+    """Score pondéré de chaque EPCI, calculé entièrement en SQL (référence)."""
+
+    scores = epci_dimension_scores([year]).c
+    weight_table = values(column("dimension_id", String), column("weight", Float), name="weights").data(
+        list(weights.items())
+    )
+    weighted = func.sum(weight_table.c.weight * scores.score) / func.nullif(
+        func.sum(weight_table.c.weight).filter(scores.score.is_not(None)), 0
+    )
+    stmt = (
+        select(scores.epci_id, cast(weighted, Float))
+        .join(weight_table, weight_table.c.dimension_id == scores.dimension_id, isouter=True)
+        .where(scores.dimension == dimension)
+        .group_by(scores.epci_id)
+    )
+    return {epci_id: score for epci_id, score in db.execute(stmt)}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dimension", default="need", choices=score_weighting.WEIGHTED_DIMENSIONS)
+    parser.add_argument("--year", type=int, default=None)
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--checks", type=int, default=5, help="Vecteurs comparés à la référence SQL")
+    parser.add_argument("--seed", type=int, default=360)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    random.seed(args.seed)
+
+    with SessionLocal() as db:
+        cube = score_cube.load_score_cube(db)
+        year = args.year if args.year is not None else max(cube.years)
+        started = time.perf_counter()
+        matrix = score_weighting.matrix_from_rows(db.execute(score_weighting.matrix_statement(args.dimension, year)).all())
+        logger.info(
+            "Matrice %s × %s (%s) construite en SQL en %.1f ms",
+            len(matrix.epci_ids),
+            len(matrix.dimension_ids),
+            args.dimension,
+            (time.perf_counter() - started) * 1000,
+        )
+        from_cube = score_weighting.matrix_from_cube(cube, args.dimension, year)
+
+        mismatches = 0
+        for _ in range(args.checks):
+            weights = {dimension_id: random.choice([0, 0.5, 1, 2, 3]) for dimension_id in matrix.dimension_ids}
+            weights[matrix.dimension_ids[0]] = 1
+            ranking = score_weighting.weighted_ranking(matrix, weights)
+            if ranking != score_weighting.weighted_ranking(from_cube, weights):
+                mismatches += 1
+                logger.error("Écart matrice SQL / cube pour %s", weights)
+            expected = sql_weighted_scores(db, args.dimension, year, weights)
+            for item in ranking["items"]:
+                reference = expected.get(item["epci_id"])
+                reference = None if reference is None else math.floor(round(reference, 9) * 100 + 0.5) / 100
+                if reference != item["score"]:
+                    mismatches += 1
+                    logger.error("Écart SQL pour %s : %s vs %s", item["epci_id"], item["score"], reference)
+                    break
+
+    timings = []
+    for _ in range(args.samples):
+        weights = {dimension_id: random.random() for dimension_id in matrix.dimension_ids}
+        started = time.perf_counter()
+        score_weighting.weighted_ranking(matrix, weights)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    logger.info(
+        "Re-classement de %s EPCI : p50=%.3f ms p95=%.3f ms",
+        len(matrix.epci_ids),
+        statistics.median(timings) * 1000,
+        timings[int(len(timings) * 0.95) - 1] * 1000,
+    )
+    logger.info("%s écart(s)", mismatches)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
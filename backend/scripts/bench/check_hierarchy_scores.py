@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Contrôle des scores besoins / objectifs / types / global (`compute_need_scores`).
+
+Recalcule en Python, pour un échantillon d'EPCI, la moyenne des scores
+indicateurs par besoin, objectif et type (tables de correspondance et colonnes
+`ids_*` de `indicateur`) et le score global (moyenne des besoins), puis les
+compare à `score_dimension` (tous les liens), `score_indicateur` (lien
+principal) et `score_global` (code retour 1 en cas d'écart).
+
+    python scripts/bench/check_hierarchy_scores.py --year 2024 --samples 100
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import random
+import sys
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+
+from sqlalchemy import select
+
+backend_path = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(backend_path))
+from app.db import SessionLocal
+from app.models import Indicator, IndicatorNeedLink, IndicatorObjectiveLink, IndicatorScore, IndicatorTypeLink, ScoreDimension, ScoreGlobal
+from app.services.score_hierarchy import REPORT_KEYS
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal("0.01")
+
+
+def _mean(values: list) -> Decimal | None:
+    values = [value for value in values if value is not None]
+    if not values:
+        return None
+    return (sum(values) / len(values)).quantize(CENT, ROUND_HALF_UP)
+
+
+def indicator_links(db) -> dict[str, set[tuple[str, str]]]:
+    links: dict[str, set[tuple[str, str]]] = defaultdict(set)
+    for dimension, indicator_column, id_column in (
+        ("need", IndicatorNeedLink.indicator_id, IndicatorNeedLink.need_id),
+        ("objective", IndicatorObjectiveLink.indicator_id, IndicatorObjectiveLink.objective_id),
+        ("type", IndicatorTypeLink.indicator_id, IndicatorTypeLink.type_id),
+    ):
+        for indicator_id, dimension_id in db.execute(select(indicator_column, id_column)):
+            links[indicator_id].add((dimension, dimension_id))
+    for indicator in db.execute(select(Indicator)).scalars():
+        for dimension, ids in zip(("need", "objective", "type"), (indicator.need_ids, indicator.objective_ids, indicator.type_ids)):
+            links[indicator.id].update((dimension, dimension_id) for dimension_id in ids or ())
+    return links
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--samples", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=360)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    random.seed(args.seed)
+
+    mismatches = 0
+    with SessionLocal() as db:
+        links = indicator_links(db)
+        summaries = {row.epci_id: row for row in db.execute(select(ScoreGlobal).where(ScoreGlobal.year == args.year)).scalars()}
+        sample = random.sample(sorted(summaries), min(args.samples, len(summaries)))
+        for epci_id in sample:
+            rows = db.execute(
+                select(IndicatorScore).where(IndicatorScore.epci_id == epci_id, IndicatorScore.year == args.year)
+            ).scalars().all()
+            grouped: dict[tuple[str, str], list] = defaultdict(list)
+            for row in rows:
+                for key in links.get(row.indicator_id, ()):
+                    grouped[key].append(row.indicator_score)
+            expected = {key: _mean(values) for key, values in grouped.items()}
+            global_score = _mean([score for (dimension, _), score in expected.items() if dimension == "need"])
+
+            problems = []
+            stored_dimensions = {
+                (row.dimension, row.dimension_id): row.score
+                for row in db.execute(
+                    select(ScoreDimension).where(ScoreDimension.epci_id == epci_id, ScoreDimension.year == args.year)
+                ).scalars()
+            }
+            for key in sorted(set(stored_dimensions) | set(expected)):
+                if key not in stored_dimensions or key not in expected or stored_dimensions[key] != expected[key]:
+                    problems.append(f"score_dimension {key[1]}")
+            for row in rows:
+                for dimension in ("need", "objective", "type"):
+                    dimension_id = getattr(row, f"{dimension}_id")
+                    if dimension_id is not None and getattr(row, f"{dimension}_score") != expected.get((dimension, dimension_id)):
+                        problems.append(f"{row.indicator_id} {dimension_id}")
+                if row.global_score != global_score:
+                    problems.append(f"{row.indicator_id} global")
+            summary = summaries[epci_id]
+            report = summary.report or {}
+            for (dimension, dimension_id), score in expected.items():
+                stored = report.get(REPORT_KEYS[dimension], {}).get(dimension_id)
+                if (None if stored is None else Decimal(str(stored))) != score:
+                    problems.append(f"rapport {dimension_id}")
+            for dimension, column in (("need", "need_score"), ("objective", "objective_score"), ("type", "type_score")):
+                means = _mean([score for (name, _), score in expected.items() if name == dimension])
+                if getattr(summary, column) != means:
+                    problems.append(f"score_global.{column}")
+            if problems:
+                mismatches += 1
+                logger.error("Écarts pour %s : %s", epci_id, ", ".join(problems[:5]))
+
+    logger.info("%s EPCI contrôlés, %s en écart", len(sample), mismatches)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
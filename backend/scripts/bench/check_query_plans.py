@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Vérifie par EXPLAIN que les requêtes chaudes utilisent les index attendus.
+
+À lancer sur une base peuplée et analysée (ANALYZE), après application de
+`docker/postgres/init/008_score_indexes.sql`. Sort en code 1 si un plan ne
+contient pas l'index attendu ou parcourt `score_indicateur` séquentiellement.
+
+    python scripts/bench/check_query_plans.py --year 0
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from sqlalchemy import select, text
+
+backend_path = Path(__file__).resolve().parent.parent.parent
+sys.path.append(str(backend_path))
+from app.db import SessionLocal
+from app.models import Epci, ScoreGlobal
+from app.services.score_service import _LABEL_ORDER, _detail_statement, _history_statement
+from app.services.score_summary import summary_aggregate
+from app.services.search_service import epci_search_clause
+
+
+def _walk(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+
+def explain(session, stmt) -> list[dict]:
+    connection = session.connection()
+    compiled = stmt.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    document = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled.string}", compiled.params).scalar()
+    if isinstance(document, str):
+        document = json.loads(document)
+    return list(_walk(document[0]["Plan"]))
+
+
+def check(
+    session,
+    label: str,
+    stmt,
+    expected_indexes: tuple[str, ...],
+    forbid_seq_scan_on: str | None = None,
+    without_seq_scan: bool = False,
+) -> bool:
+    """``expected_indexes`` : au moins un de ces index doit apparaître dans le plan.
+
+    ``without_seq_scan`` vérifie seulement que l'index est utilisable : sur une
+    petite table (~1 250 EPCI) le planificateur peut légitimement préférer un
+    parcours séquentiel.
+    """
+
+    if without_seq_scan:
+        session.execute(text("SET LOCAL enable_seqscan = off"))
+    try:
+        nodes = explain(session, stmt)
+    finally:
+        if without_seq_scan:
+            session.execute(text("RESET enable_seqscan"))
+    indexes = {node.get("Index Name") for node in nodes if node.get("Index Name")}
+    seq_scans = {node.get("Relation Name") for node in nodes if node.get("Node Type") == "Seq Scan"}
+    ok = bool(indexes.intersection(expected_indexes)) and (forbid_seq_scan_on is None or forbid_seq_scan_on not in seq_scans)
+    status = "OK  " if ok else "FAIL"
+    print(f"[{status}] {label}: index={sorted(indexes) or '-'} seq_scan={sorted(seq_scans) or '-'}")
+    return ok
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Contrôle des plans EXPLAIN des requêtes scores")
+    parser.add_argument("--year", type=int, default=0, help="Année utilisée dans les requêtes")
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    session = SessionLocal()
+    try:
+        epci_id = session.execute(
+            select(ScoreGlobal.epci_id).where(ScoreGlobal.year == args.year).limit(1)
+        ).scalar()
+        if epci_id is None:
+            print(f"Aucun score pour l'année {args.year} : base vide ?")
+            return 1
+
+        results = [
+            check(
+                session,
+                "détail EPCI (grouping sets)",
+                _detail_statement([epci_id], args.year),
+                # Pour un seul EPCI le préfixe de la clé primaire (id_epci, ...) est aussi sélectif.
+                ("idx_score_indicateur_annee_epci", "score_indicateur_pkey"),
+                forbid_seq_scan_on="score_indicateur",
+            ),
+            check(
+                session,
+                "historique EPCI (toutes années)",
+                _history_statement(epci_id),
+                ("score_indicateur_pkey",),
+                forbid_seq_scan_on="score_indicateur",
+            ),
+            check(
+                session,
+                "agrégat du résumé score_global",
+                summary_aggregate([args.year]),
+                ("idx_score_indicateur_annee_epci",),
+                forbid_seq_scan_on="score_indicateur",
+            ),
+            check(
+                session,
+                "liste triée par nom",
+                select(ScoreGlobal)
+                .where(ScoreGlobal.year == args.year)
+                .order_by(_LABEL_ORDER, ScoreGlobal.epci_id)
+                .limit(50),
+                ("idx_score_global_annee_libelle_key",),
+            ),
+            check(
+                session,
+                "liste triée par score",
+                select(ScoreGlobal)
+                .where(ScoreGlobal.year == args.year)
+                .order_by(ScoreGlobal.global_score.desc().nullslast(), ScoreGlobal.epci_id)
+                .limit(50),
+                ("idx_score_global_annee_score",),
+            ),
+            check(
+                session,
+                "recherche libellé (trigrammes)",
+                select(Epci.id).where(epci_search_clause("communaute")),
+                ("idx_epci_libelle_trgm",),
+                without_seq_scan=True,
+            ),
+            check(
+                session,
+                "recherche préfixe SIREN",
+                select(Epci.id).where(epci_search_clause(epci_id[:4])),
+                ("idx_epci_id_prefix",),
+                without_seq_scan=True,
+            ),
+        ]
+    finally:
+        session.close()
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,107 +5,57 @@ Adapter ce script pour chaque famille d'indicateurs :
 1. Sélectionner les valeurs brutes pertinentes (par indicateur, période, source...).
 2. Appliquer la formule de normalisation / scoring.
 3. Écrire le résultat dans `score_indicateur` en renseignant les colonnes attendues.
+
+Les valeurs d'une année sont chargées en une matrice EPCI × indicateur et
+normalisées colonne par colonne avec NumPy (`app.calculations.scoring_engine`),
+puis écrites par COPY + upsert : pas de boucle par ligne.
 """
 from __future__ import annotations
 
 import argparse
 import logging
-from collections import defaultdict
-from dataclasses import dataclass
-from typing import Iterable
 
-from sqlalchemy import Select, select
+import numpy as np
 
+from app.calculations.scoring_engine import (
+    NORMALISATIONS,
+    ValueMatrix,
+    load_value_matrix,
+    normalise,
+    write_indicator_scores,
+)
 from app.db import SessionLocal
-from app.models import IndicatorScore, IndicatorValue
+from app.services.score_cube import publish_score_snapshot_after_commit
+from app.services.score_hierarchy import refresh_hierarchy_scores
+from app.services.score_publication import publish_scores
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class ScoreRow:
-    epci_id: str
-    indicator_id: str
-    year: int
-    indicator_score: float
-    need_id: str | None = None
-    need_score: float | None = None
-    objective_id: str | None = None
-    objective_score: float | None = None
-    type_id: str | None = None
-    type_score: float | None = None
-    global_score: float | None = None
-    report: dict | None = None
-
-
-def base_query(*, indicator_ids: list[str], year: int) -> Select:
-    """Construire la requête de base vers `valeur_indicateur`."""
-
-    return select(IndicatorValue).where(
-        IndicatorValue.indicator_id.in_(indicator_ids),
-        IndicatorValue.year == year,
-    )
+def fetch_raw_values(session, *, indicator_ids: list[str], year: int) -> ValueMatrix:
+    """Retourner la matrice EPCI × indicateur des valeurs brutes (NaN si absente)."""
 
+    matrix = load_value_matrix(session, year, indicator_ids)
+    logger.info("%s valeurs brutes chargées", matrix.cells)
+    return matrix
 
-def fetch_raw_values(session, *, indicator_ids: list[str], year: int) -> dict[str, dict[str, float]]:
-    """Retourner un mapping {indicator_id: {epci_id: valeur_brute}}."""
 
-    stmt = base_query(indicator_ids=indicator_ids, year=year)
-    rows = session.execute(stmt).scalars().all()
-    values: dict[str, dict[str, float]] = defaultdict(dict)
-    for row in rows:
-        if row.value is None:
-            continue
-        values[row.indicator_id][row.epci_id] = float(row.value)
-    logger.info("%s valeurs brutes chargées", sum(len(e) for e in values.values()))
-    return values
+def compute_scores(matrix: ValueMatrix, method: str = "minmax") -> np.ndarray:
+    """Convertir les valeurs brutes en scores normalisés (0–100), même forme que la matrice.
 
+    Remplacer cette logique par la vraie formule (min/max, zscore, barèmes...) :
+    opérer sur `matrix.values` colonne par colonne, sans boucle par EPCI.
+    """
 
-def compute_scores(raw_values: dict[str, dict[str, float]]) -> Iterable[ScoreRow]:
-    """Convertir les valeurs brutes en scores normalisés.
+    return normalise(matrix.values, method)
 
-    Remplacer cette logique par la vraie formule (min/max, zscore, barèmes...).
-    """
 
-    for indicator_id, epci_map in raw_values.items():
-        if not epci_map:
-            continue
-        min_value = min(epci_map.values())
-        max_value = max(epci_map.values())
-        span = max(max_value - min_value, 1e-9)
-        for epci_id, value in epci_map.items():
-            normalized = (value - min_value) / span
-            score = round(normalized * 100, 2)
-            yield ScoreRow(
-                epci_id=epci_id,
-                indicator_id=indicator_id,
-                year=DEFAULT_YEAR,
-                indicator_score=score,
-                global_score=score,
-                report={"valeur_brute": value, "min": min_value, "max": max_value},
-            )
-
-
-def persist_scores(session, rows: Iterable[ScoreRow]) -> int:
-    inserted = 0
-    for row in rows:
-        record = IndicatorScore(
-            epci_id=row.epci_id,
-            indicator_id=row.indicator_id,
-            year=row.year,
-            indicator_score=row.indicator_score,
-            need_id=row.need_id,
-            need_score=row.need_score,
-            objective_id=row.objective_id,
-            objective_score=row.objective_score,
-            type_id=row.type_id,
-            type_score=row.type_score,
-            global_score=row.global_score,
-            report=row.report,
-        )
-        session.merge(record)
-        inserted += 1
+def persist_scores(session, matrix: ValueMatrix, scores: np.ndarray, method: str) -> int:
+    inserted = write_indicator_scores(session, matrix, scores, method)
+    refresh_hierarchy_scores(session, years=[matrix.year])
+    publish_scores(session, years=[matrix.year])
     session.commit()
+    publish_score_snapshot_after_commit()
     return inserted
 
 
@@ -113,15 +63,15 @@ DEFAULT_YEAR = 2025
 DEFAULT_INDICATORS = ["i001", "i002"]
 
 
-def run(indicator_ids: list[str], year: int) -> None:
+def run(indicator_ids: list[str], year: int, method: str = "minmax") -> None:
     session = SessionLocal()
     try:
-        raw_values = fetch_raw_values(session, indicator_ids=indicator_ids, year=year)
-        rows = list(compute_scores(raw_values))
-        if not rows:
+        matrix = fetch_raw_values(session, indicator_ids=indicator_ids, year=year)
+        if not matrix.cells:
             logger.warning("Aucun score calculé (indicateurs=%s, année=%s)", indicator_ids, year)
             return
-        count = persist_scores(session, rows)
+        scores = compute_scores(matrix, method)
+        count = persist_scores(session, matrix, scores, method)
         logger.info("%s scores enregistrés dans score_indicateur", count)
     finally:
         session.close()
@@ -137,6 +87,12 @@ def build_parser() -> argparse.ArgumentParser:
         help="Ajouter un ID indicateur (répéter l'argument pour plusieurs valeurs)",
     )
     parser.add_argument("--year", type=int, default=DEFAULT_YEAR, help="Année de référence")
+    parser.add_argument(
+        "--method",
+        choices=[method for method in NORMALISATIONS if method != "threshold"],
+        default="minmax",
+        help="Normalisation",
+    )
     return parser
 
 
@@ -145,7 +101,7 @@ def main() -> None:
     parser = build_parser()
     args = parser.parse_args()
     indicator_ids = args.indicators or DEFAULT_INDICATORS
-    run(indicator_ids=indicator_ids, year=args.year)
+    run(indicator_ids=indicator_ids, year=args.year, method=args.method)
 
 
 if __name__ == "__main__":
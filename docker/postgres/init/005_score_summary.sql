@@ -0,0 +1,43 @@
+-----------------------------------------------------------------------
+-- score_global devient le résumé par EPCI / année lu par l'API
+-- (maintenu par app.services.score_summary.refresh_score_summary).
+-- Script idempotent : peut être rejoué sur une base existante.
+-----------------------------------------------------------------------
+
+ALTER TABLE score_global ADD COLUMN IF NOT EXISTS libelle_epci TEXT;
+ALTER TABLE score_global ADD COLUMN IF NOT EXISTS departement_code TEXT;
+ALTER TABLE score_global ADD COLUMN IF NOT EXISTS region_code TEXT;
+ALTER TABLE score_global ADD COLUMN IF NOT EXISTS nb_indicateurs INTEGER NOT NULL DEFAULT 0;
+
+-- Tri paginé de /api/scores (order_by=name|score|code) pour une année donnée.
+CREATE INDEX IF NOT EXISTS idx_score_global_annee_libelle
+    ON score_global (annee, libelle_epci, id_epci);
+CREATE INDEX IF NOT EXISTS idx_score_global_annee_score
+    ON score_global (annee, score_global DESC NULLS LAST, id_epci);
+CREATE INDEX IF NOT EXISTS idx_score_global_annee_code
+    ON score_global (annee, id_epci);
+
+-- Rétro-remplissage depuis score_indicateur.
+INSERT INTO score_global (
+    id_epci, annee, libelle_epci, departement_code, region_code,
+    score_global, nb_indicateurs, updated_at
+)
+SELECT
+    s.id_epci,
+    s.annee,
+    e.libelle,
+    e.departement_code,
+    e.region_code,
+    AVG(s.score_global),
+    COUNT(s.id_indicateur),
+    MAX(s.updated_at)
+FROM score_indicateur s
+JOIN epci e ON e.id_epci = s.id_epci
+GROUP BY s.id_epci, s.annee, e.libelle, e.departement_code, e.region_code
+ON CONFLICT (id_epci, annee) DO UPDATE SET
+    libelle_epci = EXCLUDED.libelle_epci,
+    departement_code = EXCLUDED.departement_code,
+    region_code = EXCLUDED.region_code,
+    score_global = EXCLUDED.score_global,
+    nb_indicateurs = EXCLUDED.nb_indicateurs,
+    updated_at = EXCLUDED.updated_at;
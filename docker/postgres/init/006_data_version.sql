@@ -0,0 +1,13 @@
+-----------------------------------------------------------------------
+-- Compteur de version des données publiées (invalidation des caches API).
+-- Incrémenté par app.services.score_publication.publish_scores.
+-----------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS data_version (
+    id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO data_version (id, version) VALUES (1, 0)
+ON CONFLICT (id) DO NOTHING;
@@ -0,0 +1,20 @@
+-----------------------------------------------------------------------
+-- Recherche EPCI : trigrammes insensibles aux accents + préfixe SIREN
+-- (utilisés par /api/scores?search= et /api/territories/search).
+-----------------------------------------------------------------------
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- unaccent() n'est pas IMMUTABLE : wrapper à dictionnaire explicite pour l'indexation.
+CREATE OR REPLACE FUNCTION f_unaccent_lower(text)
+RETURNS text
+LANGUAGE sql
+IMMUTABLE PARALLEL SAFE STRICT
+AS $$ SELECT lower(public.unaccent('public.unaccent'::regdictionary, $1)) $$;
+
+CREATE INDEX IF NOT EXISTS idx_epci_libelle_trgm
+    ON epci USING gin (f_unaccent_lower(libelle) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_epci_id_prefix
+    ON epci (id_epci text_pattern_ops);
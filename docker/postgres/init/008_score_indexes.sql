@@ -0,0 +1,31 @@
+-----------------------------------------------------------------------
+-- Index alignés sur les chemins de lecture de score_indicateur
+-- (filtre annee puis id_epci ; la PK commence par id_epci).
+-- Contrôle des plans : backend/scripts/bench/check_query_plans.py
+-----------------------------------------------------------------------
+
+-- Détail EPCI (annee = ? AND id_epci = ANY(?)) et agrégat de résumé
+-- (GROUP BY id_epci par année) en index-only scan grâce aux colonnes incluses.
+CREATE INDEX IF NOT EXISTS idx_score_indicateur_annee_epci
+    ON score_indicateur (annee, id_epci)
+    INCLUDE (id_indicateur, score_global, updated_at);
+
+-- Agrégats par besoin / objectif / type pour une année
+-- (servent aussi les clés étrangères, jusqu'ici non indexées).
+CREATE INDEX IF NOT EXISTS idx_score_indicateur_annee_besoin
+    ON score_indicateur (annee, id_besoin)
+    INCLUDE (id_epci, score_besoin);
+CREATE INDEX IF NOT EXISTS idx_score_indicateur_annee_objectif
+    ON score_indicateur (annee, id_objectif)
+    INCLUDE (id_epci, score_objectif);
+CREATE INDEX IF NOT EXISTS idx_score_indicateur_annee_type
+    ON score_indicateur (annee, id_type)
+    INCLUDE (id_epci, score_type);
+
+-- Lecture des valeurs brutes par indicateur et année pour le scoring.
+CREATE INDEX IF NOT EXISTS idx_valeur_indicateur_indicateur_annee
+    ON valeur_indicateur (id_indicateur, annee)
+    INCLUDE (id_epci, valeur_brute);
+
+ANALYZE score_indicateur;
+ANALYZE valeur_indicateur;
@@ -0,0 +1,78 @@
+-----------------------------------------------------------------------
+-- Agrégats départementaux / régionaux des scores EPCI (carte choroplèthe).
+-- Maintenu par app.services.score_rollup.refresh_score_rollups, appelé par
+-- publish_scores après chaque écriture de scores.
+-- Script idempotent : peut être rejoué sur une base existante.
+-----------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS score_rollup (
+    niveau TEXT NOT NULL CHECK (niveau IN ('department', 'region')),
+    annee INTEGER NOT NULL,
+    dimension TEXT NOT NULL CHECK (dimension IN ('global', 'need', 'objective', 'type')),
+    id_dimension TEXT NOT NULL DEFAULT '',
+    code TEXT NOT NULL,
+    score_moyen NUMERIC(5,2),
+    score_pondere NUMERIC(5,2),
+    nb_epci INTEGER NOT NULL DEFAULT 0,
+    population NUMERIC,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    -- /api/scores/rollup lit (niveau, annee[, dimension]) : préfixe de la clé.
+    PRIMARY KEY (niveau, annee, dimension, id_dimension, code)
+);
+
+-- Rétro-remplissage depuis les colonnes du lien principal de score_indicateur ;
+-- 013_score_dimension.sql le refait sur tous les liens (calcul de rollup_statement).
+DELETE FROM score_rollup;
+
+WITH epci_scores AS (
+    SELECT
+        s.id_epci,
+        s.annee,
+        CASE GROUPING(s.id_besoin, s.id_objectif, s.id_type)
+            WHEN 3 THEN 'need'
+            WHEN 5 THEN 'objective'
+            WHEN 6 THEN 'type'
+            ELSE 'global'
+        END AS dimension,
+        COALESCE(s.id_besoin, s.id_objectif, s.id_type, '') AS id_dimension,
+        CASE GROUPING(s.id_besoin, s.id_objectif, s.id_type)
+            WHEN 7 THEN AVG(s.score_global)
+            WHEN 3 THEN AVG(s.score_besoin)
+            WHEN 5 THEN AVG(s.score_objectif)
+            ELSE AVG(s.score_type)
+        END AS score
+    FROM score_indicateur s
+    GROUP BY GROUPING SETS (
+        (s.id_epci, s.annee),
+        (s.id_epci, s.annee, s.id_besoin),
+        (s.id_epci, s.annee, s.id_objectif),
+        (s.id_epci, s.annee, s.id_type)
+    )
+    HAVING GROUPING(s.id_besoin, s.id_objectif, s.id_type) = 7
+        OR COALESCE(s.id_besoin, s.id_objectif, s.id_type) IS NOT NULL
+)
+INSERT INTO score_rollup (
+    niveau, annee, dimension, id_dimension, code,
+    score_moyen, score_pondere, nb_epci, population
+)
+SELECT
+    CASE WHEN GROUPING(e.departement_code, e.region_code) = 1 THEN 'department' ELSE 'region' END,
+    es.annee,
+    es.dimension,
+    es.id_dimension,
+    COALESCE(e.departement_code, e.region_code),
+    ROUND(AVG(es.score), 2),
+    ROUND(
+        SUM(es.score * e.population_totale)
+        / NULLIF(SUM(CASE WHEN es.score IS NOT NULL THEN e.population_totale END), 0),
+        2
+    ),
+    COUNT(es.score),
+    SUM(CASE WHEN es.score IS NOT NULL THEN e.population_totale END)
+FROM epci_scores es
+JOIN epci e ON e.id_epci = es.id_epci
+GROUP BY GROUPING SETS (
+    (es.annee, es.dimension, es.id_dimension, e.departement_code),
+    (es.annee, es.dimension, es.id_dimension, e.region_code)
+)
+HAVING COALESCE(e.departement_code, e.region_code) IS NOT NULL;
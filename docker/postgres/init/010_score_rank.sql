@@ -0,0 +1,101 @@
+-----------------------------------------------------------------------
+-- Rangs et percentiles des scores EPCI (national et départemental) par
+-- dimension (global, besoin, objectif, type, indicateur) et année.
+-- Maintenu par app.services.score_rank.refresh_score_ranks, appelé par
+-- publish_scores ; joint à la requête de détail de /api/scores/{epci_id}.
+-- Script idempotent : peut être rejoué sur une base existante.
+-----------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS score_rank (
+    annee INTEGER NOT NULL,
+    id_epci TEXT NOT NULL REFERENCES epci(id_epci) ON DELETE CASCADE,
+    dimension TEXT NOT NULL CHECK (dimension IN ('global', 'indicator', 'need', 'objective', 'type')),
+    id_dimension TEXT NOT NULL DEFAULT '',
+    rang INTEGER NOT NULL,
+    nb_epci INTEGER NOT NULL,
+    percentile NUMERIC(4,1),
+    quartile INTEGER,
+    rang_departement INTEGER,
+    nb_epci_departement INTEGER,
+    percentile_departement NUMERIC(4,1),
+    quartile_departement INTEGER,
+    -- Jointure de la requête de détail : (annee, id_epci) puis dimension.
+    PRIMARY KEY (annee, id_epci, dimension, id_dimension)
+);
+
+-- Rétro-remplissage depuis les colonnes du lien principal de score_indicateur ;
+-- 013_score_dimension.sql le refait sur tous les liens (calcul de rank_statement).
+DELETE FROM score_rank;
+
+WITH epci_scores AS (
+    SELECT
+        s.id_epci,
+        s.annee,
+        CASE GROUPING(s.id_indicateur, s.id_besoin, s.id_objectif, s.id_type)
+            WHEN 7 THEN 'indicator'
+            WHEN 11 THEN 'need'
+            WHEN 13 THEN 'objective'
+            WHEN 14 THEN 'type'
+            ELSE 'global'
+        END AS dimension,
+        COALESCE(s.id_indicateur, s.id_besoin, s.id_objectif, s.id_type, '') AS id_dimension,
+        CASE GROUPING(s.id_indicateur, s.id_besoin, s.id_objectif, s.id_type)
+            WHEN 15 THEN AVG(s.score_global)
+            WHEN 7 THEN AVG(s.score_indicateur)
+            WHEN 11 THEN AVG(s.score_besoin)
+            WHEN 13 THEN AVG(s.score_objectif)
+            ELSE AVG(s.score_type)
+        END AS score
+    FROM score_indicateur s
+    GROUP BY GROUPING SETS (
+        (s.id_epci, s.annee),
+        (s.id_epci, s.annee, s.id_besoin),
+        (s.id_epci, s.annee, s.id_objectif),
+        (s.id_epci, s.annee, s.id_type),
+        (s.id_epci, s.annee, s.id_indicateur)
+    )
+    HAVING GROUPING(s.id_indicateur, s.id_besoin, s.id_objectif, s.id_type) = 15
+        OR COALESCE(s.id_indicateur, s.id_besoin, s.id_objectif, s.id_type) IS NOT NULL
+),
+ranked AS (
+    SELECT
+        es.annee,
+        es.id_epci,
+        es.dimension,
+        es.id_dimension,
+        e.departement_code,
+        RANK() OVER national_desc AS rang,
+        COUNT(*) OVER national AS nb_epci,
+        PERCENT_RANK() OVER national_asc AS pr,
+        RANK() OVER departement_desc AS rang_departement,
+        COUNT(*) OVER departement AS nb_epci_departement,
+        PERCENT_RANK() OVER departement_asc AS pr_departement
+    FROM epci_scores es
+    JOIN epci e ON e.id_epci = es.id_epci
+    WHERE es.score IS NOT NULL
+    WINDOW
+        national AS (PARTITION BY es.annee, es.dimension, es.id_dimension),
+        national_desc AS (national ORDER BY es.score DESC),
+        national_asc AS (national ORDER BY es.score ASC),
+        departement AS (PARTITION BY es.annee, es.dimension, es.id_dimension, e.departement_code),
+        departement_desc AS (departement ORDER BY es.score DESC),
+        departement_asc AS (departement ORDER BY es.score ASC)
+)
+INSERT INTO score_rank (
+    annee, id_epci, dimension, id_dimension, rang, nb_epci, percentile, quartile,
+    rang_departement, nb_epci_departement, percentile_departement, quartile_departement
+)
+SELECT
+    annee,
+    id_epci,
+    dimension,
+    id_dimension,
+    rang,
+    nb_epci,
+    ROUND((pr * 100)::NUMERIC, 1),
+    LEAST(4, FLOOR(pr * 4) + 1),
+    CASE WHEN departement_code IS NOT NULL THEN rang_departement END,
+    CASE WHEN departement_code IS NOT NULL THEN nb_epci_departement END,
+    CASE WHEN departement_code IS NOT NULL THEN ROUND((pr_departement * 100)::NUMERIC, 1) END,
+    CASE WHEN departement_code IS NOT NULL THEN LEAST(4, FLOOR(pr_departement * 4) + 1) END
+FROM ranked;
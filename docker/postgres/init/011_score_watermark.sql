@@ -0,0 +1,26 @@
+-----------------------------------------------------------------------
+-- Filigrane du scoring incrémental : pour chaque (indicateur, année)
+-- calculé, état de valeur_indicateur au moment du calcul (date_import la
+-- plus récente, nombre de lignes, somme de contrôle des couples EPCI /
+-- valeur) et paramètres de normalisation. date_import est l'heure de début
+-- de la transaction d'import : seule la somme de contrôle voit un import
+-- long validé après un calcul.
+-- Maintenu par app.calculations.scoring_watermark ; une unité n'est
+-- recalculée que si cet état ou ces paramètres ont changé.
+-- Script idempotent : peut être rejoué sur une base existante.
+-----------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS score_filigrane (
+    id_indicateur TEXT NOT NULL REFERENCES indicateur(id_indicateur) ON DELETE CASCADE,
+    annee INTEGER NOT NULL,
+    date_import_max TIMESTAMPTZ,
+    nb_valeurs INTEGER NOT NULL DEFAULT 0,
+    -- SUM(hashtextextended(id_epci || ':' || COALESCE(valeur_brute::text, ''), 0))
+    somme_controle NUMERIC,
+    parametres JSONB NOT NULL DEFAULT '{}',
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id_indicateur, annee)
+);
+
+-- Bases créées avant la somme de contrôle : les unités sont recalculées une fois.
+ALTER TABLE score_filigrane ADD COLUMN IF NOT EXISTS somme_controle NUMERIC;
@@ -0,0 +1,11 @@
+-----------------------------------------------------------------------
+-- Tri par nom de /api/scores en ordre binaire (COLLATE "C") : c'est
+-- l'ordre des chaînes Python utilisé par le cube en mémoire, donc un
+-- curseur next_cursor reste valable quand une requête passe du cube à
+-- SQL (rechargement en cours, snapshot en retard) ou inversement.
+-- Script idempotent : peut être rejoué sur une base existante.
+-----------------------------------------------------------------------
+
+CREATE INDEX IF NOT EXISTS idx_score_global_annee_libelle_c
+    ON score_global (annee, libelle_epci COLLATE "C", id_epci);
+DROP INDEX IF EXISTS idx_score_global_annee_libelle;
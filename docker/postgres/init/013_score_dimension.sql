@@ -0,0 +1,145 @@
+-----------------------------------------------------------------------
+-- Scores besoin / objectif / type de chaque EPCI par année : moyenne des
+-- scores des indicateurs liés, tous liens compris (un indicateur relié à
+-- deux besoins compte dans les deux). Les lignes de score_indicateur ne
+-- portent que le lien principal (plus petit identifiant) ; les lectures
+-- par dimension (détail, rangs, rollups, pondération, cube) partent d'ici.
+-- Maintenu par app.services.score_hierarchy.refresh_hierarchy_scores.
+-- Script idempotent : peut être rejoué sur une base existante.
+-----------------------------------------------------------------------
+
+CREATE TABLE IF NOT EXISTS score_dimension (
+    annee INTEGER NOT NULL,
+    id_epci TEXT NOT NULL REFERENCES epci(id_epci) ON DELETE CASCADE,
+    dimension TEXT NOT NULL CHECK (dimension IN ('need', 'objective', 'type')),
+    id_dimension TEXT NOT NULL,
+    score NUMERIC(5,2),
+    nb_indicateurs INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    -- Requête de détail : (annee, id_epci) puis dimension.
+    PRIMARY KEY (annee, id_epci, dimension, id_dimension)
+);
+
+-- Rétro-remplissage depuis score_indicateur (même calcul que dimension_scores).
+DELETE FROM score_dimension;
+
+WITH indicator_links AS (
+    SELECT 'need' AS dimension, id_indicateur, id_besoin AS id_dimension FROM indicateur_besoin
+    UNION SELECT 'need', id_indicateur, UNNEST(ids_besoins) FROM indicateur
+    UNION SELECT 'objective', id_indicateur, id_objectif FROM indicateur_objectif
+    UNION SELECT 'objective', id_indicateur, UNNEST(ids_objectifs) FROM indicateur
+    UNION SELECT 'type', id_indicateur, id_type FROM indicateur_type
+    UNION SELECT 'type', id_indicateur, UNNEST(ids_types) FROM indicateur
+)
+INSERT INTO score_dimension (annee, id_epci, dimension, id_dimension, score, nb_indicateurs)
+SELECT
+    s.annee,
+    s.id_epci,
+    l.dimension,
+    l.id_dimension,
+    ROUND(AVG(s.score_indicateur), 2),
+    COUNT(*)
+FROM score_indicateur s
+JOIN indicator_links l ON l.id_indicateur = s.id_indicateur
+WHERE l.id_dimension IS NOT NULL
+GROUP BY s.annee, s.id_epci, l.dimension, l.id_dimension;
+
+-- Historique d'un EPCI (toutes années).
+CREATE INDEX IF NOT EXISTS idx_score_dimension_epci ON score_dimension (id_epci, annee);
+
+-- score_rollup et score_rank (009, 010) ont été remplis depuis le lien
+-- principal : reconstruits depuis score_dimension, même calcul que
+-- rollup_statement et rank_statement.
+DELETE FROM score_rollup;
+
+WITH epci_scores AS (
+    SELECT id_epci, annee, 'global' AS dimension, '' AS id_dimension, AVG(score_global) AS score
+    FROM score_indicateur
+    GROUP BY id_epci, annee
+    UNION ALL
+    SELECT id_epci, annee, dimension, id_dimension, score
+    FROM score_dimension
+)
+INSERT INTO score_rollup (
+    niveau, annee, dimension, id_dimension, code,
+    score_moyen, score_pondere, nb_epci, population
+)
+SELECT
+    CASE WHEN GROUPING(e.departement_code, e.region_code) = 1 THEN 'department' ELSE 'region' END,
+    es.annee,
+    es.dimension,
+    es.id_dimension,
+    COALESCE(e.departement_code, e.region_code),
+    ROUND(AVG(es.score), 2),
+    ROUND(
+        SUM(es.score * e.population_totale)
+        / NULLIF(SUM(CASE WHEN es.score IS NOT NULL THEN e.population_totale END), 0),
+        2
+    ),
+    COUNT(es.score),
+    SUM(CASE WHEN es.score IS NOT NULL THEN e.population_totale END)
+FROM epci_scores es
+JOIN epci e ON e.id_epci = es.id_epci
+GROUP BY GROUPING SETS (
+    (es.annee, es.dimension, es.id_dimension, e.departement_code),
+    (es.annee, es.dimension, es.id_dimension, e.region_code)
+)
+HAVING COALESCE(e.departement_code, e.region_code) IS NOT NULL;
+
+DELETE FROM score_rank;
+
+WITH epci_scores AS (
+    SELECT
+        s.id_epci,
+        s.annee,
+        CASE GROUPING(s.id_indicateur) WHEN 1 THEN 'global' ELSE 'indicator' END AS dimension,
+        COALESCE(s.id_indicateur, '') AS id_dimension,
+        CASE GROUPING(s.id_indicateur) WHEN 1 THEN AVG(s.score_global) ELSE AVG(s.score_indicateur) END AS score
+    FROM score_indicateur s
+    GROUP BY GROUPING SETS ((s.id_epci, s.annee), (s.id_epci, s.annee, s.id_indicateur))
+    UNION ALL
+    SELECT id_epci, annee, dimension, id_dimension, score
+    FROM score_dimension
+),
+ranked AS (
+    SELECT
+        es.annee,
+        es.id_epci,
+        es.dimension,
+        es.id_dimension,
+        e.departement_code,
+        RANK() OVER national_desc AS rang,
+        COUNT(*) OVER national AS nb_epci,
+        PERCENT_RANK() OVER national_asc AS pr,
+        RANK() OVER departement_desc AS rang_departement,
+        COUNT(*) OVER departement AS nb_epci_departement,
+        PERCENT_RANK() OVER departement_asc AS pr_departement
+    FROM epci_scores es
+    JOIN epci e ON e.id_epci = es.id_epci
+    WHERE es.score IS NOT NULL
+    WINDOW
+        national AS (PARTITION BY es.annee, es.dimension, es.id_dimension),
+        national_desc AS (national ORDER BY es.score DESC),
+        national_asc AS (national ORDER BY es.score ASC),
+        departement AS (PARTITION BY es.annee, es.dimension, es.id_dimension, e.departement_code),
+        departement_desc AS (departement ORDER BY es.score DESC),
+        departement_asc AS (departement ORDER BY es.score ASC)
+)
+INSERT INTO score_rank (
+    annee, id_epci, dimension, id_dimension, rang, nb_epci, percentile, quartile,
+    rang_departement, nb_epci_departement, percentile_departement, quartile_departement
+)
+SELECT
+    annee,
+    id_epci,
+    dimension,
+    id_dimension,
+    rang,
+    nb_epci,
+    ROUND((pr * 100)::NUMERIC, 1),
+    LEAST(4, FLOOR(pr * 4) + 1),
+    CASE WHEN departement_code IS NOT NULL THEN rang_departement END,
+    CASE WHEN departement_code IS NOT NULL THEN nb_epci_departement END,
+    CASE WHEN departement_code IS NOT NULL THEN ROUND((pr_departement * 100)::NUMERIC, 1) END,
+    CASE WHEN departement_code IS NOT NULL THEN LEAST(4, FLOOR(pr_departement * 4) + 1) END
+FROM ranked;
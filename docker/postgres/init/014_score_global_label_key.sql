@@ -0,0 +1,11 @@
+-----------------------------------------------------------------------
+-- Tri par nom de /api/scores : le curseur next_cursor porte le libellé
+-- affiché, COALESCE(libelle_epci, ''). Le tri et la condition de
+-- pagination comparent cette même expression (COLLATE "C", voir 012),
+-- sinon une page coupée sur un libellé NULL perd ou répète des lignes.
+-- Script idempotent : peut être rejoué sur une base existante.
+-----------------------------------------------------------------------
+
+CREATE INDEX IF NOT EXISTS idx_score_global_annee_libelle_key
+    ON score_global (annee, (COALESCE(libelle_epci, '') COLLATE "C"), id_epci);
+DROP INDEX IF EXISTS idx_score_global_annee_libelle_c;
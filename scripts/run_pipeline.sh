@@ -18,7 +18,9 @@ Commands:
   down                   Stop and remove services.
   logs                   Tail backend + frontend + nocodb logs.
   ingest [path]          Run XLSX ingestion (defaults to ./Diag360_EvolV2.xlsx).
+  indicator-scores [year] Compute indicator scores from raw values (all dated years by default; 0 = workbook year).
   need-scores [year]     Compute need scores (defaults to DATA_YEAR env or 0).
+  score-snapshot         Publish the mmap score snapshot read by the API workers.
   fetch <url>            Fetch external JSON data via backend CLI.
   shell                  Open an interactive shell inside the backend container.
 
@@ -53,11 +55,22 @@ case "${1:-}" in
     XLSX_PATH="${1:-$DEFAULT_XLSX}"
     $COMPOSE_COMMAND run --rm --profile ingest backend_ingest --file "$XLSX_PATH"
     ;;
+  indicator-scores)
+    shift
+    if [[ -n "${1:-}" ]]; then
+      $COMPOSE_COMMAND run --rm backend python -m app.cli.compute_indicator_scores --year "$1"
+    else
+      $COMPOSE_COMMAND run --rm backend python -m app.cli.compute_indicator_scores
+    fi
+    ;;
   need-scores)
     shift
     YEAR="${1:-$DEFAULT_YEAR}"
     $COMPOSE_COMMAND run --rm backend python -m app.cli.compute_need_scores --data-year "$YEAR"
     ;;
+  score-snapshot)
+    $COMPOSE_COMMAND run --rm backend python -m app.cli.publish_score_snapshot
+    ;;
   fetch)
     shift
     require_arg "--url" "${1:-}"